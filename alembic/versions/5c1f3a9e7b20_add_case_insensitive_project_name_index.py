@@ -0,0 +1,58 @@
+"""Add case-insensitive project name index
+
+Revision ID: 5c1f3a9e7b20
+Revises: bdd515dea1dc
+Create Date: 2026-10-18 03:41:12.508114
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.config import settings
+
+
+# revision identifiers, used by Alembic.
+revision = '5c1f3a9e7b20'
+down_revision = 'bdd515dea1dc'
+branch_labels = None
+depends_on = None
+
+INDEX_NAME = 'uq_charityproject_name_lower'
+
+
+def find_name_conflicts(names):
+    """Группы названий, различающихся только регистром."""
+    groups = {}
+    for name in names:
+        groups.setdefault(name.lower(), []).append(name)
+    return [group for group in groups.values() if len(group) > 1]
+
+
+def upgrade():
+    # Индекс создаётся, только если включена настройка
+    # PROJECT_NAME_CASE_INSENSITIVE; её же учитывают модель и поиск
+    # проекта по имени.
+    if not settings.project_name_case_insensitive:
+        return
+    conflicts = find_name_conflicts(
+        op.get_bind().execute(sa.text('SELECT name FROM charityproject'))
+        .scalars()
+    )
+    if conflicts:
+        raise RuntimeError(
+            'Названия проектов различаются только регистром, '
+            'переименуйте их перед миграцией: ' + '; '.join(
+                ', '.join(group) for group in conflicts
+            )
+        )
+    op.create_index(
+        INDEX_NAME,
+        'charityproject',
+        [sa.text('lower(name)')],
+        unique=True,
+    )
+
+
+def downgrade():
+    op.execute(f'DROP INDEX IF EXISTS {INDEX_NAME}')
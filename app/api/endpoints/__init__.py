@@ -1,6 +1,14 @@
 """Импорты router-ов для главного router-а."""
+from .cache import router as cache_router
 from .charity_project import router as charity_project_router
 from .donation import router as donation_router
+from .metrics import router as metrics_router
 from .user import router as user_router
 
-__all__ = ['charity_project_router', 'donation_router', 'user_router']
\ No newline at end of file
+__all__ = [
+    'cache_router',
+    'charity_project_router',
+    'donation_router',
+    'metrics_router',
+    'user_router',
+]
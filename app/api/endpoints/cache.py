@@ -0,0 +1,27 @@
+from typing import List
+
+from fastapi import APIRouter, Depends
+
+from app.core.user import current_superuser
+from app.crud.cache import model_caches
+from app.schemas.cache import CacheStatsDB
+
+router = APIRouter()
+
+
+@router.get(
+    '/',
+    response_model=List[CacheStatsDB],
+    dependencies=[Depends(current_superuser)],
+    summary='Статистика кэша',
+)
+async def get_cache_stats():
+    """Статистика кэша.
+
+    Позволяет суперпользователям увидеть число попаданий и промахов
+    кэша и количество записей в нём для каждой кэшируемой модели.
+    """
+    return [
+        dict(name=model.__tablename__, **cache.stats())
+        for model, cache in model_caches.items()
+    ]
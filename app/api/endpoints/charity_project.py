@@ -1,21 +1,38 @@
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.etag import not_modified
+from app.api.loaders import CharityProjectLoader
+from app.api.pagination import ListFilters, PageParams, set_next_cursor
+from app.api.responses import (
+    JSON_MEDIA_TYPE,
+    ROWS_RESPONSES,
+    FieldSelector,
+    negotiate_media_type,
+    rows_response,
+)
 from app.api.validators import (
     check_invested_amount,
     check_project_exists,
     check_project_open,
+    validate_update_project,
 )
-from app.core.db import get_async_session
+from app.core.db import get_async_session, get_read_session
 from app.core.user import current_superuser
 from app.crud.charity_project import charity_project_crud
+from app.crud.investment import investment_crud
+from app.models import CharityProject
 from app.schemas.charity_project import (
     CharityProjectCreate,
     CharityProjectDB,
     CharityProjectUpdate,
 )
+from app.schemas.investment import InvestmentDB
+from app.services.coordinator import allocation_coordinator
+from app.services.export import ExportFormat, export_response
+from app.services.snapshot import project_list_snapshot
 from app.services.utils import (
     process_new_charity_project,
     update_charity_project_logic,
@@ -23,6 +40,8 @@ from app.services.utils import (
 
 router = APIRouter()
 
+project_fields = FieldSelector(CharityProjectDB)
+
 
 @router.post(
     '/',
@@ -39,7 +58,13 @@ async def create_new_charity_project(
 
     Позволяет суперпользователям создать новый
     благотворительный проект, предоставив необходимые данные о проекте.
+    При включённой очереди распределения запись выполняет
+    единственный писатель пакетами.
     """
+    if allocation_coordinator.running:
+        return await allocation_coordinator.submit(
+            CharityProject, charity_project
+        )
     return await process_new_charity_project(charity_project, session)
 
 
@@ -47,15 +72,89 @@ async def create_new_charity_project(
     '/',
     response_model=Optional[List[CharityProjectDB]],
     response_model_exclude_none=True,
+    responses=ROWS_RESPONSES,
     summary='Получение всех благотворительных проектов',
 )
-async def get_all_projects(session: AsyncSession = Depends(get_async_session)):
+async def get_all_projects(
+        request: Request,
+        response: Response,
+        params: PageParams = Depends(),
+        fields: List[str] = Depends(project_fields),
+        media_type: str = Depends(negotiate_media_type),
+        session: AsyncSession = Depends(get_read_session),
+):
     """Получение всех благотворительных проектов.
 
     Возвращает все благотворительные проекты, хранящиеся в базе данных.
     Возвращает список проектов или пустой список, если проекты отсутствуют.
+    С параметром `limit` список отдаётся страницами, курсор следующей
+    страницы передаётся в заголовке `X-Next-Cursor`. Если проекты
+    не менялись с момента выдачи ETag из `If-None-Match`,
+    возвращается 304 без обращения к базе. Полный список без параметров
+    отдаётся из готового сжатого снимка, остальные запросы выбирают
+    только колонки схемы и кодируются без ORM-объектов. Параметр
+    `fields` сужает набор полей и колонок. По заголовку `Accept`
+    список отдаётся также в столбцовом JSON или MessagePack.
     """
-    return await charity_project_crud.get_multi(session)
+    if not request.query_params and media_type == JSON_MEDIA_TYPE:
+        return await project_list_snapshot.response(
+            request, response, session
+        )
+    cached = not_modified(
+        request, response, CharityProject, session=session
+    )
+    if cached is not None:
+        return cached
+    page = await charity_project_crud.get_page(
+        session, columns=fields, **params.as_kwargs()
+    )
+    set_next_cursor(response, page)
+    return rows_response(fields, page.items, response, media_type)
+
+
+@router.get(
+    '/export',
+    dependencies=[Depends(current_superuser)],
+    summary='Потоковая выгрузка благотворительных проектов',
+)
+async def export_projects(
+        export_format: ExportFormat = Query(
+            ExportFormat.ndjson, alias='format'
+        ),
+        filters: ListFilters = Depends(),
+        session: AsyncSession = Depends(get_read_session),
+):
+    """Потоковая выгрузка благотворительных проектов.
+
+    Позволяет суперпользователям выгрузить все проекты в формате
+    NDJSON или CSV с теми же фильтрами, что и у списка проектов.
+    """
+    return export_response(
+        charity_project_crud,
+        CharityProjectDB,
+        session,
+        export_format,
+        **filters.as_kwargs(),
+    )
+
+
+@router.get(
+    '/{project_id}/investments',
+    response_model=List[InvestmentDB],
+    dependencies=[Depends(current_superuser)],
+    summary='Получение вложений в благотворительный проект',
+)
+async def get_project_investments(
+        project_id: int,
+        session: AsyncSession = Depends(get_read_session),
+):
+    """Получение вложений в благотворительный проект.
+
+    Позволяет суперпользователям увидеть, из каких пожертвований
+    и в каком объёме финансировался проект.
+    """
+    await check_project_exists(project_id, session)
+    return await investment_crud.get_by_project(project_id, session)
 
 
 @router.patch(
@@ -65,20 +164,22 @@ async def get_all_projects(session: AsyncSession = Depends(get_async_session)):
     summary='Частичное обновление благотворительного проекта',
 )
 async def partially_update_charity_project(
-        project_id: int,
         obj_in: CharityProjectUpdate,
+        project_loader: CharityProjectLoader = Depends(),
         session: AsyncSession = Depends(get_async_session),
 ):
     """Частичное обновление благотворительного проекта.
 
     Позволяет суперпользователям частично обновить благотворительный
     проект, при этом проверяется, что проект существует и открыт.
+    Уникальность нового имени проверяет ограничение в базе данных.
     """
-    charity_project = await check_project_exists(project_id, session)
-    await check_project_open(project_id, session)
+    charity_project = await project_loader.load()
+    check_project_open(charity_project)
+    validate_update_project(charity_project, obj_in)
 
     return await update_charity_project_logic(
-        charity_project, obj_in, project_id, session
+        charity_project, obj_in, session
     )
 
 
@@ -89,7 +190,7 @@ async def partially_update_charity_project(
     summary='Удаление благотворительного проекта',
 )
 async def remove_charity_project(
-        project_id: int,
+        project_loader: CharityProjectLoader = Depends(),
         session: AsyncSession = Depends(get_async_session),
 ):
     """Удаление благотворительного проекта.
@@ -97,8 +198,8 @@ async def remove_charity_project(
     Позволяет суперпользователям удалить благотворительный проект после того,
     как будет проверено, что проект существует и в нем не было вложено средств.
     """
-    charity_project = await check_project_exists(project_id, session)
-    await check_invested_amount(project_id, session)
+    charity_project = await project_loader.load()
+    check_invested_amount(charity_project)
     return await charity_project_crud.remove(
         charity_project, session
     )
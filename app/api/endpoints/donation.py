@@ -5,27 +5,46 @@ from typing import (
 
 from fastapi import (
     APIRouter,
-    Depends
+    Depends,
+    Query,
+    Request,
+    Response
 )
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.db import get_async_session
+from app.api.etag import not_modified
+from app.api.pagination import ListFilters, PageParams, set_next_cursor
+from app.api.responses import (
+    ROWS_RESPONSES,
+    FieldSelector,
+    negotiate_media_type,
+    rows_response,
+)
+from app.api.sessions import get_user_read_session
+from app.api.validators import check_donation_exists
+from app.core.db import get_async_session, get_read_session, recent_writes
 from app.core.user import (
     current_superuser,
     current_user
 )
 from app.crud.donation import donation_crud
-from app.models import User
+from app.crud.investment import investment_crud
+from app.models import Donation, User
 from app.schemas.donation import (
     DonationCreate,
     DonationDB,
     DonationDBSuper
 )
-
+from app.schemas.investment import InvestmentDB
+from app.services.coordinator import allocation_coordinator
+from app.services.export import ExportFormat, export_response
 from app.services.utils import process_new_donation
 
 router = APIRouter()
 
+donation_fields = FieldSelector(DonationDBSuper)
+my_donation_fields = FieldSelector(DonationDB, exclude={'user_id'})
+
 
 @router.post('/', response_model=DonationDB, response_model_exclude_none=True)
 async def create_new_donation(
@@ -38,26 +57,78 @@ async def create_new_donation(
     Позволяет пользователям создавать пожертвования
     для благотворительных проектов.
     Пожертвование привязывается к текущему пользователю.
+    При включённой очереди распределения запись выполняет
+    единственный писатель пакетами.
     """
-    return await process_new_donation(donation, session, user)
+    if allocation_coordinator.running:
+        new_donation = await allocation_coordinator.submit(
+            Donation, donation, user
+        )
+    else:
+        new_donation = await process_new_donation(donation, session, user)
+    recent_writes.mark(user.id)
+    return new_donation
 
 
 @router.get(
     '/',
     response_model=Optional[List[DonationDBSuper]],
     response_model_exclude_none=True,
+    responses=ROWS_RESPONSES,
     dependencies=[Depends(current_superuser)],
 )
 async def get_all_donations(
-        session: AsyncSession = Depends(get_async_session)
+        request: Request,
+        response: Response,
+        params: PageParams = Depends(),
+        fields: List[str] = Depends(donation_fields),
+        media_type: str = Depends(negotiate_media_type),
+        session: AsyncSession = Depends(get_read_session),
 ):
     """Получение всех пожертвований.
 
     Позволяет суперпользователям просматривать все пожертвования,
     сделанные пользователями.
     Если пожертвования отсутствуют, возвращается пустой список.
+    С параметром `limit` список отдаётся страницами, курсор следующей
+    страницы передаётся в заголовке `X-Next-Cursor`. Поддерживается
+    условный запрос с `If-None-Match`. Выбираются только колонки
+    схемы или полей из параметра `fields`, ответ кодируется
+    без ORM-объектов в формате из заголовка `Accept`.
+    """
+    cached = not_modified(request, response, Donation, session=session)
+    if cached is not None:
+        return cached
+    page = await donation_crud.get_page(
+        session, columns=fields, **params.as_kwargs()
+    )
+    set_next_cursor(response, page)
+    return rows_response(fields, page.items, response, media_type)
+
+
+@router.get(
+    '/export',
+    dependencies=[Depends(current_superuser)],
+)
+async def export_donations(
+        export_format: ExportFormat = Query(
+            ExportFormat.ndjson, alias='format'
+        ),
+        filters: ListFilters = Depends(),
+        session: AsyncSession = Depends(get_read_session),
+):
+    """Потоковая выгрузка пожертвований.
+
+    Позволяет суперпользователям выгрузить все пожертвования в формате
+    NDJSON или CSV с теми же фильтрами, что и у списка пожертвований.
     """
-    return await donation_crud.get_multi(session)
+    return export_response(
+        donation_crud,
+        DonationDBSuper,
+        session,
+        export_format,
+        **filters.as_kwargs(),
+    )
 
 
 @router.get(
@@ -65,14 +136,60 @@ async def get_all_donations(
     response_model=Optional[List[DonationDB]],
     response_model_exclude_none=True,
     response_model_exclude={'user_id'},
+    responses=ROWS_RESPONSES,
 )
 async def get_my_donations(
+        request: Request,
+        response: Response,
+        params: PageParams = Depends(),
+        fields: List[str] = Depends(my_donation_fields),
+        media_type: str = Depends(negotiate_media_type),
         user: User = Depends(current_user),
-        session: AsyncSession = Depends(get_async_session),
+        session: AsyncSession = Depends(get_user_read_session),
 ):
     """Получение пожертвований текущего пользователя.
 
     Позволяет пользователю просматривать свои собственные пожертвования.
     Если пожертвования отсутствуют, возвращается пустой список.
+    С параметром `limit` список отдаётся страницами, курсор следующей
+    страницы передаётся в заголовке `X-Next-Cursor`; первая страница
+    без фильтров берётся из кэша пользователя. Если пожертвования
+    не менялись с момента выдачи ETag из `If-None-Match`, возвращается
+    304 без обращения к базе. Параметр `fields` сужает набор полей
+    и колонок, заголовок `Accept` выбирает JSON, столбцовый JSON
+    или MessagePack.
+    """
+    cached = not_modified(
+        request, response, Donation, user.id, session=session
+    )
+    if cached is not None:
+        return cached
+    page = await donation_crud.get_user_page(
+        user, session, columns=fields, **params.as_kwargs()
+    )
+    set_next_cursor(response, page)
+    return rows_response(fields, page.items, response, media_type)
+
+
+@router.get(
+    '/{donation_id}/investments',
+    response_model=List[InvestmentDB],
+)
+async def get_donation_investments(
+        donation_id: int,
+        user: User = Depends(current_user),
+        session: AsyncSession = Depends(get_user_read_session),
+):
+    """Получение вложений пожертвования.
+
+    Показывает, в какие проекты и в каком объёме направлено пожертвование.
+    Пользователь видит только вложения собственных пожертвований,
+    суперпользователь — любых. Для несуществующего или чужого
+    пожертвования возвращается 404.
     """
-    return await donation_crud.get_by_user(user=user, session=session)
+    await check_donation_exists(
+        donation_id,
+        session,
+        user=None if user.is_superuser else user,
+    )
+    return await investment_crud.get_by_donation(donation_id, session)
@@ -0,0 +1,21 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.core.metrics import PROMETHEUS_MEDIA_TYPE, metrics_registry
+
+router = APIRouter()
+
+
+@router.get(
+    '/metrics',
+    response_class=PlainTextResponse,
+    include_in_schema=False,
+)
+async def get_metrics():
+    """Метрики приложения в текстовом формате Prometheus.
+
+    Кодировка `utf-8` добавляется к типу содержимого автоматически.
+    """
+    return PlainTextResponse(
+        metrics_registry.render(), media_type=PROMETHEUS_MEDIA_TYPE
+    )
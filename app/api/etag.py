@@ -0,0 +1,89 @@
+import time
+import uuid
+import zlib
+from http import HTTPStatus
+from typing import Optional
+
+from fastapi import Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.db import reads_replica
+from app.crud.cache import get_version
+
+BOOT_ID = uuid.uuid4().hex[:8]
+
+
+def cache_epoch() -> int:
+    """Номер текущего интервала длиной `cache_ttl` секунд."""
+    if settings.cache_ttl <= 0:
+        return int(time.time() * 1000)
+    return int(time.time() // settings.cache_ttl)
+
+
+def make_etag(model, *parts, version: Optional[int] = None) -> str:
+    """ETag списка по версии данных модели без чтения из базы.
+
+    Версии ведутся в памяти процесса, поэтому в ETag входит
+    идентификатор запуска: тег другого процесса никогда не совпадёт.
+    Записи других процессов (второго воркера, `replay_allocations.py`)
+    версию этого процесса не меняют, поэтому тег по текущей версии
+    включает и номер интервала `cache_epoch`: такой тег устаревает
+    не позже чем через `cache_ttl`, как и кэш модели.
+    `parts` различают варианты ответа, например пользователя
+    или строку запроса. `version` — версия данных, по которым
+    построено тело ответа (снимок со своей контрольной суммой),
+    по умолчанию текущая.
+    """
+    if version is None:
+        version = f'{get_version(model)}.{cache_epoch()}'
+    tag = '-'.join(str(part) for part in (
+        BOOT_ID, model.__tablename__, version, *parts
+    ))
+    return f'"{tag}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Совпадает ли ETag с заголовком `If-None-Match`."""
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(',')]
+    return '*' in tags or etag in tags or f'W/{etag}' in tags
+
+
+def not_modified(
+        request: Request,
+        response: Response,
+        model,
+        *parts,
+        version: Optional[int] = None,
+        session: Optional[AsyncSession] = None,
+) -> Optional[Response]:
+    """Ответ 304 для условного GET-запроса.
+
+    Если тег клиента актуален, возвращается пустой ответ 304,
+    иначе ETag добавляется в заголовки `response` и возвращается
+    `None`. Тег зависит от строки запроса и заголовка `Accept`,
+    выбирающего формат.
+
+    Готовое тело (снимок) передаёт свою версию в `version`. Без неё
+    тег вычисляется по текущей версии до чтения данных: кэш модели
+    не сохраняет данные, прочитанные до записи (`ModelCache.fill`),
+    поэтому тело ответа не старше тега, а изменение, зафиксированное
+    во время запроса, не будет пропущено. Реплика `session` может
+    отставать от этой версии, поэтому для неё тег не выдаётся.
+    """
+    if session is not None and reads_replica(session):
+        return None
+    variant = '\n'.join(
+        (request.url.query, request.headers.get('accept', ''))
+    )
+    etag = make_etag(
+        model, zlib.crc32(variant.encode()), *parts, version=version
+    )
+    if etag_matches(request.headers.get('if-none-match'), etag):
+        return Response(
+            status_code=HTTPStatus.NOT_MODIFIED, headers={'ETag': etag}
+        )
+    response.headers['ETag'] = etag
+    return None
@@ -0,0 +1,40 @@
+from typing import Optional
+
+from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.validators import check_project_found
+from app.core.db import get_async_session
+from app.crud.charity_project import charity_project_crud
+from app.models import CharityProject
+
+
+class CharityProjectLoader:
+    """Загрузчик проекта из пути запроса.
+
+    Используется как зависимость FastAPI: проект читается из базы
+    один раз за запрос, а валидаторы получают уже загруженный объект.
+    """
+
+    def __init__(
+            self,
+            project_id: int,
+            session: AsyncSession = Depends(get_async_session),
+    ):
+        """Инициализация загрузчика."""
+        self.project_id = project_id
+        self._session = session
+        self._project: Optional[CharityProject] = None
+
+    async def load(self) -> CharityProject:
+        """Загрузить проект или выбросить 404.
+
+        Проект читается из базы в обход кэша, так как загрузчик
+        используется для проверок перед записью. Повторные вызовы
+        не обращаются к базе.
+        """
+        if self._project is None:
+            self._project = await charity_project_crud.get(
+                self.project_id, self._session, use_cache=False
+            )
+        return check_project_found(self._project)
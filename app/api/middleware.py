@@ -0,0 +1,118 @@
+import logging
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.db import QueryStats, query_stats
+from app.core.metrics import (
+    HTTP_REQUEST_DURATION,
+    HTTP_REQUESTS,
+    HTTP_REQUESTS_IN_PROGRESS,
+)
+
+SLOWEST_STATEMENT_LENGTH = 200
+UNMATCHED_ROUTE = 'unmatched'
+
+
+class QueryStatsMiddleware:
+    """Учёт SQL-запросов каждого HTTP-запроса.
+
+    Число и суммарное время запросов, выполненных до отправки заголовков,
+    передаются в заголовке `Server-Timing`. После отправки ответа итоги
+    вместе с самым долгим запросом пишутся в лог.
+    """
+
+    def __init__(self, app: ASGIApp):
+        """Инициализация промежуточного слоя."""
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        """Обрабатывает запрос со свежей статистикой запросов к базе."""
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        stats = QueryStats()
+        token = query_stats.set(stats)
+
+        async def send_with_timing(message: Message) -> None:
+            if message['type'] == 'http.response.start':
+                headers = MutableHeaders(scope=message)
+                headers.append('Server-Timing', stats.server_timing())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            query_stats.reset(token)
+            log_query_stats(scope, stats)
+
+
+def log_query_stats(scope: Scope, stats: QueryStats) -> None:
+    """Пишет в лог итоги запросов к базе одного HTTP-запроса."""
+    if not stats.count:
+        return
+    slowest = ' '.join(stats.slowest.split())[:SLOWEST_STATEMENT_LENGTH]
+    logging.info(
+        '%s %s: запросов к базе %d, %.1f мс; самый долгий %.1f мс: %s',
+        scope['method'],
+        scope['path'],
+        stats.count,
+        stats.duration * 1000,
+        stats.slowest_duration * 1000,
+        slowest,
+    )
+
+
+def route_template(scope: Scope) -> str:
+    """Шаблон пути маршрута, например `/donation/{donation_id}`.
+
+    Метки метрик строятся по шаблону, а не по фактическому пути,
+    чтобы число рядов не зависело от ID в адресах.
+    """
+    partial = None
+    for route in scope['app'].router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+        if match == Match.PARTIAL and partial is None:
+            partial = route.path
+    return partial or UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """Метрики HTTP-запросов по маршрутам.
+
+    Учитывает время обработки, число запросов в обработке и коды
+    ответов. Код ответа необработанного исключения учитывается как 500.
+    """
+
+    def __init__(self, app: ASGIApp):
+        """Инициализация промежуточного слоя."""
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        """Обрабатывает запрос с учётом его метрик."""
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        labels = dict(method=scope['method'], route=route_template(scope))
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        HTTP_REQUESTS_IN_PROGRESS.inc(**labels)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_REQUEST_DURATION.observe(
+                time.perf_counter() - started, **labels
+            )
+            HTTP_REQUESTS_IN_PROGRESS.dec(**labels)
+            HTTP_REQUESTS.inc(status=status, **labels)
@@ -0,0 +1,86 @@
+from datetime import datetime
+from http import HTTPStatus
+from typing import Dict, Optional
+
+from fastapi import Depends, HTTPException, Query, Response
+
+from app.core.config import Constant, settings
+from app.crud.pagination import Page, decode_cursor
+
+
+class ListFilters:
+    """Фильтры списков по статусу и диапазонам дат.
+
+    Используется как зависимость FastAPI в эндпоинтах списков
+    и выгрузок.
+    """
+
+    def __init__(
+            self,
+            fully_invested: Optional[bool] = None,
+            create_date_from: Optional[datetime] = None,
+            create_date_to: Optional[datetime] = None,
+            close_date_from: Optional[datetime] = None,
+            close_date_to: Optional[datetime] = None,
+    ):
+        """Сохранение параметров запроса."""
+        self.fully_invested = fully_invested
+        self.create_date_from = create_date_from
+        self.create_date_to = create_date_to
+        self.close_date_from = close_date_from
+        self.close_date_to = close_date_to
+
+    def as_kwargs(self) -> Dict:
+        """Параметры для `CRUDBase.filter_query`."""
+        return dict(vars(self))
+
+
+class PageParams:
+    """Параметры постраничного списка с фильтрами.
+
+    Используется как зависимость FastAPI в эндпоинтах списков.
+    """
+
+    def __init__(
+            self,
+            limit: Optional[int] = Query(
+                None,
+                ge=1,
+                le=settings.page_size_max,
+                description='Размер страницы; без него возвращается весь '
+                            'список',
+            ),
+            cursor: Optional[str] = Query(
+                None,
+                description=f'Курсор из заголовка '
+                            f'{Constant.NEXT_CURSOR_HEADER} '
+                            f'предыдущего ответа',
+            ),
+            filters: ListFilters = Depends(),
+    ):
+        """Проверка курсора и сохранение параметров запроса."""
+        if cursor is not None:
+            try:
+                decode_cursor(cursor)
+            except ValueError:
+                raise HTTPException(
+                    status_code=HTTPStatus.UNPROCESSABLE_ENTITY,
+                    detail='Некорректный курсор',
+                )
+        self.limit = limit
+        self.cursor = cursor
+        self.filters = filters
+
+    def as_kwargs(self) -> Dict:
+        """Параметры для `CRUDBase.get_page`."""
+        return dict(
+            limit=self.limit,
+            cursor=self.cursor,
+            **self.filters.as_kwargs(),
+        )
+
+
+def set_next_cursor(response: Response, page: Page) -> None:
+    """Передаёт курсор следующей страницы в заголовке ответа."""
+    if page.next_cursor is not None:
+        response.headers[Constant.NEXT_CURSOR_HEADER] = page.next_cursor
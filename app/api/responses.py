@@ -0,0 +1,195 @@
+from datetime import datetime
+from http import HTTPStatus
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Type
+
+import msgpack
+import orjson
+from fastapi import HTTPException, Query, Request, Response
+from pydantic import BaseModel
+
+JSON_MEDIA_TYPE = 'application/json'
+COLUMNAR_JSON_MEDIA_TYPE = 'application/vnd.qrkot.columnar+json'
+MSGPACK_MEDIA_TYPE = 'application/x-msgpack'
+
+
+def schema_fields(schema: Type[BaseModel], exclude=()) -> List[str]:
+    """Поля схемы ответа в порядке их объявления."""
+    return [field for field in schema.__fields__ if field not in exclude]
+
+
+class FieldSelector:
+    """Зависимость FastAPI для параметра `fields`.
+
+    Параметр содержит имена полей схемы через запятую. Поля
+    возвращаются в порядке схемы и передаются в список колонок
+    SELECT, поэтому ненужные колонки не читаются из базы.
+    """
+
+    def __init__(self, schema: Type[BaseModel], exclude=()):
+        """Инициализация по допустимым полям схемы."""
+        self.fields = schema_fields(schema, exclude)
+
+    def __call__(
+            self,
+            fields: Optional[str] = Query(
+                None,
+                description='Поля ответа через запятую',
+            ),
+    ) -> List[str]:
+        """Проверка запрошенных полей."""
+        if fields is None:
+            return self.fields
+        requested = {
+            field.strip() for field in fields.split(',') if field.strip()
+        }
+        unknown = requested.difference(self.fields)
+        if unknown or not requested:
+            raise HTTPException(
+                status_code=HTTPStatus.UNPROCESSABLE_ENTITY,
+                detail=(
+                    'Неизвестные поля: ' + ', '.join(sorted(unknown))
+                    if unknown else 'Не указаны поля'
+                ),
+            )
+        return [field for field in self.fields if field in requested]
+
+
+def encode_json_rows(
+        fields: Sequence[str],
+        rows: Iterable[Sequence],
+) -> bytes:
+    """Кодирует кортежи значений в JSON-массив объектов через orjson.
+
+    Результат совпадает побайтно с ответом FastAPI по схеме с полями
+    `fields` и `response_model_exclude_none`: порядок ключей — порядок
+    полей, значения `None` пропускаются, даты — в формате ISO 8601.
+    Лишние значения в конце кортежа игнорируются.
+    """
+    return orjson.dumps([
+        {field: value for field, value in zip(fields, row)
+         if value is not None}
+        for row in rows
+    ])
+
+
+def encode_columnar_rows(
+        fields: Sequence[str],
+        rows: Iterable[Sequence],
+) -> bytes:
+    """Кодирует кортежи значений в JSON-объект столбцов через orjson.
+
+    Ключи — поля в порядке `fields`, значения — массивы одинаковой
+    длины, поэтому `None` сохраняется как `null`.
+    """
+    columns = dict.fromkeys(fields)
+    values = list(zip(*rows))
+    for index, field in enumerate(fields):
+        columns[field] = list(values[index]) if values else []
+    return orjson.dumps(columns)
+
+
+def msgpack_default(value):
+    """Сериализация дат для MessagePack в формате ISO 8601, как в JSON."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f'Тип {type(value).__name__} не поддерживается')
+
+
+def encode_msgpack_rows(
+        fields: Sequence[str],
+        rows: Iterable[Sequence],
+) -> bytes:
+    """Кодирует кортежи значений в MessagePack.
+
+    Структура совпадает с JSON-ответом `encode_json_rows`:
+    массив объектов без значений `None`.
+    """
+    return msgpack.packb(
+        [
+            {field: value for field, value in zip(fields, row)
+             if value is not None}
+            for row in rows
+        ],
+        default=msgpack_default,
+    )
+
+
+ROW_ENCODERS: Dict[str, Callable[..., bytes]] = {
+    JSON_MEDIA_TYPE: encode_json_rows,
+    COLUMNAR_JSON_MEDIA_TYPE: encode_columnar_rows,
+    MSGPACK_MEDIA_TYPE: encode_msgpack_rows,
+}
+
+ROWS_RESPONSES = {
+    200: {
+        'content': {
+            COLUMNAR_JSON_MEDIA_TYPE: {},
+            MSGPACK_MEDIA_TYPE: {},
+        },
+        'description': 'Формат выбирается по заголовку `Accept`.',
+    },
+}
+
+
+def parse_accept_header(header: Optional[str]) -> List[str]:
+    """Значения заголовка `Accept*`, разрешённые клиентом (q > 0).
+
+    Значения приводятся к нижнему регистру и упорядочиваются
+    по убыванию q, при равных q — в порядке заголовка.
+    """
+    accepted = []
+    for item in (header or '').split(','):
+        name, _, params = item.strip().partition(';')
+        quality = 1.0
+        for param in params.split(';'):
+            param = param.strip()
+            if param.startswith('q='):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    quality = 0.0
+        if name.strip() and quality > 0:
+            accepted.append((quality, name.strip().lower()))
+    accepted.sort(key=lambda item: -item[0])
+    return [name for _, name in accepted]
+
+
+def negotiate_media_type(request: Request) -> str:
+    """Зависимость FastAPI: формат списка по заголовку `Accept`.
+
+    Без заголовка и для `*/*` или `application/*` выбирается JSON.
+    Если клиент не принимает ни один из доступных форматов,
+    возвращается 406 до обращения к базе.
+    """
+    header = request.headers.get('accept')
+    if not header:
+        return JSON_MEDIA_TYPE
+    for media_type in parse_accept_header(header):
+        if media_type in ROW_ENCODERS:
+            return media_type
+        if media_type in ('*/*', 'application/*'):
+            return JSON_MEDIA_TYPE
+    raise HTTPException(
+        status_code=HTTPStatus.NOT_ACCEPTABLE,
+        detail='Доступные форматы: ' + ', '.join(ROW_ENCODERS),
+    )
+
+
+def rows_response(
+        fields: Sequence[str],
+        rows: Iterable[Sequence],
+        response: Response,
+        media_type: str = JSON_MEDIA_TYPE,
+) -> Response:
+    """Ответ со списком строк в обход валидации pydantic.
+
+    Тело кодируется в формате `media_type` из `negotiate_media_type`.
+    Заголовки, уже добавленные эндпоинтом в `response`, сохраняются.
+    """
+    headers = dict(response.headers)
+    headers['Vary'] = 'Accept'
+    return Response(
+        content=ROW_ENCODERS[media_type](fields, rows),
+        media_type=media_type,
+        headers=headers,
+    )
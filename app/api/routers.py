@@ -1,8 +1,10 @@
 from fastapi import APIRouter
 
 from app.api.endpoints import (
+    cache_router,
     charity_project_router,
     donation_router,
+    metrics_router,
     user_router,
 )
 
@@ -19,3 +21,9 @@ main_router.include_router(
     tags=['Donations'],
 )
 main_router.include_router(user_router)
+main_router.include_router(
+    cache_router,
+    prefix='/cache',
+    tags=['Cache'],
+)
+main_router.include_router(metrics_router)
@@ -0,0 +1,23 @@
+from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.db import get_async_session, get_read_session, recent_writes
+from app.core.user import current_user
+from app.models import User
+
+
+async def get_user_read_session(
+        user: User = Depends(current_user),
+        read_session: AsyncSession = Depends(get_read_session),
+        write_session: AsyncSession = Depends(get_async_session),
+) -> AsyncSession:
+    """Сессия чтения для запросов текущего пользователя.
+
+    Если пользователь недавно изменял данные (см. `recent_writes`),
+    чтение идёт через движок записи, и пользователь видит свои
+    изменения без задержки репликации. Соединение берётся только
+    выбранной сессией при первом запросе.
+    """
+    if recent_writes.is_recent(user.id):
+        return write_session
+    return read_session
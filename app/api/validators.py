@@ -1,10 +1,12 @@
 from http import HTTPStatus
+from typing import Optional
 
 from fastapi import HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.crud.charity_project import charity_project_crud
-from app.models.charity_project import CharityProject
+from app.crud.donation import donation_crud
+from app.models import CharityProject, User
 
 
 async def check_name_duplicate(
@@ -26,6 +28,21 @@ async def check_name_duplicate(
         )
 
 
+def check_project_found(
+        charity_project: Optional[CharityProject],
+) -> CharityProject:
+    """Проверка, что проект найден.
+
+    Если проекта нет, генерируется исключение с кодом ошибки 404.
+    """
+    if not charity_project:
+        raise HTTPException(
+            status_code=HTTPStatus.NOT_FOUND,
+            detail='Проект не найден!'
+        )
+    return charity_project
+
+
 async def check_project_exists(
         project_id: int,
         session: AsyncSession
@@ -35,25 +52,34 @@ async def check_project_exists(
     Получения проекта с указанным ID. Если проект не найден,
     генерируется исключение с кодом ошибки 404.
     """
-    charity_project = await charity_project_crud.get(project_id, session)
-    if not charity_project:
+    return check_project_found(
+        await charity_project_crud.get(project_id, session)
+    )
+
+
+async def check_donation_exists(
+        donation_id: int,
+        session: AsyncSession,
+        user: Optional[User] = None,
+) -> None:
+    """Проверка, что пожертвование существует.
+
+    Если пожертвование не найдено или передан пользователь, которому
+    оно не принадлежит, генерируется исключение с кодом ошибки 404.
+    """
+    if not await donation_crud.exists(donation_id, session, user):
         raise HTTPException(
             status_code=HTTPStatus.NOT_FOUND,
-            detail='Проект не найден!'
+            detail='Пожертвование не найдено!'
         )
-    return charity_project
 
 
-async def check_project_open(
-        project_id: int,
-        session: AsyncSession,
-) -> CharityProject:
+def check_project_open(charity_project: CharityProject) -> CharityProject:
     """Проверка, открыт ли проект.
 
     Если проект закрыт (дата закрытия указана),
     генерируется исключение с кодом ошибки 400.
     """
-    charity_project = await charity_project_crud.get(project_id, session)
     if charity_project.close_date:
         raise HTTPException(
             status_code=HTTPStatus.BAD_REQUEST,
@@ -62,31 +88,29 @@ async def check_project_open(
     return charity_project
 
 
-async def validate_update_project(
+def validate_update_project(
+    charity_project: CharityProject,
     obj_in,
-    project_id: int,
-    session: AsyncSession
 ) -> None:
     """Валидация данных для обновления благотворительного проекта.
 
+    Уникальность имени обеспечивает ограничение в базе данных,
+    см. `update_charity_project_logic`.
+
     Args:
+        charity_project (CharityProject): Загруженный проект.
         obj_in (UpdateProjectSchema): Данные для обновления проекта.
-        project_id (int): ID проекта для проверки.
-        session (AsyncSession): Асинхронная сессия SQLAlchemy.
 
     Raises:
-        ValueError: Если данные не прошли валидацию.
+        HTTPException: Если данные не прошли валидацию.
     """
-    if obj_in.name:
-        await check_name_duplicate(obj_in.name, session)
     if obj_in.full_amount:
-        await check_investing_funds(project_id, obj_in.full_amount, session)
+        check_investing_funds(charity_project, obj_in.full_amount)
 
 
-async def check_investing_funds(
-        project_id: int,
+def check_investing_funds(
+        charity_project: CharityProject,
         obj_in_full_amount,
-        session: AsyncSession,
 ) -> CharityProject:
     """Проверка, вложена ли сумма в проект.
 
@@ -94,7 +118,6 @@ async def check_investing_funds(
     Если текущая сумма меньше вложенной,
     генерируется исключение с кодом ошибки 400.
     """
-    charity_project = await charity_project_crud.get(project_id, session)
     if obj_in_full_amount < charity_project.invested_amount:
         raise HTTPException(
             status_code=HTTPStatus.BAD_REQUEST,
@@ -103,16 +126,12 @@ async def check_investing_funds(
     return charity_project
 
 
-async def check_invested_amount(
-        project_id: int,
-        session: AsyncSession,
-) -> CharityProject:
+def check_invested_amount(charity_project: CharityProject) -> CharityProject:
     """Проверка наличия вложенных средств в проекте.
 
     Проверяет, разрешение на удаление. Если средства уже вложены,
     генерируется исключение с кодом ошибки 400.
     """
-    charity_project = await charity_project_crud.get(project_id, session)
     if charity_project.invested_amount > 0:
         raise HTTPException(
             status_code=HTTPStatus.BAD_REQUEST,
@@ -18,6 +18,10 @@ class Constant:
     BASE_DIR = Path(__file__).parent
     LOG_FORMAT = '"%(asctime)s - [%(levelname)s] - %(message)s"'
     DATETIME_FORMAT = '%d.%m.%Y %H:%M:%S'
+    ALLOCATION_ENGINE_SQL = 'sql'
+    ALLOCATION_ENGINE_PYTHON = 'python'
+    NEXT_CURSOR_HEADER = 'X-Next-Cursor'
+    SLOW_QUERY_LOGGER = 'qrkot.slow_queries'
 
 
 class Settings(BaseSettings):
@@ -29,6 +33,35 @@ class Settings(BaseSettings):
     secret: str = 'SECRET'
     first_superuser_email: Optional[EmailStr] = None
     first_superuser_password: Optional[str] = None
+    allocation_engine: str = Constant.ALLOCATION_ENGINE_SQL
+    allocation_chunk_size: int = 100
+    allocation_queue_enabled: bool = False
+    allocation_batch_size: int = 100
+    allocation_max_linger: float = 0.005
+    page_size_max: int = 1000
+    export_chunk_size: int = 1000
+    project_name_case_insensitive: bool = False
+    cache_enabled: bool = True
+    cache_max_size: int = 1024
+    cache_ttl: float = 60.0
+    snapshot_gzip_level: int = 6
+    snapshot_brotli_quality: int = 5
+    pool_size: Optional[int] = None
+    pool_max_overflow: int = 10
+    pool_timeout: float = 30.0
+    pool_recycle: int = -1
+    pool_pre_ping: bool = False
+    sqlite_journal_mode: Optional[str] = 'WAL'
+    sqlite_synchronous: Optional[str] = 'NORMAL'
+    sqlite_cache_size: Optional[int] = -20000
+    sqlite_mmap_size: Optional[int] = None
+    sqlite_busy_timeout: Optional[int] = 5000
+    read_replica_url: Optional[str] = None
+    sqlite_read_only_reads: bool = True
+    read_your_writes_window: float = 5.0
+    slow_query_threshold: Optional[float] = 0.5
+    slow_query_log_interval: float = 60.0
+    log_dir: Path = Constant.BASE_DIR / 'logs'
 
     class Config:
         """Класс конфигурации '.env'."""
@@ -40,9 +73,13 @@ settings = Settings()
 
 
 def configure_logging():
-    """Функция настройки логирования."""
-    log_dir = Constant.BASE_DIR / 'logs'
-    log_dir.mkdir(exist_ok=True)
+    """Функция настройки логирования.
+
+    Журналы пишутся в каталог `log_dir`, медленные запросы — в отдельный
+    файл `slow_queries.log` рядом с основным журналом.
+    """
+    log_dir = settings.log_dir
+    log_dir.mkdir(parents=True, exist_ok=True)
     log_file = log_dir / 'qrkot.log'
     rotating_handler = RotatingFileHandler(
         log_file,
@@ -58,3 +95,15 @@ def configure_logging():
             logging.StreamHandler()
         )
     )
+    slow_query_logger = logging.getLogger(Constant.SLOW_QUERY_LOGGER)
+    if not slow_query_logger.handlers:
+        slow_query_handler = RotatingFileHandler(
+            log_dir / 'slow_queries.log',
+            maxBytes=10 ** 6,
+            backupCount=5
+        )
+        slow_query_handler.setFormatter(logging.Formatter(
+            Constant.LOG_FORMAT, Constant.DATETIME_FORMAT
+        ))
+        slow_query_logger.addHandler(slow_query_handler)
+        slow_query_logger.propagate = False
@@ -1,9 +1,15 @@
-from typing import AsyncGenerator
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Any, AsyncGenerator, Dict, Optional
 from sqlalchemy import (
     Column,
-    Integer
+    Integer,
+    event
 )
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
     AsyncSession,
     create_async_engine
 )
@@ -12,8 +18,11 @@ from sqlalchemy.orm import (
     declared_attr,
     sessionmaker
 )
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
-from app.core.config import settings
+from app.core.config import Settings, settings
+from app.core.metrics import Gauge
+from app.core.slow_queries import slow_query_log
 
 
 class PreBase:
@@ -35,8 +44,269 @@ class PreBase:
 
 
 Base = declarative_base(cls=PreBase)
-engine = create_async_engine(settings.database_url)
-AsyncSessionLocal = sessionmaker(engine, class_=AsyncSession)
+
+
+def engine_options(config: Settings = settings) -> Dict[str, Any]:
+    """Параметры пула соединений движка из настроек.
+
+    Без `pool_size` используется пул диалекта по умолчанию
+    (для файла SQLite — `NullPool`, новое соединение на каждую сессию),
+    иначе — очередь соединений заданного размера.
+    """
+    options = dict(
+        pool_pre_ping=config.pool_pre_ping,
+        pool_recycle=config.pool_recycle,
+    )
+    if config.pool_size is not None:
+        options.update(
+            poolclass=AsyncAdaptedQueuePool,
+            pool_size=config.pool_size,
+            max_overflow=config.pool_max_overflow,
+            pool_timeout=config.pool_timeout,
+        )
+    return options
+
+
+def sqlite_pragmas(config: Settings = settings) -> Dict[str, Any]:
+    """Прагмы SQLite из настроек.
+
+    `None` или пустая строка оставляют значение SQLite по умолчанию.
+    """
+    pragmas = dict(
+        journal_mode=config.sqlite_journal_mode,
+        synchronous=config.sqlite_synchronous,
+        cache_size=config.sqlite_cache_size,
+        mmap_size=config.sqlite_mmap_size,
+        busy_timeout=config.sqlite_busy_timeout,
+    )
+    return {
+        name: value for name, value in pragmas.items()
+        if value not in (None, '')
+    }
+
+
+def set_sqlite_pragmas(engine: AsyncEngine, pragmas: Dict[str, Any]) -> None:
+    """Выполняет прагмы при каждом новом соединении движка."""
+    @event.listens_for(engine.sync_engine, 'connect')
+    def apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name}={value}')
+        cursor.close()
+
+
+def build_engine(
+        config: Settings = settings,
+        url: Optional[str] = None,
+        read_only: bool = False,
+) -> AsyncEngine:
+    """Создаёт движок по профилю соединений из настроек.
+
+    Для SQLite прагмы (журнал WAL, `synchronous`, размер кэша,
+    `mmap_size`, `busy_timeout`) применяются к каждому соединению.
+    Движок чтения `read_only` режим журнала не меняет.
+    """
+    engine = create_async_engine(
+        url or config.database_url, **engine_options(config)
+    )
+    if engine.dialect.name == 'sqlite':
+        pragmas = sqlite_pragmas(config)
+        if read_only:
+            pragmas.pop('journal_mode', None)
+        set_sqlite_pragmas(engine, pragmas)
+    return engine
+
+
+def read_database_url(config: Settings = settings) -> Optional[str]:
+    """Адрес базы для движка чтения.
+
+    Это `read_replica_url`, а без него для файла SQLite — тот же файл,
+    открытый только на чтение (`mode=ro`). `None` означает, что чтение
+    идёт через движок записи.
+    """
+    if config.read_replica_url:
+        return config.read_replica_url
+    url = make_url(config.database_url)
+    if (
+        not config.sqlite_read_only_reads or
+        url.get_backend_name() != 'sqlite' or
+        url.database in (None, '', ':memory:') or
+        url.database.startswith('file:')
+    ):
+        return None
+    return str(url.set(
+        database=f'file:{url.database}',
+        query=dict(url.query, mode='ro', uri='true'),
+    ))
+
+
+REPLICA_SESSION_KEY = 'replica'
+
+
+def reads_replica(session: AsyncSession) -> bool:
+    """Читает ли сессия отстающую реплику `read_replica_url`.
+
+    Версии моделей в памяти процесса описывают основную базу, поэтому
+    прочитанное с реплики нельзя сохранять в кэш под текущей версией.
+    Файл SQLite, открытый только на чтение, репликой не считается.
+    """
+    return session.info.get(REPLICA_SESSION_KEY, False)
+
+
+class RecentWrites:
+    """Пользователи, недавно изменившие данные.
+
+    Их запросы на чтение идут через движок записи в течение `window`
+    секунд, чтобы пользователь сразу видел свои изменения даже
+    при отстающей реплике.
+    """
+
+    def __init__(self, window: float = settings.read_your_writes_window):
+        """Инициализация пустого журнала записей."""
+        self.window = window
+        self._deadlines: OrderedDict = OrderedDict()
+
+    def mark(self, user_id: int) -> None:
+        """Отметить запись пользователя и удалить устаревшие отметки."""
+        now = time.monotonic()
+        self._deadlines[user_id] = now + self.window
+        self._deadlines.move_to_end(user_id)
+        while next(iter(self._deadlines.values())) < now:
+            self._deadlines.popitem(last=False)
+
+    def clear(self) -> None:
+        """Удалить все отметки."""
+        self._deadlines.clear()
+
+    def is_recent(self, user_id: int) -> bool:
+        """Изменял ли пользователь данные в течение `window` секунд."""
+        deadline = self._deadlines.get(user_id)
+        return deadline is not None and deadline >= time.monotonic()
+
+
+class QueryStats:
+    """Число, суммарное время и самый долгий из SQL-запросов.
+
+    Собирается для одного HTTP-запроса через `query_stats`.
+    """
+
+    __slots__ = ('count', 'duration', 'slowest', 'slowest_duration')
+
+    def __init__(self):
+        """Инициализация пустой статистики."""
+        self.count = 0
+        self.duration = 0.0
+        self.slowest: Optional[str] = None
+        self.slowest_duration = 0.0
+
+    def add(self, statement: str, duration: float) -> None:
+        """Учесть выполненный запрос."""
+        self.count += 1
+        self.duration += duration
+        if duration >= self.slowest_duration:
+            self.slowest = statement
+            self.slowest_duration = duration
+
+    def server_timing(self) -> str:
+        """Значение заголовка `Server-Timing` в миллисекундах."""
+        return (
+            f'db;dur={self.duration * 1000:.3f};desc="{self.count} queries"'
+        )
+
+
+query_stats: ContextVar[Optional[QueryStats]] = ContextVar(
+    'query_stats', default=None
+)
+QUERY_STARTED_KEY = 'query_started'
+
+
+def track_queries(engine: AsyncEngine) -> None:
+    """Учитывает запросы движка в статистике текущего HTTP-запроса.
+
+    Статистика передаётся через `query_stats`; вне HTTP-запроса
+    запросы не учитываются. Медленные запросы передаются
+    в `slow_query_log`.
+    """
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, 'before_cursor_execute')
+    def start_query_timer(conn, cursor, statement, *args):
+        conn.info.setdefault(QUERY_STARTED_KEY, []).append(
+            time.perf_counter()
+        )
+
+    @event.listens_for(sync_engine, 'after_cursor_execute')
+    def stop_query_timer(
+            conn, cursor, statement, parameters, context, executemany
+    ):
+        duration = time.perf_counter() - conn.info[QUERY_STARTED_KEY].pop()
+        stats = query_stats.get()
+        if stats is not None:
+            stats.add(statement, duration)
+        slow_query_log.check(
+            conn, statement, parameters, executemany, duration
+        )
+
+
+DB_POOL_CHECKED_OUT = Gauge(
+    'db_pool_checked_out',
+    'Число соединений, выданных пулом движка.',
+    ('engine',),
+)
+pool_engines: Dict[str, AsyncEngine] = {}
+
+
+def collect_pool_overflow() -> Dict[tuple, float]:
+    """Число соединений сверх `pool_size` для пулов с ограничением."""
+    return {
+        (name,): pool_engine.pool.overflow()
+        for name, pool_engine in pool_engines.items()
+        if hasattr(pool_engine.pool, 'overflow')
+    }
+
+
+DB_POOL_OVERFLOW = Gauge(
+    'db_pool_overflow',
+    'Число соединений пула сверх pool_size.',
+    ('engine',),
+    collect=collect_pool_overflow,
+)
+
+
+def track_pool(engine: AsyncEngine, name: str) -> None:
+    """Учитывает соединения пула движка в метриках под именем `name`."""
+    pool_engines[name] = engine
+    DB_POOL_CHECKED_OUT.set(0, engine=name)
+
+    @event.listens_for(engine.sync_engine, 'checkout')
+    def count_checkout(*args):
+        DB_POOL_CHECKED_OUT.inc(engine=name)
+
+    @event.listens_for(engine.sync_engine, 'checkin')
+    def count_checkin(*args):
+        DB_POOL_CHECKED_OUT.dec(engine=name)
+
+
+engine = build_engine()
+AsyncSessionLocal = sessionmaker(
+    engine, class_=AsyncSession, expire_on_commit=False
+)
+read_url = read_database_url()
+read_engine = (
+    build_engine(url=read_url, read_only=True) if read_url else engine
+)
+AsyncReadSessionLocal = sessionmaker(
+    read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+    info={REPLICA_SESSION_KEY: bool(settings.read_replica_url)},
+)
+recent_writes = RecentWrites()
+track_queries(engine)
+track_pool(engine, 'write')
+if read_engine is not engine:
+    track_queries(read_engine)
+    track_pool(read_engine, 'read')
 
 
 async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
@@ -48,3 +318,13 @@ async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
     """
     async with AsyncSessionLocal() as async_session:
         yield async_session
+
+
+async def get_read_session() -> AsyncGenerator[AsyncSession, None]:
+    """Получение сессии для запросов только на чтение.
+
+    Сессия работает через движок чтения со своим пулом соединений,
+    поэтому долгие выборки не занимают соединения пути записи.
+    """
+    async with AsyncReadSessionLocal() as async_session:
+        yield async_session
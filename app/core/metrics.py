@@ -0,0 +1,246 @@
+import math
+from bisect import bisect_left
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+PROMETHEUS_MEDIA_TYPE = 'text/plain; version=0.0.4'
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+SIZE_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+Labels = Tuple[str, ...]
+Sample = Tuple[str, Dict[str, str], float]
+
+
+def format_value(value: float) -> str:
+    """Значение метрики в текстовом формате Prometheus."""
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(float(value))
+
+
+def escape_label(value: str) -> str:
+    """Экранирует значение метки."""
+    return (
+        value.replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"')
+    )
+
+
+class Metric:
+    """Метрика с набором меток в реестре процесса.
+
+    Значения хранятся в словаре по кортежу значений меток. Приложение
+    работает в одном цикле asyncio, поэтому блокировки не используются.
+    """
+
+    type = 'untyped'
+
+    def __init__(
+            self,
+            name: str,
+            documentation: str,
+            labelnames: Sequence[str] = (),
+            registry: Optional['MetricsRegistry'] = None,
+    ):
+        """Инициализация и регистрация метрики."""
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Labels, float] = {}
+        (registry or metrics_registry).register(self)
+
+    def _key(self, labels: Dict[str, str]) -> Labels:
+        """Кортеж значений меток в порядке `labelnames`."""
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f'Метрика {self.name} ожидает метки {self.labelnames}'
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def value(self, **labels) -> float:
+        """Текущее значение для набора меток."""
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> Iterator[Sample]:
+        """Отсчёты метрики для вывода."""
+        for key, value in self._values.items():
+            yield self.name, dict(zip(self.labelnames, key)), value
+
+
+class Counter(Metric):
+    """Монотонно возрастающий счётчик."""
+
+    type = 'counter'
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        """Увеличить счётчик."""
+        if amount < 0:
+            raise ValueError('Счётчик не может уменьшаться')
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    """Текущее значение величины.
+
+    Если передана функция `collect`, значения вычисляются при каждом
+    выводе: функция возвращает словарь значений по кортежам меток.
+    """
+
+    type = 'gauge'
+
+    def __init__(
+            self,
+            name: str,
+            documentation: str,
+            labelnames: Sequence[str] = (),
+            registry: Optional['MetricsRegistry'] = None,
+            collect: Optional[Callable[[], Dict[Labels, float]]] = None,
+    ):
+        """Инициализация и регистрация метрики."""
+        super().__init__(name, documentation, labelnames, registry)
+        self._collect = collect
+
+    def set(self, value: float, **labels) -> None:
+        """Установить значение."""
+        self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        """Увеличить значение."""
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        """Уменьшить значение."""
+        self.inc(-amount, **labels)
+
+    def value(self, **labels) -> float:
+        """Текущее значение для набора меток."""
+        if self._collect is not None:
+            return self._collect().get(self._key(labels), 0)
+        return super().value(**labels)
+
+    def samples(self) -> Iterator[Sample]:
+        """Отсчёты метрики для вывода."""
+        if self._collect is None:
+            yield from super().samples()
+            return
+        for key, value in self._collect().items():
+            yield self.name, dict(zip(self.labelnames, key)), value
+
+
+class Histogram(Metric):
+    """Распределение наблюдаемых значений по корзинам."""
+
+    type = 'histogram'
+
+    def __init__(
+            self,
+            name: str,
+            documentation: str,
+            labelnames: Sequence[str] = (),
+            registry: Optional['MetricsRegistry'] = None,
+            buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        """Инициализация и регистрация метрики."""
+        super().__init__(name, documentation, labelnames, registry)
+        self.buckets = tuple(sorted(buckets))
+        self._buckets: Dict[Labels, List[int]] = {}
+        self._sums: Dict[Labels, float] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        """Учесть наблюдение.
+
+        В корзине хранится число наблюдений, попавших именно в неё,
+        накопленные суммы считаются при выводе.
+        """
+        key = self._key(labels)
+        counts = self._buckets.get(key)
+        if counts is None:
+            counts = self._buckets[key] = [0] * (len(self.buckets) + 1)
+            self._sums[key] = 0
+        counts[bisect_left(self.buckets, value)] += 1
+        self._sums[key] += value
+
+    def value(self, **labels) -> float:
+        """Число наблюдений для набора меток."""
+        return sum(self._buckets.get(self._key(labels), ()))
+
+    def samples(self) -> Iterator[Sample]:
+        """Отсчёты корзин, суммы и числа наблюдений."""
+        for key, counts in self._buckets.items():
+            labels = dict(zip(self.labelnames, key))
+            total = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                total += count
+                yield (
+                    f'{self.name}_bucket',
+                    dict(labels, le=format_value(bound)),
+                    total,
+                )
+            yield f'{self.name}_sum', labels, self._sums[key]
+            yield f'{self.name}_count', labels, total
+
+
+class MetricsRegistry:
+    """Реестр метрик процесса с выводом в текстовом формате Prometheus."""
+
+    def __init__(self):
+        """Инициализация пустого реестра."""
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> None:
+        """Добавить метрику; имена метрик уникальны."""
+        if metric.name in self._metrics:
+            raise ValueError(f'Метрика {metric.name} уже зарегистрирована')
+        self._metrics[metric.name] = metric
+
+    def render(self) -> str:
+        """Все метрики в текстовом формате Prometheus."""
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.type}')
+            for name, labels, value in metric.samples():
+                if labels:
+                    label_text = ','.join(
+                        f'{label}="{escape_label(label_value)}"'
+                        for label, label_value in labels.items()
+                    )
+                    name = f'{name}{{{label_text}}}'
+                lines.append(f'{name} {format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+metrics_registry = MetricsRegistry()
+
+HTTP_REQUESTS = Counter(
+    'http_requests_total',
+    'Число HTTP-запросов по маршруту и коду ответа.',
+    ('method', 'route', 'status'),
+)
+HTTP_REQUEST_DURATION = Histogram(
+    'http_request_duration_seconds',
+    'Время обработки HTTP-запроса в секундах.',
+    ('method', 'route'),
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    'http_requests_in_progress',
+    'Число HTTP-запросов в обработке.',
+    ('method', 'route'),
+)
+ALLOCATION_DONATIONS = Counter(
+    'allocation_donations_allocated_total',
+    'Число пожертвований, получивших или отдавших средства '
+    'при распределении.',
+)
+ALLOCATION_PROJECTS_CLOSED = Counter(
+    'allocation_projects_closed_total',
+    'Число проектов, закрытых при распределении.',
+)
+ALLOCATION_ITEMS_SCANNED = Histogram(
+    'allocation_items_scanned',
+    'Число открытых объектов, просмотренных за одно распределение.',
+    ('engine',),
+    buckets=SIZE_BUCKETS,
+)
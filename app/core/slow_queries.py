@@ -0,0 +1,164 @@
+import logging
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from itertools import groupby
+from typing import Any, List, Optional
+
+from app.core.config import Constant, settings
+
+PLANNED_STATEMENTS = ('SELECT', 'UPDATE', 'DELETE', 'WITH')
+
+slow_query_source: ContextVar[Optional[str]] = ContextVar(
+    'slow_query_source', default=None
+)
+slow_query_logger = logging.getLogger(Constant.SLOW_QUERY_LOGGER)
+
+
+@contextmanager
+def slow_query_scope(source: str):
+    """Отмечает запросы внутри блока `with` источником `source`.
+
+    Нужен там, где декоратор неприменим, например в асинхронных
+    генераторах: метка не должна оставаться установленной между `yield`.
+    """
+    token = slow_query_source.set(source)
+    try:
+        yield
+    finally:
+        slow_query_source.reset(token)
+
+
+def capture_slow_queries(func):
+    """Отмечает запросы корутины `func` для журнала медленных запросов.
+
+    Источником запроса в журнале служит полное имя функции.
+    """
+    source = func.__qualname__
+
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        with slow_query_scope(source):
+            return await func(*args, **kwargs)
+
+    return wrapper
+
+
+def parameter_shapes(parameters: Any, executemany: bool = False) -> str:
+    """Типы параметров запроса без их значений.
+
+    Подряд идущие параметры одного типа сворачиваются: `int x 3`.
+    """
+    if executemany:
+        if not parameters:
+            return '[]'
+        return (
+            f'{len(parameters)} x {parameter_shapes(parameters[0])}'
+        )
+    if isinstance(parameters, dict):
+        return '{' + ', '.join(
+            f'{name}: {type(value).__name__}'
+            for name, value in parameters.items()
+        ) + '}'
+    shapes = []
+    for name, group in groupby(type(value).__name__ for value in parameters):
+        count = len(list(group))
+        shapes.append(name if count == 1 else f'{name} x {count}')
+    return '(' + ', '.join(shapes) + ')'
+
+
+def explain(conn, statement: str, parameters: Any) -> List[str]:
+    """План выполнения запроса на том же соединении.
+
+    Для SQLite используется `EXPLAIN QUERY PLAN`, для остальных
+    диалектов — `EXPLAIN`.
+    """
+    prefix = (
+        'EXPLAIN QUERY PLAN ' if conn.dialect.name == 'sqlite' else 'EXPLAIN '
+    )
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute(prefix + statement, parameters)
+        return [str(row[-1]) for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+
+
+class SlowQueryLog:
+    """Журнал запросов дольше `slow_query_threshold` секунд.
+
+    Учитываются только запросы, выполненные внутри функций,
+    отмеченных `capture_slow_queries`. Один и тот же SQL записывается
+    не чаще раза в `slow_query_log_interval` секунд, пропущенные
+    повторы подсчитываются; помнятся последние `max_statements`
+    запросов.
+    """
+
+    def __init__(self, max_statements: int = 1024):
+        """Инициализация журнала."""
+        self.max_statements = max_statements
+        self._captures: OrderedDict = OrderedDict()
+
+    def clear(self) -> None:
+        """Забыть время записи всех запросов."""
+        self._captures.clear()
+
+    def _allow(self, statement: str) -> Optional[int]:
+        """Число пропущенных повторов или `None`, если запись рано."""
+        now = time.monotonic()
+        capture = self._captures.get(statement)
+        if (
+            capture is not None and
+            now - capture[0] < settings.slow_query_log_interval
+        ):
+            capture[1] += 1
+            return None
+        skipped = capture[1] if capture is not None else 0
+        self._captures[statement] = [now, 0]
+        self._captures.move_to_end(statement)
+        while len(self._captures) > self.max_statements:
+            self._captures.popitem(last=False)
+        return skipped
+
+    def check(
+            self,
+            conn,
+            statement: str,
+            parameters: Any,
+            executemany: bool,
+            duration: float,
+    ) -> None:
+        """Записывает запрос в журнал, если он медленный."""
+        threshold = settings.slow_query_threshold
+        if threshold is None or duration < threshold:
+            return
+        source = slow_query_source.get()
+        if source is None:
+            return
+        skipped = self._allow(statement)
+        if skipped is None:
+            return
+        if executemany or not statement.lstrip().upper().startswith(
+            PLANNED_STATEMENTS
+        ):
+            plan = []
+        else:
+            try:
+                plan = explain(conn, statement, parameters)
+            except Exception as error:
+                plan = [f'план недоступен: {error}']
+        slow_query_logger.warning(
+            'Медленный запрос %s: %.1f мс, пропущено повторов %d\n'
+            'SQL: %s\nПараметры: %s\nПлан:\n%s',
+            source,
+            duration * 1000,
+            skipped,
+            statement,
+            parameter_shapes(parameters, executemany),
+            '\n'.join(f'  {detail}' for detail in plan) or '  -',
+        )
+
+
+slow_query_log = SlowQueryLog()
@@ -1,21 +1,36 @@
-from typing import Optional, List, Type, TypeVar
+from datetime import datetime
+from typing import Optional, List, Sequence, Type, TypeVar
 
 from fastapi.encoders import jsonable_encoder
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.slow_queries import capture_slow_queries
+from app.crud.cache import mark_changed
+from app.crud.pagination import (
+    CURSOR_COLUMNS,
+    Page,
+    decode_cursor,
+    encode_cursor,
+    keyset_after,
+)
 from app.models.user import User
 
 T = TypeVar('T')  # Тип для модели
 
 
 class CRUDBase:
-    """Базовый класс для операций CRUD с моделью."""
+    """Базовый класс для операций CRUD с моделью.
+
+    Медленные запросы методов попадают в журнал медленных запросов,
+    см. `capture_slow_queries`.
+    """
 
     def __init__(self, model: Type[T]):
         """Инициализация CRUDBase."""
         self.model = model
 
+    @capture_slow_queries
     async def get_multi(
             self,
             session: AsyncSession
@@ -24,22 +39,114 @@ class CRUDBase:
         db_objs = await session.execute(select(self.model))
         return db_objs.scalars().all()
 
+    def filter_query(
+            self,
+            query,
+            fully_invested: Optional[bool] = None,
+            create_date_from: Optional[datetime] = None,
+            create_date_to: Optional[datetime] = None,
+            close_date_from: Optional[datetime] = None,
+            close_date_to: Optional[datetime] = None,
+    ):
+        """Добавить к запросу фильтры по статусу и диапазонам дат.
+
+        Границы диапазонов включаются, незаданные фильтры пропускаются.
+        """
+        if fully_invested is not None:
+            query = query.where(self.model.fully_invested == fully_invested)
+        if create_date_from is not None:
+            query = query.where(self.model.create_date >= create_date_from)
+        if create_date_to is not None:
+            query = query.where(self.model.create_date <= create_date_to)
+        if close_date_from is not None:
+            query = query.where(self.model.close_date >= close_date_from)
+        if close_date_to is not None:
+            query = query.where(self.model.close_date <= close_date_to)
+        return query
+
+    @capture_slow_queries
+    async def get_page(
+            self,
+            session: AsyncSession,
+            limit: Optional[int] = None,
+            cursor: Optional[str] = None,
+            condition=None,
+            columns: Optional[Sequence[str]] = None,
+            **filters,
+    ) -> Page:
+        """Получить страницу объектов в порядке (`create_date`, `id`).
+
+        Пагинация keyset: `cursor` указывает на последний объект
+        предыдущей страницы, поэтому стоимость запроса не зависит
+        от номера страницы. Без `limit` возвращаются все оставшиеся
+        объекты. `condition` дополнительно сужает выборку, `filters`
+        передаются в `filter_query`.
+
+        С `columns` выбираются только эти колонки, и страница содержит
+        кортежи значений в том же порядке вместо ORM-объектов; колонки
+        курсора, если их нет в `columns`, добавляются в конец кортежа.
+        """
+        if columns is None:
+            query = select(self.model)
+        else:
+            query = select(*(
+                getattr(self.model, column) for column in (
+                    *columns,
+                    *(key for key in CURSOR_COLUMNS if key not in columns),
+                )
+            ))
+        if condition is not None:
+            query = query.where(condition)
+        query = self.filter_query(query, **filters)
+        if cursor is not None:
+            query = query.where(keyset_after(
+                self.model, *decode_cursor(cursor)
+            ))
+        query = query.order_by(self.model.create_date, self.model.id)
+        if limit is not None:
+            query = query.limit(limit + 1)
+        result = await session.execute(query)
+        items = result.scalars().all() if columns is None else result.all()
+        if limit is None or len(items) <= limit:
+            return Page(items, None)
+        items = items[:limit]
+        last = items[-1]
+        return Page(items, encode_cursor(last.create_date, last.id))
+
+    @capture_slow_queries
     async def create(
             self,
             obj_in: T,
             session: AsyncSession,
             user: Optional[User] = None,
+            commit: bool = True,
     ) -> T:
-        """Создать новый объект в базе данных."""
+        """Создать новый объект в базе данных.
+
+        При `commit=False` объект только добавляется в сессию,
+        а запись и фиксацию транзакции выполняет вызывающий код.
+        """
         obj_in_data = obj_in.dict()
         if user is not None:
             obj_in_data['user_id'] = user.id
         db_obj = self.model(**obj_in_data)
         session.add(db_obj)
-        await session.commit()
-        await session.refresh(db_obj)
+        mark_changed(session, self.model)
+        await self._save(db_obj, session, commit)
         return db_obj
 
+    @staticmethod
+    async def _save(
+            db_obj: T,
+            session: AsyncSession,
+            commit: bool,
+    ) -> None:
+        """Зафиксировать транзакцию и перечитать объект."""
+        if commit:
+            await session.commit()
+            await session.refresh(db_obj)
+
+    @capture_slow_queries
     async def get_by_kwargs(
             self,
             session: AsyncSession,
@@ -58,6 +165,7 @@ class CRUDBaseAdvanced(CRUDBase):
     Наследуется от `CRUDBase`.
     """
 
+    @capture_slow_queries
     async def get(
             self,
             obj_id: int,
@@ -71,13 +179,19 @@ class CRUDBaseAdvanced(CRUDBase):
         )
         return db_obj.scalars().first()
 
+    @capture_slow_queries
     async def update(
             self,
             db_obj: T,
             obj_in: T,
             session: AsyncSession,
+            commit: bool = True,
     ) -> T:
-        """Обновить объект в базе данных."""
+        """Обновить объект в базе данных.
+
+        При `commit=False` изменения остаются в сессии до фиксации
+        транзакции вызывающим кодом.
+        """
         obj_data = jsonable_encoder(db_obj)
         update_data = obj_in.dict(exclude_unset=True)
 
@@ -85,10 +199,11 @@ class CRUDBaseAdvanced(CRUDBase):
             if field in update_data:
                 setattr(db_obj, field, update_data[field])
         session.add(db_obj)
-        await session.commit()
-        await session.refresh(db_obj)
+        mark_changed(session, self.model, [db_obj.id])
+        await self._save(db_obj, session, commit)
         return db_obj
 
+    @capture_slow_queries
     async def remove(
             self,
             db_obj: T,
@@ -96,5 +211,6 @@ class CRUDBaseAdvanced(CRUDBase):
     ) -> T:
         """Удалить объект из базы данных."""
         await session.delete(db_obj)
+        mark_changed(session, self.model, [db_obj.id])
         await session.commit()
         return db_obj
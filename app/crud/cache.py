@@ -0,0 +1,315 @@
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import (
+    Any,
+    Dict,
+    Hashable,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+)
+
+from sqlalchemy import event, inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from app.core.config import settings
+from app.core.db import reads_replica
+from app.crud.pagination import Page
+
+LIST_KEY = 'list'
+INVALIDATIONS_KEY = 'cache_invalidations'
+
+
+class CacheBackend(ABC):
+    """Интерфейс хранилища кэша.
+
+    Значение `None` означает промах, поэтому `None` не кэшируется.
+    Внешнее хранилище реализует те же методы; наследник без любого
+    из них не может быть создан.
+    """
+
+    @abstractmethod
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Получить значение по ключу."""
+
+    @abstractmethod
+    def set(self, key: Hashable, value: Any) -> None:
+        """Сохранить значение по ключу."""
+
+    @abstractmethod
+    def delete(self, key: Hashable) -> None:
+        """Удалить значение по ключу."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Удалить все значения."""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Количество сохранённых значений."""
+
+
+class LRUCacheBackend(CacheBackend):
+    """Хранилище в памяти процесса с вытеснением LRU и сроком жизни."""
+
+    def __init__(
+            self,
+            max_size: int = settings.cache_max_size,
+            ttl: float = settings.cache_ttl,
+    ):
+        """Инициализация хранилища."""
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data: OrderedDict = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Получить значение, если срок его жизни не истёк."""
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Сохранить значение, вытеснив самое старое при переполнении."""
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        """Удалить значение по ключу."""
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Удалить все значения."""
+        self._data.clear()
+
+    def __len__(self) -> int:
+        """Количество сохранённых значений."""
+        return len(self._data)
+
+
+class ModelCache:
+    """Кэш строк одной модели со счётчиками попаданий и промахов.
+
+    В кэше хранятся словари значений колонок, а не ORM-объекты,
+    поэтому значения не привязаны к сессии.
+    """
+
+    def __init__(self, model, backend: Optional[CacheBackend] = None):
+        """Инициализация кэша и регистрация его для инвалидации."""
+        self.model = model
+        self.backend = backend or LRUCacheBackend()
+        self.hits = 0
+        self.misses = 0
+        model_caches[model] = self
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Получить значение с учётом статистики."""
+        if not settings.cache_enabled:
+            return None
+        value = self.backend.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Сохранить значение."""
+        if settings.cache_enabled:
+            self.backend.set(key, value)
+
+    def fill(
+            self,
+            key: Hashable,
+            value: Any,
+            version: Optional[int],
+    ) -> None:
+        """Сохранить прочитанное из базы значение, если оно не устарело.
+
+        `version` — версия модели, взятая до чтения из базы
+        (см. `read_version`). Если за время чтения зафиксирована запись,
+        её сброс кэша уже выполнен, и сохранение прочитанных до неё данных
+        вернуло бы их в кэш до истечения срока жизни; такое значение
+        не сохраняется. Без версии значение тоже не сохраняется.
+        """
+        if version is not None and version == get_version(self.model):
+            self.set(key, value)
+
+    def invalidate(self, ids: Optional[Iterable[Hashable]]) -> None:
+        """Сбросить список и значения по ключам `ids`.
+
+        Ключами служат ID объектов или другие ключи кэша модели.
+        `ids=None` сбрасывает весь кэш модели.
+        """
+        if ids is None:
+            self.backend.clear()
+            return
+        self.backend.delete(LIST_KEY)
+        for obj_id in ids:
+            self.backend.delete(obj_id)
+
+    def clear(self) -> None:
+        """Сбросить кэш и статистику."""
+        self.backend.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Статистика кэша."""
+        return dict(hits=self.hits, misses=self.misses, size=len(self.backend))
+
+    def to_row(self, db_obj) -> Dict[str, Any]:
+        """Значения колонок объекта."""
+        return {
+            attr.key: getattr(db_obj, attr.key)
+            for attr in inspect(self.model).column_attrs
+        }
+
+
+model_caches: Dict[type, ModelCache] = {}
+model_versions: Dict[type, int] = {}
+
+
+def get_version(model) -> int:
+    """Номер версии данных модели в этом процессе.
+
+    Увеличивается после каждой фиксации транзакции, изменившей модель
+    через `mark_changed`.
+    """
+    return model_versions.get(model, 0)
+
+
+def read_version(model, session: AsyncSession) -> Optional[int]:
+    """Версия модели для данных, которые будут прочитаны в `session`.
+
+    Для сессии реплики версия неизвестна: реплика может отставать
+    от записей, уже учтённых в версии, поэтому возвращается `None`.
+    """
+    if reads_replica(session):
+        return None
+    return get_version(model)
+
+
+def mark_changed(
+        session: AsyncSession,
+        model,
+        ids: Optional[Iterable[Hashable]] = (),
+) -> None:
+    """Запланировать сброс кэша модели после фиксации транзакции.
+
+    Список объектов сбрасывается всегда, объекты и другие
+    значения — по ключам `ids`;
+    `ids=None` сбрасывает весь кэш модели. После фиксации также
+    увеличивается версия модели. При откате транзакции план отменяется.
+    """
+    invalidations = session.info.setdefault(INVALIDATIONS_KEY, {})
+    if ids is None or invalidations.get(model, ()) is None:
+        invalidations[model] = None
+    else:
+        invalidations.setdefault(model, set()).update(ids)
+
+
+@event.listens_for(Session, 'after_commit')
+def apply_invalidations(session: Session) -> None:
+    """Сбросить кэши и увеличить версии изменённых моделей."""
+    for model, ids in session.info.pop(INVALIDATIONS_KEY, {}).items():
+        model_versions[model] = get_version(model) + 1
+        cache = model_caches.get(model)
+        if cache is not None:
+            cache.invalidate(ids)
+
+
+@event.listens_for(Session, 'after_rollback')
+def discard_invalidations(session: Session) -> None:
+    """Отменить сброс кэшей при откате транзакции."""
+    session.info.pop(INVALIDATIONS_KEY, None)
+
+
+class CachedCRUDMixin:
+    """Кэширование `get` и `get_multi` для наследников `CRUDBase`.
+
+    Полный список без фильтров в `get_page` также берётся из кэша.
+    Записи через `create`, `update`, `remove` и распределение средств
+    сбрасывают кэш после фиксации транзакции, см. `mark_changed`;
+    прочитанное из базы сохраняется через `ModelCache.fill`.
+    """
+
+    def __init__(self, model, backend: Optional[CacheBackend] = None):
+        """Инициализация CRUD с кэшем модели."""
+        super().__init__(model)
+        self.cache = ModelCache(model, backend)
+
+    async def get(
+            self,
+            obj_id: int,
+            session: AsyncSession,
+            use_cache: bool = True,
+    ):
+        """Получить объект по ID из кэша или базы.
+
+        Объект из кэша присоединяется к сессии без запроса к базе.
+        Для проверок перед записью следует передавать `use_cache=False`.
+        """
+        row = self.cache.get(obj_id) if use_cache else None
+        if row is None:
+            version = read_version(self.model, session)
+            db_obj = await super().get(obj_id, session)
+            if db_obj is not None:
+                self.cache.fill(obj_id, self.cache.to_row(db_obj), version)
+            return db_obj
+        db_obj = self.model(**row)
+        make_transient_to_detached(db_obj)
+        return await session.merge(db_obj, load=False)
+
+    async def get_multi(self, session: AsyncSession) -> List:
+        """Получить все объекты в порядке (`create_date`, `id`).
+
+        Объекты из кэша не привязаны к сессии и предназначены
+        только для чтения.
+        """
+        rows = self.cache.get(LIST_KEY)
+        if rows is None:
+            version = read_version(self.model, session)
+            db_objs = (await super().get_page(session)).items
+            self.cache.fill(
+                LIST_KEY,
+                [self.cache.to_row(db_obj) for db_obj in db_objs],
+                version,
+            )
+            return db_objs
+        return [self.model(**row) for row in rows]
+
+    async def get_page(
+            self,
+            session: AsyncSession,
+            limit: Optional[int] = None,
+            cursor: Optional[str] = None,
+            condition=None,
+            columns: Optional[Sequence[str]] = None,
+            **filters,
+    ) -> Page:
+        """Получить страницу объектов; полный список — из кэша."""
+        if (
+            limit is None and cursor is None and condition is None and
+            columns is None and
+            all(value is None for value in filters.values())
+        ):
+            return Page(await self.get_multi(session), None)
+        return await super().get_page(
+            session,
+            limit=limit,
+            cursor=cursor,
+            condition=condition,
+            columns=columns,
+            **filters,
+        )
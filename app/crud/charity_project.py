@@ -1,24 +1,41 @@
 from typing import Optional
+
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
 from app.crud.base import CRUDBaseAdvanced
+from app.crud.cache import CachedCRUDMixin
 from app.models.charity_project import CharityProject
 
 
-class CRUDCharityProject(CRUDBaseAdvanced):
+class CRUDCharityProject(CachedCRUDMixin, CRUDBaseAdvanced):
     """Класс для работы с операциями CRUD.
 
     Наследуется от CRUDBaseAdvanced и предоставляет дополнительные методы
-    для работы с проектами.
+    для работы с проектами. Чтение `get` и `get_multi` кэшируется.
     """
 
     async def get_project_id_by_name(
             self,
             project_name: str,
             session: AsyncSession,
-    ) -> Optional[CharityProject]:
-        """Поиск по имени с использованием общего метода."""
-        return await self.get_by_kwargs(session, name=project_name)
+    ) -> Optional[int]:
+        """Поиск ID проекта по имени.
+
+        При `project_name_case_insensitive` имя сравнивается без учёта
+        регистра, как и в уникальном индексе `uq_charityproject_name_lower`.
+        """
+        if settings.project_name_case_insensitive:
+            condition = (
+                func.lower(self.model.name) == func.lower(project_name)
+            )
+        else:
+            condition = self.model.name == project_name
+        project_id = await session.execute(
+            select(self.model.id).where(condition)
+        )
+        return project_id.scalars().first()
 
 
 charity_project_crud = CRUDCharityProject(CharityProject)
@@ -1,18 +1,81 @@
-from typing import List, Optional
+from typing import Hashable, Iterable, List, Optional, Sequence
 
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.slow_queries import capture_slow_queries
 from app.crud.base import CRUDBase
+from app.crud.cache import (
+    CacheBackend,
+    ModelCache,
+    mark_changed,
+    read_version,
+)
+from app.crud.pagination import Page
 from app.models import Donation, User
 
+USER_PAGE_KEY = 'user_page'
+
+
+def user_page_key(user_id: int) -> Hashable:
+    """Ключ кэша первой страницы пожертвований пользователя."""
+    return USER_PAGE_KEY, user_id
+
+
+def mark_users_changed(
+        session: AsyncSession,
+        user_ids: Iterable[Optional[int]],
+) -> None:
+    """Запланировать сброс первых страниц пожертвований пользователей."""
+    mark_changed(session, Donation, [
+        user_page_key(user_id) for user_id in user_ids
+        if user_id is not None
+    ])
+
 
 class CRUDDonation(CRUDBase):
     """Класс для работы с операциями CRUD для пожертвований.
 
     Наследуется от CRUDBase и предоставляет дополнительные методы
-    для работы с пожертвованиями.
+    для работы с пожертвованиями. Первая страница пожертвований
+    пользователя кэшируется и сбрасывается только при создании
+    или распределении его пожертвований, см. `mark_users_changed`.
     """
 
+    def __init__(self, model, backend: Optional[CacheBackend] = None):
+        """Инициализация CRUD с кэшем страниц пользователей."""
+        super().__init__(model)
+        self.cache = ModelCache(model, backend)
+
+    async def create(
+            self,
+            obj_in,
+            session: AsyncSession,
+            user: Optional[User] = None,
+            commit: bool = True,
+    ) -> Donation:
+        """Создать пожертвование и сбросить первую страницу его автора."""
+        if user is not None:
+            mark_users_changed(session, [user.id])
+        return await super().create(obj_in, session, user, commit)
+
+    @capture_slow_queries
+    async def exists(
+            self,
+            donation_id: int,
+            session: AsyncSession,
+            user: Optional[User] = None,
+    ) -> bool:
+        """Существует ли пожертвование.
+
+        Если передан пользователь, учитываются только его пожертвования.
+        """
+        query = select(self.model.id).where(self.model.id == donation_id)
+        if user is not None:
+            query = query.where(self.model.user_id == user.id)
+        found = await session.execute(query)
+        return found.scalars().first() is not None
+
     async def get_by_user(
             self,
             user: User,
@@ -25,5 +88,43 @@ class CRUDDonation(CRUDBase):
         """
         return await self.get_by_kwargs(session, user_id=user.id)
 
+    async def get_user_page(
+            self,
+            user: User,
+            session: AsyncSession,
+            limit: Optional[int] = None,
+            cursor: Optional[str] = None,
+            columns: Optional[Sequence[str]] = None,
+            **filters,
+    ) -> Page:
+        """Получить страницу пожертвований пользователя.
+
+        Параметры передаются в `get_page`. Первая страница без фильтров
+        с выборкой колонок `columns` берётся из кэша; в кэше пользователя
+        хранятся страницы для каждой пары `limit` и `columns`.
+        """
+        first_page = (
+            columns is not None and cursor is None and
+            all(value is None for value in filters.values())
+        )
+        key = user_page_key(user.id)
+        variant = (limit, tuple(columns or ()))
+        pages = self.cache.get(key) if first_page else None
+        if pages is not None and variant in pages:
+            return pages[variant]
+        version = read_version(self.model, session)
+        page = await self.get_page(
+            session,
+            limit=limit,
+            cursor=cursor,
+            condition=self.model.user_id == user.id,
+            columns=columns,
+            **filters,
+        )
+        if first_page:
+            page = Page([tuple(row) for row in page.items], page.next_cursor)
+            self.cache.fill(key, {**(pages or {}), variant: page}, version)
+        return page
+
 
 donation_crud = CRUDDonation(Donation)
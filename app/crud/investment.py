@@ -0,0 +1,50 @@
+from typing import List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.base import CRUDBase
+from app.models import Donation, Investment, User
+
+
+class CRUDInvestment(CRUDBase):
+    """Класс для работы с журналом распределения средств.
+
+    Наследуется от CRUDBase и предоставляет выборки вложений
+    по индексированным внешним ключам.
+    """
+
+    async def get_by_project(
+            self,
+            project_id: int,
+            session: AsyncSession,
+    ) -> List[Investment]:
+        """Получить все вложения в проект."""
+        db_objs = await session.execute(
+            select(Investment).where(
+                Investment.project_id == project_id
+            ).order_by(Investment.id)
+        )
+        return db_objs.scalars().all()
+
+    async def get_by_donation(
+            self,
+            donation_id: int,
+            session: AsyncSession,
+            user: Optional[User] = None,
+    ) -> List[Investment]:
+        """Получить все вложения пожертвования.
+
+        Если передан пользователь, возвращаются только вложения
+        его собственного пожертвования.
+        """
+        query = select(Investment).where(
+            Investment.donation_id == donation_id
+        ).order_by(Investment.id)
+        if user is not None:
+            query = query.join(Donation).where(Donation.user_id == user.id)
+        db_objs = await session.execute(query)
+        return db_objs.scalars().all()
+
+
+investment_crud = CRUDInvestment(Investment)
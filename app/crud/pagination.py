@@ -0,0 +1,56 @@
+import base64
+import binascii
+from datetime import datetime
+from typing import List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import literal, tuple_
+
+CURSOR_SEPARATOR = '|'
+CURSOR_COLUMNS = ('create_date', 'id')
+
+
+class Page(NamedTuple):
+    """Страница объектов и курсор следующей страницы.
+
+    `next_cursor` равен `None`, если страница последняя.
+    """
+
+    items: List
+    next_cursor: Optional[str]
+
+
+def encode_cursor(create_date: datetime, obj_id: int) -> str:
+    """Кодирует позицию (`create_date`, `id`) в непрозрачный курсор."""
+    raw = f'{create_date.isoformat()}{CURSOR_SEPARATOR}{obj_id}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Разбирает курсор, созданный `encode_cursor`.
+
+    Для повреждённого курсора выбрасывается `ValueError`.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(
+            cursor + '=' * (-len(cursor) % 4)
+        ).decode()
+        create_date, obj_id = raw.split(CURSOR_SEPARATOR)
+        return datetime.fromisoformat(create_date), int(obj_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError(f'Некорректный курсор: {cursor}')
+
+
+def keyset_after(model, create_date: datetime, obj_id: int):
+    """Условие «строго после позиции» в порядке (`create_date`, `id`).
+
+    Сравнение строк `(create_date, id) > (:create_date, :id)` планировщик
+    превращает в поиск по индексу (`SEARCH ... (create_date>?)`), тогда
+    как равносильное условие через `OR` читает индекс с начала,
+    и стоимость страницы росла бы с её номером. Значения позиции
+    связываются с типами колонок, чтобы дата записывалась в том же
+    формате, что и в таблице.
+    """
+    return tuple_(model.create_date, model.id) > tuple_(
+        literal(create_date, model.create_date.type),
+        literal(obj_id, model.id.type),
+    )
@@ -1,23 +1,45 @@
 import logging
+from http import HTTPStatus
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 
+from app.api.exceptions import DuplicateException
+from app.api.middleware import MetricsMiddleware, QueryStatsMiddleware
 from app.api.routers import main_router
 from app.core.config import configure_logging, settings
 from app.core.init_db import create_first_superuser
+from app.services.coordinator import allocation_coordinator
 
 app = FastAPI(title=settings.app_title)
 app.include_router(main_router)
+app.add_middleware(QueryStatsMiddleware)
+app.add_middleware(MetricsMiddleware)
+
+
+@app.exception_handler(DuplicateException)
+async def duplicate_exception_handler(
+        request: Request,
+        exc: DuplicateException,
+) -> JSONResponse:
+    """Отвечает 400 на нарушение ограничений базы при записи."""
+    return JSONResponse(
+        status_code=HTTPStatus.BAD_REQUEST,
+        content={'detail': str(exc)},
+    )
 
 
 @app.on_event('startup')
 async def startup():
     """Выполняет действия при запуске приложения.
 
-    Создает первого суперпользователя и настраивает логирование.
+    Создает первого суперпользователя, настраивает логирование
+    и при необходимости запускает очередь распределения средств.
     """
     await create_first_superuser()
     configure_logging()
+    if settings.allocation_queue_enabled:
+        await allocation_coordinator.start()
     logging.info('Сервис запущен')
 
 
@@ -25,6 +47,8 @@ async def startup():
 async def shutdown_event():
     """Выполняет действия при остановке приложения.
 
-    Логирует факт завершения работы сервиса.
+    Останавливает очередь распределения средств
+    и логирует факт завершения работы сервиса.
     """
+    await allocation_coordinator.stop()
     logging.info('Сервис остановлен')
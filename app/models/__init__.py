@@ -1,6 +1,7 @@
 """Инициализация моделей."""
 from .charity_project import CharityProject
 from .donation import Donation
+from .investment import Investment
 from .user import User
 
-__all__ = ['CharityProject', 'Donation', 'User']
+__all__ = ['CharityProject', 'Donation', 'Investment', 'User']
@@ -1,7 +1,17 @@
 from datetime import datetime
 
-from sqlalchemy import Boolean, CheckConstraint, Column, DateTime, Integer
+from sqlalchemy import (
+    Boolean,
+    CheckConstraint,
+    Column,
+    DateTime,
+    Index,
+    Integer,
+    text,
+)
+from sqlalchemy.orm import declared_attr
 
+from app.core.config import Constant
 from app.core.db import Base
 
 
@@ -13,13 +23,42 @@ class ProjectDonationBase(Base):
     """
 
     __abstract__ = True
-    __table_args__ = (
-        CheckConstraint('full_amount >= invested_amount'),
-    )
     full_amount = Column(Integer, CheckConstraint('full_amount > 0'),
                          nullable=False)
     invested_amount = Column(Integer, CheckConstraint('invested_amount >= 0'),
                              default=0, nullable=False)
     fully_invested = Column(Boolean, default=False, nullable=False)
-    create_date = Column(DateTime, default=datetime.now, index=True)
+    create_date = Column(DateTime, default=datetime.now)
     close_date = Column(DateTime)
+
+    @declared_attr
+    def __table_args__(cls):
+        """Ограничения и индексы для постраничных списков.
+
+        Индексы повторяют порядок (`create_date`, `id`) курсора.
+        Частичный индекс открытых объектов обслуживает выборку очереди
+        FIFO при каждом распределении средств: в нём только строки
+        с `fully_invested = 0`, поэтому он остаётся маленьким, а закрытие
+        объекта удаляет его из индекса.
+        """
+        table = cls.__tablename__
+        return (
+            CheckConstraint('full_amount >= invested_amount'),
+            Index(f'ix_{table}_create_date_id', 'create_date', 'id'),
+            Index(f'ix_{table}_close_date', 'close_date'),
+            Index(
+                f'ix_{table}_open_create_date_id',
+                'create_date', 'id',
+                sqlite_where=text('fully_invested = 0'),
+                postgresql_where=text('NOT fully_invested'),
+            ),
+        )
+
+    def __init__(self, **kwargs):
+        """Заполняет поля распределения значениями по умолчанию сразу.
+
+        Так новый объект можно распределять до записи в базу.
+        """
+        kwargs.setdefault('invested_amount', Constant.DEFAULT_INVESTED)
+        kwargs.setdefault('fully_invested', False)
+        super().__init__(**kwargs)
@@ -1,10 +1,12 @@
 from sqlalchemy import (
     Column,
+    Index,
     String,
-    Text
+    Text,
+    func
 )
 
-from app.core.config import Constant
+from app.core.config import Constant, settings
 from app.models.base import ProjectDonationBase
 
 
@@ -12,7 +14,9 @@ class CharityProject(ProjectDonationBase):
     """Модель благотворительного проекта.
 
     Наследуется от ProjectDonationBase и добавляет специфические поля
-    для описания благотворительных проектов.
+    для описания благотворительных проектов. С настройкой
+    `project_name_case_insensitive` название уникально без учёта
+    регистра.
     """
 
     name = Column(
@@ -28,3 +32,11 @@ class CharityProject(ProjectDonationBase):
         return (
             f'Проект {self.name}: {self.description}'
         )
+
+
+if settings.project_name_case_insensitive:
+    Index(
+        'uq_charityproject_name_lower',
+        func.lower(CharityProject.name),
+        unique=True,
+    )
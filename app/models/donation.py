@@ -1,6 +1,7 @@
 from sqlalchemy import (
     Column,
     ForeignKey,
+    Index,
     Integer,
     Text
 )
@@ -26,3 +27,11 @@ class Donation(ProjectDonationBase):
             f'Пожертвований {self.full_amount} '
             f'комментариев {self.comment}'
         )
+
+
+Index(
+    'ix_donation_user_id_create_date_id',
+    Donation.user_id,
+    Donation.create_date,
+    Donation.id,
+)
@@ -0,0 +1,44 @@
+from datetime import datetime
+
+from sqlalchemy import (
+    CheckConstraint,
+    Column,
+    DateTime,
+    ForeignKey,
+    Integer
+)
+
+from app.core.db import Base
+
+
+class Investment(Base):
+    """Модель журнала распределения средств.
+
+    Каждая запись фиксирует сумму, перемещённую из пожертвования
+    в благотворительный проект.
+    """
+
+    donation_id = Column(
+        Integer,
+        ForeignKey('donation.id', name='fk_investment_donation_id_donation'),
+        nullable=False,
+        index=True,
+    )
+    project_id = Column(
+        Integer,
+        ForeignKey(
+            'charityproject.id',
+            name='fk_investment_project_id_charityproject'
+        ),
+        nullable=False,
+        index=True,
+    )
+    amount = Column(Integer, CheckConstraint('amount > 0'), nullable=False)
+    created_at = Column(DateTime, default=datetime.now, nullable=False)
+
+    def __repr__(self):
+        return (
+            f'Вложение {self.amount} '
+            f'из пожертвования {self.donation_id} '
+            f'в проект {self.project_id}'
+        )
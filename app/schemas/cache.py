@@ -0,0 +1,27 @@
+from pydantic import BaseModel, Field
+
+
+class CacheStatsDB(BaseModel):
+    """Схема статистики кэша модели."""
+
+    name: str = Field(
+        ...,
+        title='Таблица'
+    )
+    hits: int = Field(
+        ...,
+        title='Попадания'
+    )
+    misses: int = Field(
+        ...,
+        title='Промахи'
+    )
+    size: int = Field(
+        ...,
+        title='Записей в кэше'
+    )
+
+    class Config:
+        """Конфигурация схемы статистики кэша."""
+
+        title = 'Статистика кэша'
@@ -0,0 +1,34 @@
+from datetime import datetime
+
+from pydantic import BaseModel, Field
+
+
+class InvestmentDB(BaseModel):
+    """Схема записи журнала распределения средств."""
+
+    id: int = Field(
+        ...,
+        title='ID вложения'
+    )
+    donation_id: int = Field(
+        ...,
+        title='ID пожертвования'
+    )
+    project_id: int = Field(
+        ...,
+        title='ID проекта'
+    )
+    amount: int = Field(
+        ...,
+        title='Вложенная сумма'
+    )
+    created_at: datetime = Field(
+        ...,
+        title='Дата вложения'
+    )
+
+    class Config:
+        """Конфигурация схемы записи журнала."""
+
+        title = 'Вложение пожертвования в проект'
+        orm_mode = True
@@ -0,0 +1,280 @@
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional, Type, Union
+
+from sqlalchemy import case, func, insert, literal, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import Constant, settings
+from app.core.metrics import (
+    ALLOCATION_DONATIONS,
+    ALLOCATION_ITEMS_SCANNED,
+    ALLOCATION_PROJECTS_CLOSED,
+)
+from app.core.slow_queries import capture_slow_queries
+from app.crud.cache import mark_changed
+from app.crud.donation import mark_users_changed
+from app.models import CharityProject, Donation, Investment
+
+AllocatableResource = Union[Donation, CharityProject]
+
+
+class Transfer(NamedTuple):
+    """Перемещение средств от `funds` к открытому объекту `item`."""
+
+    funds: AllocatableResource
+    item: AllocatableResource
+    amount: int
+
+
+def build_investments(transfers: List[Transfer]) -> List[Dict]:
+    """Преобразует перемещения средств в строки журнала `investment`."""
+    now = datetime.now()
+    investments = []
+    for funds, item, amount in transfers:
+        donation, project = (
+            (funds, item) if isinstance(funds, Donation) else (item, funds)
+        )
+        investments.append(dict(
+            donation_id=donation.id,
+            project_id=project.id,
+            amount=amount,
+            created_at=now,
+        ))
+    return investments
+
+
+async def save_investments(
+        transfers: List[Transfer],
+        session: AsyncSession,
+) -> None:
+    """Записывает перемещения средств в журнал одним `executemany`."""
+    if transfers:
+        await session.execute(
+            insert(Investment), build_investments(transfers)
+        )
+
+
+def mark_transfers(
+        transfers: List[Transfer],
+        session: AsyncSession,
+) -> None:
+    """Планирует сброс кэша для объектов, затронутых перемещениями.
+
+    Для пожертвований сбрасываются и первые страницы их авторов.
+    """
+    for transfer in transfers:
+        for obj in (transfer.funds, transfer.item):
+            mark_changed(session, type(obj), [obj.id])
+            if isinstance(obj, Donation):
+                mark_users_changed(session, [obj.user_id])
+
+
+def record_allocation(
+        funds: AllocatableResource,
+        engine: str,
+        scanned: int,
+        funded: int,
+        closed: int,
+        funds_closed: bool,
+) -> None:
+    """Учитывает одно распределение средств `funds` в метриках.
+
+    `funded` и `closed` — число открытых объектов, получивших средства
+    и закрытых распределением, `funds_closed` — закрыт ли сам `funds`.
+    Вызывается ровно один раз на распределение, сколько бы порций
+    открытых объектов оно ни просмотрело.
+    """
+    ALLOCATION_ITEMS_SCANNED.observe(scanned, engine=engine)
+    if isinstance(funds, Donation):
+        ALLOCATION_DONATIONS.inc(1 if funded else 0)
+        ALLOCATION_PROJECTS_CLOSED.inc(closed)
+    else:
+        ALLOCATION_DONATIONS.inc(funded)
+        ALLOCATION_PROJECTS_CLOSED.inc(1 if funds_closed else 0)
+
+
+class AllocationCounts:
+    """Итоги одного распределения средств `funds` по нескольким порциям.
+
+    `patch_distribute_funds` накапливает в нём число просмотренных,
+    профинансированных и закрытых объектов, а вызывающий код учитывает
+    распределение в метриках один раз через `record`.
+    """
+
+    def __init__(self, funds: AllocatableResource):
+        """Инициализация пустых счётчиков."""
+        self.funds = funds
+        self.funds_was_closed = funds.fully_invested
+        self.scanned = 0
+        self.funded = 0
+        self.closed = 0
+
+    def record(self, engine: str) -> None:
+        """Учитывает распределение в метриках."""
+        record_allocation(
+            self.funds,
+            engine,
+            scanned=self.scanned,
+            funded=self.funded,
+            closed=self.closed,
+            funds_closed=(
+                self.funds.fully_invested and not self.funds_was_closed
+            ),
+        )
+
+
+def build_allocation_window(
+        obj_model: Type[AllocatableResource],
+        limit: int,
+):
+    """Подзапрос первых открытых объектов с накопленной суммой потребности.
+
+    Берутся первые `limit` открытых объектов в порядке FIFO
+    (`create_date`, `id`), то есть чтение частичного индекса открытых
+    объектов ограничено. Для каждого вычисляется остаток `need`
+    и нарастающий итог `running` оконной функцией `SUM() OVER`.
+    Для пожертвований выбирается также автор `user_id`, чтобы сбросить
+    кэш его страницы.
+    """
+    columns = [
+        obj_model.id.label('id'),
+        (obj_model.full_amount - obj_model.invested_amount).label('need'),
+        obj_model.create_date.label('create_date'),
+    ]
+    if obj_model is Donation:
+        columns.append(Donation.user_id.label('user_id'))
+    head = select(*columns).where(
+        obj_model.fully_invested == 0
+    ).order_by(obj_model.create_date, obj_model.id).limit(limit).subquery()
+    columns = [
+        head.c.id,
+        head.c.need,
+        func.sum(head.c.need).over(
+            order_by=(head.c.create_date, head.c.id)
+        ).label('running'),
+    ]
+    if obj_model is Donation:
+        columns.append(head.c.user_id)
+    return select(*columns).subquery('allocation_window')
+
+
+@capture_slow_queries
+async def allocate_funds(
+        opened_model: Type[AllocatableResource],
+        funds: AllocatableResource,
+        session: AsyncSession,
+        chunk_size: Optional[int] = None,
+) -> AllocatableResource:
+    """Распределяет средства `funds` на открытые объекты проходами SQL.
+
+    Разбиение по FIFO вычисляется оконным запросом по первым
+    `chunk_size` открытым объектам, после чего изменения применяются
+    не более чем двумя массовыми UPDATE: полностью профинансированные
+    объекты закрываются, а пограничный объект получает остаток.
+    Перемещения средств записываются в журнал `investment` одним
+    INSERT ... SELECT по тому же окну. Если все объекты окна закрыты,
+    а средства остались, выполняется следующий проход: закрытые объекты
+    уже вышли из частичного индекса, и окно начинается с нового начала
+    очереди. ORM-объекты открытых элементов не загружаются, поэтому
+    состояние уже загруженных в сессию экземпляров не синхронизируется;
+    кэш сбрасывается по ID затронутых объектов, выбранных тем же
+    запросом, что и пограничный объект.
+
+    Объект `funds` записывается до чтения окна: pysqlite начинает
+    транзакцию только с первой изменяющей команды, и эта запись
+    захватывает блокировку записи. Поэтому окно и все изменения по нему
+    видят одни и те же данные даже при параллельных писателях.
+    Распределение учитывается в метриках один раз.
+    Эталонная реализация — `patch_distribute_funds`.
+    """
+    if funds.full_amount - funds.invested_amount <= 0:
+        return funds
+    chunk_size = chunk_size or settings.allocation_chunk_size
+    await session.flush()
+    counts = AllocationCounts(funds)
+    while True:
+        touched = await allocate_window(
+            opened_model, funds, session, chunk_size, counts
+        )
+        if len(touched) < chunk_size or funds.fully_invested:
+            break
+    counts.record(Constant.ALLOCATION_ENGINE_SQL)
+    return funds
+
+
+async def allocate_window(
+        opened_model: Type[AllocatableResource],
+        funds: AllocatableResource,
+        session: AsyncSession,
+        chunk_size: int,
+        counts: AllocationCounts,
+) -> List:
+    """Один проход `allocate_funds` по окну из `chunk_size` объектов.
+
+    Возвращает строки окна, получившие средства.
+    """
+    remaining = funds.full_amount - funds.invested_amount
+    window = build_allocation_window(opened_model, chunk_size)
+    touched = (await session.execute(
+        select(window).where(
+            window.c.running - window.c.need < remaining
+        ).order_by(window.c.running)
+    )).all()
+    if not touched:
+        return touched
+    boundary = touched[-1]
+    mark_changed(session, type(funds), [funds.id])
+    mark_changed(session, opened_model, [row.id for row in touched])
+    if opened_model is Donation:
+        mark_users_changed(session, {row.user_id for row in touched})
+    now = datetime.now()
+    allocated = min(remaining, boundary.running)
+    funds.invested_amount += allocated
+    if allocated == remaining:
+        funds.fully_invested = True
+        funds.close_date = now
+    counts.scanned += len(touched)
+    counts.funded += len(touched)
+    counts.closed += sum(row.running <= remaining for row in touched)
+    await session.flush()
+    if isinstance(funds, Donation):
+        donation_id, project_id = literal(funds.id), window.c.id
+    else:
+        donation_id, project_id = window.c.id, literal(funds.id)
+    await session.execute(
+        insert(Investment).from_select(
+            ['donation_id', 'project_id', 'amount', 'created_at'],
+            select(
+                donation_id,
+                project_id,
+                case(
+                    (window.c.running <= remaining, window.c.need),
+                    else_=remaining - window.c.running + window.c.need,
+                ),
+                literal(now),
+            ).where(window.c.running - window.c.need < remaining)
+        )
+    )
+    await session.execute(
+        update(opened_model).where(
+            opened_model.id.in_(
+                select(window.c.id).where(window.c.running <= remaining)
+            )
+        ).values(
+            invested_amount=opened_model.full_amount,
+            fully_invested=True,
+            close_date=now,
+        ).execution_options(synchronize_session=False)
+    )
+    if boundary.running > remaining:
+        await session.execute(
+            update(opened_model).where(
+                opened_model.id == boundary.id
+            ).values(
+                invested_amount=(
+                    opened_model.invested_amount +
+                    remaining - boundary.running + boundary.need
+                ),
+            ).execution_options(synchronize_session=False)
+        )
+    return touched
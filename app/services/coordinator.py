@@ -0,0 +1,264 @@
+import asyncio
+import logging
+from collections import deque
+from typing import Dict, List, NamedTuple, Optional, Type
+
+from fastapi import HTTPException
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.validators import check_name_duplicate
+from app.core.config import Constant, settings
+from app.core.db import AsyncSessionLocal
+from app.core.slow_queries import capture_slow_queries
+from app.crud.charity_project import charity_project_crud
+from app.crud.donation import donation_crud
+from app.models import CharityProject, Donation, User
+from app.services.allocation import (
+    AllocatableResource,
+    AllocationCounts,
+    Transfer,
+    mark_transfers,
+    save_investments,
+)
+from app.services.utils import iter_uninvested_chunks, patch_distribute_funds
+
+OPPOSITE_MODELS = {
+    CharityProject: Donation,
+    Donation: CharityProject,
+}
+CRUD_BY_MODEL = {
+    CharityProject: charity_project_crud,
+    Donation: donation_crud,
+}
+
+
+class PendingItem(NamedTuple):
+    """Ожидающий записи объект и future для ответа запросу."""
+
+    model: Type[AllocatableResource]
+    obj_in: BaseModel
+    user: Optional[User]
+    future: asyncio.Future
+
+
+class OpenItems:
+    """Открытые объекты одной модели, загруженные в память для пакета.
+
+    Объекты подгружаются из базы порциями по мере необходимости.
+    Созданные в пакете объекты добавляются в конец очереди только после
+    того, как база исчерпана, иначе они будут прочитаны оттуда в порядке
+    FIFO вместе с остальными.
+    """
+
+    def __init__(
+            self,
+            model: Type[AllocatableResource],
+            session: AsyncSession,
+    ):
+        """Инициализация очереди открытых объектов."""
+        self._chunk_size = settings.allocation_chunk_size
+        self._chunks = iter_uninvested_chunks(
+            model, session, self._chunk_size
+        )
+        self._items = deque()
+        self._exhausted = False
+
+    async def _load_chunk(self) -> None:
+        """Подгружает следующую порцию открытых объектов.
+
+        Неполная порция — последняя: `iter_uninvested_chunks` после
+        неё не обращается к базе, поэтому очередь сразу помечается
+        исчерпанной.
+        """
+        try:
+            chunk = await self._chunks.__anext__()
+        except StopAsyncIteration:
+            self._exhausted = True
+            return
+        self._items.extend(chunk)
+        if len(chunk) < self._chunk_size:
+            self._exhausted = True
+
+    async def distribute(
+            self,
+            funds: AllocatableResource,
+            transfers: List[Transfer],
+    ) -> None:
+        """Распределяет средства `funds` по открытым объектам очереди.
+
+        Распределение учитывается в метриках один раз, сколько бы порций
+        для него ни пришлось подгрузить.
+        """
+        counts = AllocationCounts(funds)
+        while not funds.fully_invested:
+            while self._items and self._items[0].fully_invested:
+                self._items.popleft()
+            if not self._items:
+                if self._exhausted:
+                    break
+                await self._load_chunk()
+                continue
+            patch_distribute_funds(
+                opened_items=self._items,
+                funds=funds,
+                transfers=transfers,
+                counts=counts,
+            )
+        counts.record(Constant.ALLOCATION_ENGINE_PYTHON)
+
+    def append(self, obj: AllocatableResource) -> None:
+        """Добавляет новый открытый объект в конец очереди."""
+        if self._exhausted:
+            self._items.append(obj)
+
+
+class AllocationCoordinator:
+    """Единственный писатель для создания проектов и пожертвований.
+
+    Запросы ставятся в очередь asyncio, фоновая задача собирает их
+    в пакеты до `batch_size` штук, ожидая не дольше `max_linger` секунд,
+    распределяет средства всего пакета в памяти по правилу FIFO
+    и фиксирует пакет одной транзакцией.
+    """
+
+    def __init__(
+            self,
+            session_factory=AsyncSessionLocal,
+            batch_size: int = settings.allocation_batch_size,
+            max_linger: float = settings.allocation_max_linger,
+    ):
+        """Инициализация координатора."""
+        self._session_factory = session_factory
+        self._batch_size = batch_size
+        self._max_linger = max_linger
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._batch: List[PendingItem] = []
+
+    @property
+    def running(self) -> bool:
+        """Запущена ли фоновая задача записи."""
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        """Запускает фоновую задачу записи."""
+        if self.running:
+            return
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Останавливает фоновую задачу и отклоняет ожидающие запросы.
+
+        Отменяются и запросы пакета, прерванного на середине: его
+        транзакция не зафиксирована.
+        """
+        if not self.running:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        for pending in self._batch:
+            if not pending.future.done():
+                pending.future.cancel()
+        self._batch = []
+        while not self._queue.empty():
+            self._queue.get_nowait().future.cancel()
+
+    async def submit(
+            self,
+            model: Type[AllocatableResource],
+            obj_in: BaseModel,
+            user: Optional[User] = None,
+    ) -> AllocatableResource:
+        """Ставит объект в очередь и ожидает результат его записи."""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put(PendingItem(model, obj_in, user, future))
+        return await future
+
+    async def _collect_batch(self) -> List[PendingItem]:
+        """Собирает пакет запросов с ограничением размера и ожидания.
+
+        Пакет хранится в `_batch`, чтобы `stop` мог отклонить уже
+        взятые из очереди запросы.
+        """
+        loop = asyncio.get_running_loop()
+        batch = self._batch = []
+        batch.append(await self._queue.get())
+        deadline = loop.time() + self._max_linger
+        while len(batch) < self._batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(
+                    await asyncio.wait_for(self._queue.get(), timeout)
+                )
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        """Основной цикл единственного писателя."""
+        while True:
+            batch = await self._collect_batch()
+            try:
+                await self._process(batch)
+            except Exception as error:
+                logging.exception('Не удалось записать пакет пожертвований')
+                for pending in batch:
+                    if not pending.future.done():
+                        pending.future.set_exception(error)
+
+    @capture_slow_queries
+    async def _process(self, batch: List[PendingItem]) -> None:
+        """Создаёт объекты пакета, распределяет средства и фиксирует их."""
+        async with self._session_factory(expire_on_commit=False) as session:
+            opened: Dict[Type[AllocatableResource], OpenItems] = {
+                model: OpenItems(model, session)
+                for model in OPPOSITE_MODELS
+            }
+            created = []
+            transfers = []
+            for pending in batch:
+                try:
+                    db_obj = await self._create(pending, session)
+                except HTTPException as error:
+                    if not pending.future.done():
+                        pending.future.set_exception(error)
+                    continue
+                await opened[OPPOSITE_MODELS[pending.model]].distribute(
+                    db_obj, transfers
+                )
+                if not db_obj.fully_invested:
+                    opened[pending.model].append(db_obj)
+                created.append((pending, db_obj))
+            await save_investments(transfers, session)
+            mark_transfers(transfers, session)
+            await session.commit()
+        for pending, db_obj in created:
+            if not pending.future.done():
+                pending.future.set_result(db_obj)
+
+    async def _create(
+            self,
+            pending: PendingItem,
+            session: AsyncSession,
+    ) -> AllocatableResource:
+        """Добавляет новый объект пакета в сессию."""
+        if pending.model is CharityProject:
+            await check_name_duplicate(pending.obj_in.name, session)
+        db_obj = await CRUD_BY_MODEL[pending.model].create(
+            pending.obj_in, session, pending.user, commit=False
+        )
+        await session.flush()
+        return db_obj
+
+
+allocation_coordinator = AllocationCoordinator()
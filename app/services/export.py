@@ -0,0 +1,106 @@
+import csv
+import io
+import json
+from datetime import datetime
+from enum import Enum
+from typing import AsyncIterator, Iterable, List, Type
+
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.crud.base import CRUDBase
+
+
+class ExportFormat(str, Enum):
+    """Форматы потоковой выгрузки."""
+
+    ndjson = 'ndjson'
+    csv = 'csv'
+
+
+EXPORT_MEDIA_TYPES = {
+    ExportFormat.ndjson: 'application/x-ndjson',
+    ExportFormat.csv: 'text/csv',
+}
+
+
+def export_value(value):
+    """Значение поля в том же виде, что и в ответах API."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def encode_ndjson(fields: List[str], rows: Iterable) -> str:
+    """Кодирует строки в NDJSON: по одному JSON-объекту на строку."""
+    return ''.join(
+        json.dumps(
+            dict(zip(fields, map(export_value, row))),
+            ensure_ascii=False,
+        ) + '\n'
+        for row in rows
+    )
+
+
+def encode_csv(fields: List[str], rows: Iterable) -> str:
+    """Кодирует строки в CSV без заголовка."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows(
+        [export_value(value) for value in row] for row in rows
+    )
+    return buffer.getvalue()
+
+
+ENCODERS = {
+    ExportFormat.ndjson: encode_ndjson,
+    ExportFormat.csv: encode_csv,
+}
+
+
+async def export_rows(
+        crud: CRUDBase,
+        schema: Type[BaseModel],
+        session: AsyncSession,
+        export_format: ExportFormat,
+        **filters,
+) -> AsyncIterator[str]:
+    """Потоково выгружает строки модели в порядке (`create_date`, `id`).
+
+    Выбираются только колонки полей `schema`. Строки читаются
+    серверным курсором `session.stream` порциями по
+    `settings.export_chunk_size`, поэтому расход памяти не зависит
+    от размера таблицы.
+    """
+    fields = list(schema.__fields__)
+    model = crud.model
+    query = crud.filter_query(
+        select(*(getattr(model, field) for field in fields)), **filters
+    ).order_by(model.create_date, model.id)
+    encode = ENCODERS[export_format]
+    if export_format is ExportFormat.csv:
+        yield encode_csv(fields, [fields])
+    result = await session.stream(query)
+    async for rows in result.partitions(settings.export_chunk_size):
+        yield encode(fields, rows)
+
+
+def export_response(
+        crud: CRUDBase,
+        schema: Type[BaseModel],
+        session: AsyncSession,
+        export_format: ExportFormat,
+        **filters,
+) -> StreamingResponse:
+    """Ответ с потоковой выгрузкой в виде файла."""
+    filename = f'{crud.model.__tablename__}.{export_format.value}'
+    return StreamingResponse(
+        export_rows(crud, schema, session, export_format, **filters),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={
+            'Content-Disposition': f'attachment; filename="{filename}"'
+        },
+    )
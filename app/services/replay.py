@@ -0,0 +1,271 @@
+from collections import deque
+from datetime import datetime
+from typing import (
+    AsyncIterator,
+    Callable,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Type
+)
+
+from sqlalchemy import bindparam, delete, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.cache import mark_changed
+from app.models import CharityProject, Donation, Investment
+from app.services.allocation import AllocatableResource, Transfer
+from app.services.utils import patch_distribute_funds
+
+OPPOSITE_MODELS = {
+    CharityProject: Donation,
+    Donation: CharityProject,
+}
+
+
+class ReplayItem:
+    """Лёгкая копия строки проекта или пожертвования для пересчёта.
+
+    Хранит пересчитанное состояние распределения и состояние,
+    записанное в базе, чтобы найти расхождения.
+    """
+
+    __slots__ = (
+        'model', 'id', 'full_amount', 'create_date',
+        'invested_amount', 'fully_invested', 'close_date', 'stored',
+    )
+
+    def __init__(self, model: Type[AllocatableResource], row):
+        """Инициализация по строке таблицы с нулевым распределением."""
+        self.model = model
+        self.id = row.id
+        self.full_amount = row.full_amount
+        self.create_date = row.create_date
+        self.invested_amount = 0
+        self.fully_invested = False
+        self.close_date = None
+        self.stored = (row.invested_amount, row.fully_invested, row.close_date)
+
+    def state(self) -> Tuple[int, bool, Optional[datetime]]:
+        """Пересчитанное состояние распределения."""
+        return self.invested_amount, self.fully_invested, self.close_date
+
+
+class ReplayReport(NamedTuple):
+    """Итоги пересчёта распределения средств."""
+
+    projects: int
+    donations: int
+    corrections: int
+    investments: int
+
+
+async def stream_rows(
+        model: Type[AllocatableResource],
+        session: AsyncSession,
+) -> AsyncIterator:
+    """Потоково читает строки таблицы в порядке создания."""
+    result = await session.stream(
+        select(
+            model.id,
+            model.full_amount,
+            model.invested_amount,
+            model.fully_invested,
+            model.create_date,
+            model.close_date,
+        ).order_by(model.create_date, model.id)
+    )
+    async for row in result:
+        yield ReplayItem(model, row)
+
+
+async def merge_by_create_date(
+        projects: AsyncIterator[ReplayItem],
+        donations: AsyncIterator[ReplayItem],
+) -> AsyncIterator[ReplayItem]:
+    """Сливает два упорядоченных потока по дате создания.
+
+    При совпадении дат первым идёт проект.
+    """
+    project = await projects.__anext__()
+    donation = await donations.__anext__()
+    while project is not None or donation is not None:
+        if donation is None or (
+            project is not None and
+            project.create_date <= donation.create_date
+        ):
+            yield project
+            project = await projects.__anext__()
+        else:
+            yield donation
+            donation = await donations.__anext__()
+
+
+async def with_sentinel(rows: AsyncIterator[ReplayItem]) -> AsyncIterator:
+    """Дополняет поток значением `None` вместо `StopAsyncIteration`."""
+    async for row in rows:
+        yield row
+    while True:
+        yield None
+
+
+class AllocationReplay:
+    """Офлайн-пересчёт распределения средств за один проход.
+
+    Проекты и пожертвования читаются двумя потоками в порядке создания
+    и сливаются двумя указателями. Каждый новый объект распределяет
+    средства по очереди открытых объектов противоположного типа
+    функцией `patch_distribute_funds`, то есть по тем же правилам,
+    что и API. Исправления записываются пакетами через `executemany`,
+    журнал `investment` перестраивается целиком. Пересчёт не учитывается
+    в метриках распределения: они описывают только новые распределения.
+    """
+
+    def __init__(
+            self,
+            session: AsyncSession,
+            dry_run: bool = False,
+            batch_size: int = 1000,
+            on_diff: Optional[Callable[[str], None]] = None,
+    ):
+        """Инициализация пересчёта."""
+        self._session = session
+        self._dry_run = dry_run
+        self._batch_size = batch_size
+        self._on_diff = on_diff
+        self._opened: Dict[Type[AllocatableResource], deque] = {
+            model: deque() for model in OPPOSITE_MODELS
+        }
+        self._corrections: Dict[Type[AllocatableResource], List[Dict]] = {
+            model: [] for model in OPPOSITE_MODELS
+        }
+        self._investments: List[Dict] = []
+        self._counts = dict(
+            projects=0, donations=0, corrections=0, investments=0
+        )
+
+    async def run(self) -> ReplayReport:
+        """Выполняет пересчёт и возвращает его итоги."""
+        if not self._dry_run:
+            await self._session.execute(delete(Investment))
+        events = merge_by_create_date(
+            with_sentinel(stream_rows(CharityProject, self._session)),
+            with_sentinel(stream_rows(Donation, self._session)),
+        )
+        async for item in events:
+            await self._process(item)
+        for opened in self._opened.values():
+            for item in opened:
+                await self._finalize(item, item.create_date)
+        await self._flush()
+        if not self._dry_run:
+            for model in OPPOSITE_MODELS:
+                mark_changed(self._session, model, None)
+            await self._session.commit()
+        return ReplayReport(**self._counts)
+
+    async def _process(self, item: ReplayItem) -> None:
+        """Распределяет средства нового объекта по открытым объектам."""
+        if item.model is CharityProject:
+            self._counts['projects'] += 1
+        else:
+            self._counts['donations'] += 1
+        opened = self._opened[OPPOSITE_MODELS[item.model]]
+        transfers = []
+        patch_distribute_funds(
+            opened_items=opened,
+            funds=item,
+            transfers=transfers
+        )
+        self._add_investments(transfers, item.create_date)
+        while opened and opened[0].fully_invested:
+            await self._finalize(opened.popleft(), item.create_date)
+        if item.fully_invested:
+            await self._finalize(item, item.create_date)
+        else:
+            self._opened[item.model].append(item)
+
+    def _add_investments(
+            self,
+            transfers: List[Transfer],
+            created_at: datetime,
+    ) -> None:
+        """Добавляет перемещения средств в буфер журнала."""
+        for funds, item, amount in transfers:
+            donation, project = (
+                (funds, item) if funds.model is Donation else (item, funds)
+            )
+            self._investments.append(dict(
+                donation_id=donation.id,
+                project_id=project.id,
+                amount=amount,
+                created_at=created_at,
+            ))
+        self._counts['investments'] += len(transfers)
+
+    async def _finalize(self, item: ReplayItem, event_date: datetime) -> None:
+        """Сравнивает итоговое состояние объекта с записанным в базе.
+
+        Дата закрытия уже закрытого объекта сохраняется, для вновь
+        закрытого берётся дата события, которое его закрыло.
+        """
+        stored_invested, stored_fully_invested, stored_close_date = (
+            item.stored
+        )
+        if item.fully_invested:
+            item.close_date = (
+                stored_close_date
+                if stored_fully_invested and stored_close_date
+                else event_date
+            )
+        if item.state() != item.stored:
+            self._counts['corrections'] += 1
+            if self._on_diff is not None:
+                self._on_diff(
+                    f'{item.model.__tablename__} {item.id}: '
+                    f'{item.stored} -> {item.state()}'
+                )
+            self._corrections[item.model].append(dict(
+                b_id=item.id,
+                b_invested_amount=item.invested_amount,
+                b_fully_invested=item.fully_invested,
+                b_close_date=item.close_date,
+            ))
+        if (
+            len(self._investments) >= self._batch_size or
+            any(
+                len(corrections) >= self._batch_size
+                for corrections in self._corrections.values()
+            )
+        ):
+            await self._flush()
+
+    async def _flush(self) -> None:
+        """Записывает накопленные исправления и журнал пакетами."""
+        if self._dry_run:
+            self._investments.clear()
+            for corrections in self._corrections.values():
+                corrections.clear()
+            return
+        if self._investments:
+            await self._session.execute(
+                insert(Investment.__table__), self._investments
+            )
+            self._investments.clear()
+        for model, corrections in self._corrections.items():
+            if not corrections:
+                continue
+            table = model.__table__
+            await self._session.execute(
+                update(table).where(
+                    table.c.id == bindparam('b_id')
+                ).values(
+                    invested_amount=bindparam('b_invested_amount'),
+                    fully_invested=bindparam('b_fully_invested'),
+                    close_date=bindparam('b_close_date'),
+                ),
+                corrections,
+            )
+            corrections.clear()
@@ -0,0 +1,146 @@
+import gzip
+import time
+import zlib
+from typing import Dict, Optional, Type
+
+from fastapi import Request, Response
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.etag import not_modified
+from app.api.responses import (
+    JSON_MEDIA_TYPE,
+    encode_json_rows,
+    parse_accept_header,
+    schema_fields,
+)
+from app.core.config import settings
+from app.core.db import AsyncSessionLocal, reads_replica
+from app.crud.base import CRUDBase
+from app.crud.cache import get_version
+from app.crud.charity_project import charity_project_crud
+from app.schemas.charity_project import CharityProjectDB
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+IDENTITY = 'identity'
+
+
+class ListSnapshot:
+    """Готовый сериализованный и сжатый список объектов модели.
+
+    Тело ответа совпадает с ответом FastAPI по схеме `schema`
+    с `exclude_none` (см. `encode_json_rows`) и хранится вместе с gzip-
+    и brotli-версией. Снимок перестраивается
+    при следующем запросе после изменения версии модели
+    (см. `mark_changed`) или по истечении `cache_ttl`.
+    Версия снимка описывает основную базу, поэтому для запроса через
+    реплику снимок перестраивается сессией `session_factory`.
+    """
+
+    def __init__(
+            self,
+            crud: CRUDBase,
+            schema: Type[BaseModel],
+            session_factory=AsyncSessionLocal,
+    ):
+        """Инициализация пустого снимка."""
+        self.crud = crud
+        self._session_factory = session_factory
+        self.fields = schema_fields(schema)
+        self.builds = 0
+        self._version: Optional[int] = None
+        self._built_at = 0.0
+        self._bodies: Dict[str, bytes] = {}
+        self.checksum = 0
+
+    def is_fresh(self) -> bool:
+        """Соответствует ли снимок текущей версии данных."""
+        return (
+            settings.cache_enabled and
+            self._version == get_version(self.crud.model) and
+            time.monotonic() - self._built_at < settings.cache_ttl
+        )
+
+    async def build(self, session: AsyncSession) -> None:
+        """Перестроить снимок по данным из базы.
+
+        Колонки схемы читаются из базы в обход кэша модели, поэтому
+        снимок не зависит от содержимого кэша и его срока жизни.
+        Версия берётся до чтения: данные не старше версии снимка.
+        """
+        version = get_version(self.crud.model)
+        page = await self.crud.get_page(session, columns=self.fields)
+        body = encode_json_rows(self.fields, page.items)
+        bodies = {
+            IDENTITY: body,
+            'gzip': gzip.compress(
+                body, compresslevel=settings.snapshot_gzip_level, mtime=0
+            ),
+        }
+        if brotli is not None:
+            bodies['br'] = brotli.compress(
+                body, quality=settings.snapshot_brotli_quality
+            )
+        self._bodies = bodies
+        self._version = version
+        self.checksum = zlib.crc32(body)
+        self._built_at = time.monotonic()
+        self.builds += 1
+
+    def clear(self) -> None:
+        """Сбросить снимок и счётчик пересборок."""
+        self._version = None
+        self._bodies = {}
+        self.builds = 0
+
+    async def response(
+            self,
+            request: Request,
+            response: Response,
+            session: AsyncSession,
+    ) -> Response:
+        """Ответ с готовым телом в лучшей из принятых клиентом кодировок.
+
+        ETag строится по версии и контрольной сумме снимка, а не по
+        текущей версии модели, поэтому описывает именно отдаваемое тело;
+        пересборка по сроку жизни с другим содержимым меняет тег.
+        Для актуального тега клиента возвращается 304.
+        """
+        if not self.is_fresh():
+            if reads_replica(session):
+                async with self._session_factory() as primary:
+                    await self.build(primary)
+            else:
+                await self.build(session)
+        cached = not_modified(
+            request,
+            response,
+            self.crud.model,
+            self.checksum,
+            version=self._version,
+        )
+        if cached is not None:
+            return cached
+        accepted = parse_accept_header(
+            request.headers.get('accept-encoding')
+        )
+        encoding = next(
+            (name for name in ('br', 'gzip') if name in accepted and
+             name in self._bodies),
+            IDENTITY,
+        )
+        headers = dict(response.headers, Vary='Accept, Accept-Encoding')
+        if encoding != IDENTITY:
+            headers['Content-Encoding'] = encoding
+        return Response(
+            content=self._bodies[encoding],
+            media_type=JSON_MEDIA_TYPE,
+            headers=headers,
+        )
+
+
+project_list_snapshot = ListSnapshot(charity_project_crud, CharityProjectDB)
@@ -1,44 +1,76 @@
+import logging
 from datetime import datetime
-from typing import List, Optional, Type, Union
+from typing import AsyncIterator, List, Optional, Type
 
-from sqlalchemy import select
+from sqlalchemy import inspect, select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.exceptions import DuplicateException
+from app.core.config import Constant, settings
+from app.core.slow_queries import capture_slow_queries, slow_query_scope
 from app.crud.charity_project import charity_project_crud
 from app.crud.donation import donation_crud
+from app.crud.pagination import keyset_after
 from app.models import CharityProject, Donation
-from app.api.validators import check_name_duplicate, validate_update_project
+from app.api.validators import check_name_duplicate
 from app.schemas.donation import DonationCreate
-
-AllocatableResource = Union[Donation, CharityProject]
+from app.services.allocation import (
+    AllocatableResource,
+    AllocationCounts,
+    Transfer,
+    allocate_funds,
+    mark_transfers,
+    save_investments,
+)
 
 
 def patch_distribute_funds(
         opened_items: Optional[List[AllocatableResource]],
         funds: AllocatableResource,
+        transfers: Optional[List[Transfer]] = None,
+        counts: Optional[AllocationCounts] = None,
 ) -> AllocatableResource:
     """Распределяет средства на список открытых элементов `opened_items`.
 
     Эта функция проверяет, сколько средств осталось у объекта `funds`,
     и распределяет их между открытыми элементами в `opened_items`.
     Если средств достаточно, элементы закрываются.
+    Каждое перемещение средств добавляется в список `transfers`,
+    если он передан.
+    Эталонная реализация правила FIFO для `allocate_funds`.
+    Число просмотренных, профинансированных и закрытых элементов
+    добавляется в `counts`, если он передан.
     """
+    scanned = funded = closed = 0
     for item in opened_items:
+        scanned += 1
         funds_diff = funds.full_amount - funds.invested_amount
         item_diff = item.full_amount - item.invested_amount
         if funds_diff >= item_diff:
+            amount = item_diff
             funds.invested_amount += item_diff
             item.invested_amount = item.full_amount
             close_item(item)
             if funds_diff == item_diff:
                 close_item(funds)
         else:
+            amount = funds_diff
             item.invested_amount += funds_diff
             funds.invested_amount = funds.full_amount
             close_item(funds)
+        if amount:
+            funded += 1
+            if transfers is not None:
+                transfers.append(Transfer(funds, item, amount))
+        if funds_diff >= item_diff:
+            closed += 1
+        if funds_diff < item_diff:
             break
+    if counts is not None:
+        counts.scanned += scanned
+        counts.funded += funded
+        counts.closed += closed
     return funds
 
 
@@ -53,6 +85,7 @@ def close_item(item: AllocatableResource) -> AllocatableResource:
     return item
 
 
+@capture_slow_queries
 async def get_uninvested_objects(
         obj_model: Type[AllocatableResource],
         session: AsyncSession,
@@ -65,42 +98,152 @@ async def get_uninvested_objects(
     uninvested_objects = await session.execute(
         select(obj_model).where(
             obj_model.fully_invested == 0
-        ).order_by(obj_model.create_date)
+        ).order_by(obj_model.create_date, obj_model.id)
     )
     return uninvested_objects.scalars().all()
 
 
+async def iter_uninvested_chunks(
+        obj_model: Type[AllocatableResource],
+        session: AsyncSession,
+        chunk_size: int,
+) -> AsyncIterator[List[AllocatableResource]]:
+    """Постранично отдаёт не инвестированные объекты в порядке FIFO.
+
+    Объекты выбираются порциями по `chunk_size` с keyset-пагинацией
+    по паре (`create_date`, `id`), поэтому в памяти одновременно
+    находится не больше одной порции. Каждая следующая порция ищется
+    по частичному индексу открытых объектов с позиции предыдущей
+    (см. `keyset_after`), и поток из n объектов читается за O(n).
+    """
+    query = select(obj_model).where(
+        obj_model.fully_invested == 0
+    ).order_by(obj_model.create_date, obj_model.id).limit(chunk_size)
+    last = None
+    while True:
+        chunk_query = query
+        if last is not None:
+            chunk_query = query.where(
+                keyset_after(obj_model, last.create_date, last.id)
+            )
+        with slow_query_scope('iter_uninvested_chunks'):
+            chunk = (await session.execute(chunk_query)).scalars().all()
+        if not chunk:
+            return
+        yield chunk
+        if len(chunk) < chunk_size:
+            return
+        last = chunk[-1]
+
+
+@capture_slow_queries
+async def stream_distribute_funds(
+        opened_model: Type[AllocatableResource],
+        funds: AllocatableResource,
+        session: AsyncSession,
+        chunk_size: Optional[int] = None,
+) -> int:
+    """Распределяет средства, загружая открытые объекты порциями.
+
+    Порции обрабатываются `patch_distribute_funds`, а загрузка
+    прекращается, как только средства `funds` израсходованы.
+    Объект `funds` записывается до чтения порций, чтобы транзакция
+    захватила блокировку записи, как в `allocate_funds`.
+    Распределение учитывается в метриках один раз по итогам всех порций.
+    Возвращает количество просмотренных строк.
+    """
+    scanned = 0
+    if funds.full_amount == funds.invested_amount:
+        return scanned
+    await session.flush()
+    transfers = []
+    counts = AllocationCounts(funds)
+    chunks = iter_uninvested_chunks(
+        opened_model,
+        session,
+        chunk_size or settings.allocation_chunk_size
+    )
+    with session.no_autoflush:
+        async for chunk in chunks:
+            scanned += len(chunk)
+            patch_distribute_funds(
+                opened_items=chunk,
+                funds=funds,
+                transfers=transfers,
+                counts=counts,
+            )
+            if funds.fully_invested:
+                break
+    counts.record(Constant.ALLOCATION_ENGINE_PYTHON)
+    await session.flush()
+    await save_investments(transfers, session)
+    mark_transfers(transfers, session)
+    logging.debug(
+        f'Распределение {funds!r}: просмотрено строк {scanned}'
+    )
+    return scanned
+
+
 async def update_charity_project_logic(
-    charity_project, obj_in, project_id: int, session: AsyncSession
+    charity_project, obj_in, session: AsyncSession
 ) -> CharityProject:
     """Логика обновления благотворительного проекта.
 
     Эта функция обновляет данные проекта в базе и проверяет,
-    нужно ли его закрыть после обновления.
+    нужно ли его закрыть после обновления. Данные должны быть
+    проверены заранее через `validate_update_project`, а нарушение
+    уникальности имени и других ограничений базы превращается
+    в ответ 400.
     """
-    await validate_update_project(obj_in, project_id, session)
     charity_project = await charity_project_crud.update(
-        charity_project, obj_in, session
+        charity_project, obj_in, session, commit=False
     )
     if obj_in.full_amount == charity_project.invested_amount:
         close_item(charity_project)
+    try:
+        await commit_changes(charity_project, session)
+    except IntegrityError:
+        await session.rollback()
+        if obj_in.name:
+            await check_name_duplicate(obj_in.name, session)
+        raise DuplicateException('Проект не может быть обновлён')
 
     return charity_project
 
 
+async def commit_changes(
+    db_obj: AllocatableResource,
+    session: AsyncSession
+) -> None:
+    """Фиксирует единицу работы одним коммитом.
+
+    Объект перечитывается из базы, только если фиксация пометила его
+    атрибуты устаревшими (сессия с `expire_on_commit=True`).
+    """
+    await session.commit()
+    if inspect(db_obj).expired:
+        await session.refresh(db_obj)
+
+
 async def distribute_funds(
-    opened_items,
+    opened_model,
     funds,
     session
 ) -> None:
-    """Функция для распределения средств и коммита в базе данных."""
+    """Функция для распределения средств и коммита в базе данных.
+
+    Движок распределения выбирается настройкой `allocation_engine`:
+    `sql` — оконный запрос и массовые UPDATE, `python` — эталонный цикл
+    `patch_distribute_funds` по порциям открытых объектов.
+    Создание `funds`, распределение и закрытие объектов фиксируются
+    одной транзакцией.
+    """
     try:
-        patch_distribute_funds(
-            opened_items=opened_items,
-            funds=funds
-        )
-        await session.commit()
-        await session.refresh(funds)
+        if settings.allocation_engine == Constant.ALLOCATION_ENGINE_PYTHON:
+            await stream_distribute_funds(opened_model, funds, session)
+        else:
+            await allocate_funds(opened_model, funds, session)
+        await commit_changes(funds, session)
     except IntegrityError:
         await session.rollback()
         raise DuplicateException('Средства распределены')
@@ -112,27 +255,25 @@ async def process_new_charity_project(
 ) -> CharityProject:
     """Обрабатывает создание нового проекта.
 
-    Проверяет уникальность имени проекта.
     Создает проект в базе данных.
     Распределяет нераспределенные пожертвования на новый проект.
+    Уникальность имени обеспечивает ограничение в базе данных:
+    после его нарушения возвращается ответ 400.
     """
-    await check_name_duplicate(
-        charity_project.name,
-        session
-    )
     new_project = await charity_project_crud.create(
         charity_project,
-        session
-    )
-    unallocated_donations = await get_uninvested_objects(
-        Donation,
-        session
-    )
-    await distribute_funds(
-        unallocated_donations,
-        new_project,
-        session
+        session,
+        commit=False
     )
+    try:
+        await distribute_funds(
+            Donation,
+            new_project,
+            session
+        )
+    except DuplicateException:
+        await check_name_duplicate(charity_project.name, session)
+        raise
 
     return new_project
 
@@ -150,14 +291,11 @@ async def process_new_donation(
     new_donation = await donation_crud.create(
         donation,
         session,
-        user
-    )
-    open_projects = await get_uninvested_objects(
-        CharityProject,
-        session
+        user,
+        commit=False
     )
     await distribute_funds(
-        open_projects,
+        CharityProject,
         new_donation,
         session
     )
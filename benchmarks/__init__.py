@@ -0,0 +1 @@
+"""Микробенчмарки распределения средств."""
@@ -0,0 +1,456 @@
+"""Запуск микробенчмарков распределения средств и сериализации списков.
+
+Пример:
+    python -m benchmarks --projects 10000 --donations 10000 \
+        --serialization-rows 10000 100000 \
+        --write-donations 500 --write-concurrency 1 8 --output bench.json
+"""
+import argparse
+import asyncio
+import json
+import platform
+import random
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.api.exceptions import DuplicateException
+from app.api.responses import encode_json_rows, schema_fields
+from app.core.config import Constant, Settings, settings
+from app.core.db import build_engine, get_async_session
+from app.core.user import current_user
+from app.main import app
+from app.crud.charity_project import charity_project_crud
+from app.models import CharityProject, Donation, User
+from app.schemas.charity_project import CharityProjectDB
+from app.schemas.donation import DonationCreate
+from app.services.utils import (
+    get_uninvested_objects,
+    patch_distribute_funds,
+    process_new_donation,
+)
+from benchmarks.workloads import (
+    DISTRIBUTIONS,
+    generate_amounts,
+    make_items,
+    populate_database,
+)
+
+WRITE_PROFILES = {
+    'rollback_journal': dict(
+        sqlite_journal_mode='DELETE',
+        sqlite_synchronous='FULL',
+        sqlite_cache_size=None,
+        sqlite_mmap_size=None,
+        sqlite_busy_timeout=None,
+        pool_size=None,
+    ),
+    'wal': dict(
+        sqlite_journal_mode='WAL',
+        sqlite_synchronous='NORMAL',
+        sqlite_cache_size=-20000,
+        sqlite_mmap_size=None,
+        sqlite_busy_timeout=5000,
+        pool_size=None,
+    ),
+    'wal_pool': dict(
+        sqlite_journal_mode='WAL',
+        sqlite_synchronous='NORMAL',
+        sqlite_cache_size=-20000,
+        sqlite_mmap_size=2 ** 28,
+        sqlite_busy_timeout=5000,
+        pool_size=5,
+    ),
+}
+
+
+def summarize(name: str, params: Dict, timings: List[float]) -> Dict:
+    """Сводка замеров в секундах."""
+    return dict(
+        name=name,
+        params=params,
+        runs=len(timings),
+        min=min(timings),
+        median=statistics.median(timings),
+        mean=statistics.mean(timings),
+        max=max(timings),
+    )
+
+
+def measure(run: Callable[[], None], repeat: int) -> List[float]:
+    """Замеряет время выполнения `run` указанное число раз."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def bench_patch_distribute_funds(
+        amounts: List[int],
+        repeat: int,
+        distribution: str,
+) -> List[Dict]:
+    """Чистый цикл `patch_distribute_funds` без базы данных."""
+    results = []
+    cases = {
+        'typical': statistics.median(amounts),
+        'close_all': sum(amounts),
+    }
+    for case, donation_amount in cases.items():
+        timings = []
+        for _ in range(repeat):
+            opened_items = make_items(amounts)
+            funds = make_items([int(donation_amount)])[0]
+            started = time.perf_counter()
+            patch_distribute_funds(opened_items, funds)
+            timings.append(time.perf_counter() - started)
+        results.append(summarize(
+            'patch_distribute_funds',
+            dict(case=case, items=len(amounts), distribution=distribution),
+            timings,
+        ))
+    return results
+
+
+def bench_get_uninvested_objects(
+        database_path: str,
+        donations: int,
+        repeat: int,
+) -> List[Dict]:
+    """Запрос `get_uninvested_objects` к базе с открытыми пожертвованиями."""
+    engine = create_async_engine(f'sqlite+aiosqlite:///{database_path}')
+    session_factory = sessionmaker(engine, class_=AsyncSession)
+
+    async def fetch():
+        async with session_factory() as session:
+            await get_uninvested_objects(Donation, session)
+
+    async def run():
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            await fetch()
+            timings.append(time.perf_counter() - started)
+        await engine.dispose()
+        return timings
+
+    return [summarize(
+        'get_uninvested_objects',
+        dict(model='donation', rows=donations),
+        asyncio.run(run()),
+    )]
+
+
+def bench_endpoint(
+        database_path: str,
+        projects: int,
+        requests: int,
+) -> List[Dict]:
+    """Полный цикл POST /donation/ через ASGI-приложение.
+
+    Замеряется каждый движок распределения на одной и той же базе
+    с открытыми проектами.
+    """
+    engine = create_async_engine(f'sqlite+aiosqlite:///{database_path}')
+    session_factory = sessionmaker(engine, class_=AsyncSession)
+
+    async def override_session():
+        async with session_factory() as session:
+            yield session
+
+    overrides = dict(app.dependency_overrides)
+    app.dependency_overrides[get_async_session] = override_session
+    app.dependency_overrides[current_user] = lambda: User(
+        id=1, is_active=True, is_verified=True, is_superuser=False
+    )
+    engine_setting = settings.allocation_engine
+    results = []
+    try:
+        client = TestClient(app)
+        for allocation_engine in (
+            Constant.ALLOCATION_ENGINE_SQL,
+            Constant.ALLOCATION_ENGINE_PYTHON,
+        ):
+            settings.allocation_engine = allocation_engine
+            timings = measure(
+                lambda: client.post(
+                    '/donation/', json={'full_amount': 100}
+                ).raise_for_status(),
+                requests,
+            )
+            results.append(summarize(
+                'post_donation',
+                dict(engine=allocation_engine, open_projects=projects),
+                timings,
+            ))
+    finally:
+        settings.allocation_engine = engine_setting
+        app.dependency_overrides = overrides
+        asyncio.run(engine.dispose())
+    return results
+
+
+def bench_serialization(
+        database_path: str,
+        rows: int,
+        repeat: int,
+) -> List[Dict]:
+    """Чтение и сериализация списка проектов: ORM + pydantic и Core + orjson.
+
+    Первый вариант повторяет прежний путь FastAPI: ORM-объекты,
+    `from_orm`, `jsonable_encoder` и `JSONResponse`. Второй — выборка
+    кортежей колонок схемы и `encode_json_rows`.
+    """
+    engine = create_async_engine(f'sqlite+aiosqlite:///{database_path}')
+    session_factory = sessionmaker(engine, class_=AsyncSession)
+    fields = schema_fields(CharityProjectDB)
+
+    async def orm_pydantic() -> bytes:
+        async with session_factory() as session:
+            db_objs = (
+                await session.execute(select(CharityProject))
+            ).scalars().all()
+            return JSONResponse(jsonable_encoder(
+                [CharityProjectDB.from_orm(db_obj) for db_obj in db_objs],
+                exclude_none=True,
+            )).body
+
+    async def core_orjson() -> bytes:
+        async with session_factory() as session:
+            page = await charity_project_crud.get_page(
+                session, columns=fields
+            )
+            return encode_json_rows(fields, page.items)
+
+    async def run():
+        results = []
+        for name, serialize in (
+            ('orm_pydantic', orm_pydantic),
+            ('core_orjson', core_orjson),
+        ):
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                await serialize()
+                timings.append(time.perf_counter() - started)
+            results.append(summarize(
+                'list_serialization',
+                dict(path=name, rows=rows),
+                timings,
+            ))
+        await engine.dispose()
+        return results
+
+    return asyncio.run(run())
+
+
+def bench_write_profiles(
+        database_path: str,
+        project_amounts: List[int],
+        donations: int,
+        concurrency_levels: List[int],
+) -> List[Dict]:
+    """Пропускная способность записи пожертвований по профилям соединений.
+
+    Для каждого профиля из `WRITE_PROFILES` и каждого уровня
+    конкурентности база заполняется заново, после чего `concurrency`
+    конкурентных писателей создают всего
+    `donations` пожертвований через `process_new_donation`, каждое
+    в своей сессии. Ошибки блокировки базы (`lock_errors`) и конфликты
+    распределения (`conflicts`) считаются отдельно; при корректной
+    сериализации писателей конфликтов быть не должно.
+    """
+    user = User(id=1, is_active=True, is_verified=True, is_superuser=False)
+
+    async def run(config: Settings, concurrency: int) -> Dict:
+        engine = build_engine(config)
+        session_factory = sessionmaker(
+            engine, class_=AsyncSession, expire_on_commit=False
+        )
+        pending = iter(range(donations))
+        timings = []
+        errors = dict(lock_errors=0, conflicts=0)
+
+        async def writer():
+            for _ in pending:
+                started = time.perf_counter()
+                try:
+                    async with session_factory() as session:
+                        await process_new_donation(
+                            DonationCreate(full_amount=100), session, user
+                        )
+                except OperationalError:
+                    errors['lock_errors'] += 1
+                    continue
+                except DuplicateException:
+                    errors['conflicts'] += 1
+                    continue
+                timings.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(writer() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+        await engine.dispose()
+        return dict(
+            timings=timings or [elapsed],
+            donations_per_second=len(timings) / elapsed,
+            **errors,
+        )
+
+    results = []
+    for profile, overrides in WRITE_PROFILES.items():
+        config = Settings(
+            database_url=f'sqlite+aiosqlite:///{database_path}',
+            **overrides,
+        )
+        for concurrency in concurrency_levels:
+            populate_database(database_path, project_amounts, [])
+            outcome = asyncio.run(run(config, concurrency))
+            result = summarize(
+                'write_profile',
+                dict(
+                    profile=profile,
+                    concurrency=concurrency,
+                    donations=donations,
+                ),
+                outcome['timings'],
+            )
+            result.update(
+                lock_errors=outcome['lock_errors'],
+                conflicts=outcome['conflicts'],
+                donations_per_second=outcome['donations_per_second'],
+            )
+            results.append(result)
+    return results
+
+
+def git_revision() -> str:
+    """Текущий коммит для сравнения результатов между ревизиями."""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def run_benchmarks(args: argparse.Namespace) -> Dict:
+    """Выполняет все бенчмарки и возвращает отчёт."""
+    rnd = random.Random(args.seed)
+    project_amounts = generate_amounts(
+        rnd, args.projects, args.distribution, scale=args.scale
+    )
+    donation_amounts = generate_amounts(
+        rnd, args.donations, args.distribution, scale=args.scale // 10
+    )
+    results = bench_patch_distribute_funds(
+        project_amounts, args.repeat, args.distribution
+    )
+    with tempfile.TemporaryDirectory() as directory:
+        database_path = str(Path(directory) / 'bench.db')
+        populate_database(database_path, [], donation_amounts)
+        results += bench_get_uninvested_objects(
+            database_path, args.donations, args.repeat
+        )
+        populate_database(database_path, project_amounts, [])
+        results += bench_endpoint(
+            database_path, args.projects, args.requests
+        )
+        for rows in args.serialization_rows:
+            populate_database(
+                database_path,
+                generate_amounts(rnd, rows, args.distribution, args.scale),
+                [],
+            )
+            results += bench_serialization(database_path, rows, args.repeat)
+        if args.write_donations:
+            results += bench_write_profiles(
+                database_path,
+                project_amounts,
+                args.write_donations,
+                args.write_concurrency,
+            )
+    return dict(
+        revision=git_revision(),
+        created_at=datetime.now().isoformat(),
+        python=platform.python_version(),
+        params=dict(
+            projects=args.projects,
+            donations=args.donations,
+            distribution=args.distribution,
+            scale=args.scale,
+            seed=args.seed,
+            serialization_rows=args.serialization_rows,
+            write_donations=args.write_donations,
+            write_concurrency=args.write_concurrency,
+        ),
+        results=results,
+    )
+
+
+def parse_args() -> argparse.Namespace:
+    """Разбор аргументов командной строки."""
+    parser = argparse.ArgumentParser(
+        description='Микробенчмарки распределения средств QRKot.'
+    )
+    parser.add_argument('--projects', type=int, default=10000)
+    parser.add_argument('--donations', type=int, default=10000)
+    parser.add_argument(
+        '--distribution', choices=DISTRIBUTIONS, default='lognormal'
+    )
+    parser.add_argument('--scale', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--requests', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument(
+        '--serialization-rows',
+        type=int,
+        nargs='*',
+        default=[10000, 100000],
+        help='размеры списка проектов для замера сериализации',
+    )
+    parser.add_argument(
+        '--write-donations',
+        type=int,
+        default=500,
+        help='число пожертвований в замере записи по профилям соединений',
+    )
+    parser.add_argument(
+        '--write-concurrency',
+        type=int,
+        nargs='*',
+        default=[1, 8],
+        help='числа конкурентных писателей в замере записи',
+    )
+    parser.add_argument(
+        '--output',
+        type=Path,
+        help='файл для JSON-отчёта (по умолчанию вывод в stdout)',
+    )
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    report = json.dumps(
+        run_benchmarks(args), ensure_ascii=False, indent=2
+    )
+    if args.output:
+        args.output.write_text(report, encoding='utf-8')
+    else:
+        print(report)
@@ -0,0 +1,107 @@
+import random
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import Dict, List
+
+from sqlalchemy import create_engine, insert
+
+from app.core.db import Base
+from app.models import CharityProject, Donation
+
+DISTRIBUTIONS = ('uniform', 'lognormal', 'pareto')
+START_DATE = datetime(2020, 1, 1)
+
+
+def generate_amounts(
+        rnd: random.Random,
+        count: int,
+        distribution: str = 'lognormal',
+        scale: int = 1000,
+) -> List[int]:
+    """Генерирует положительные суммы с заданным распределением.
+
+    `lognormal` и `pareto` дают перекос: много небольших сумм
+    и редкие очень крупные.
+    """
+    if distribution == 'uniform':
+        return [rnd.randint(1, 2 * scale) for _ in range(count)]
+    if distribution == 'lognormal':
+        return [
+            max(1, int(rnd.lognormvariate(0, 1) * scale))
+            for _ in range(count)
+        ]
+    if distribution == 'pareto':
+        return [
+            max(1, int(rnd.paretovariate(1.5) * scale / 3))
+            for _ in range(count)
+        ]
+    raise ValueError(f'Неизвестное распределение: {distribution}')
+
+
+def make_items(amounts: List[int]) -> List[SimpleNamespace]:
+    """Создаёт лёгкие открытые объекты для чистого цикла распределения."""
+    return [
+        SimpleNamespace(
+            id=number,
+            full_amount=amount,
+            invested_amount=0,
+            fully_invested=False,
+            close_date=None,
+        )
+        for number, amount in enumerate(amounts, start=1)
+    ]
+
+
+def project_rows(amounts: List[int]) -> List[Dict]:
+    """Строки открытых проектов для массовой вставки."""
+    return [
+        dict(
+            name=f'project {number}',
+            description='Synthetic project',
+            full_amount=amount,
+            invested_amount=0,
+            fully_invested=False,
+            create_date=START_DATE + timedelta(seconds=number),
+        )
+        for number, amount in enumerate(amounts, start=1)
+    ]
+
+
+def donation_rows(amounts: List[int]) -> List[Dict]:
+    """Строки нераспределённых пожертвований для массовой вставки."""
+    return [
+        dict(
+            user_id=1,
+            full_amount=amount,
+            invested_amount=0,
+            fully_invested=False,
+            create_date=START_DATE + timedelta(seconds=number),
+        )
+        for number, amount in enumerate(amounts, start=1)
+    ]
+
+
+def populate_database(
+        database_path: str,
+        projects: List[int],
+        donations: List[int],
+) -> None:
+    """Создаёт схему и заполняет базу открытыми проектами и пожертвованиями.
+
+    Проекты и пожертвования одновременно открытыми быть не могут,
+    поэтому при заданных обоих списках база отражает состояние
+    «до распределения» и подходит только для замеров чтения.
+    """
+    engine = create_engine(f'sqlite:///{database_path}')
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        if projects:
+            connection.execute(
+                insert(CharityProject.__table__), project_rows(projects)
+            )
+        if donations:
+            connection.execute(
+                insert(Donation.__table__), donation_rows(donations)
+            )
+    engine.dispose()
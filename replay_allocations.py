@@ -0,0 +1,43 @@
+import argparse
+import asyncio
+
+from app.core.db import AsyncSessionLocal
+from app.services.replay import AllocationReplay, ReplayReport
+
+
+async def replay(dry_run: bool, batch_size: int) -> ReplayReport:
+    """Пересчитывает распределение средств по всей базе."""
+    async with AsyncSessionLocal() as session:
+        return await AllocationReplay(
+            session,
+            dry_run=dry_run,
+            batch_size=batch_size,
+            on_diff=print if dry_run else None,
+        ).run()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description=(
+            'Пересчёт invested_amount, fully_invested и close_date '
+            'для всех проектов и пожертвований и перестроение журнала '
+            'вложений.'
+        )
+    )
+    parser.add_argument(
+        '--dry-run',
+        action='store_true',
+        help='только вывести расхождения, ничего не записывая',
+    )
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=1000,
+        help='размер пакета для записи исправлений',
+    )
+    args = parser.parse_args()
+    report = asyncio.run(replay(args.dry_run, args.batch_size))
+    print(
+        f'Проектов: {report.projects}, пожертвований: {report.donations}, '
+        f'исправлений: {report.corrections}, вложений: {report.investments}'
+    )
@@ -7,6 +7,12 @@ from sqlalchemy import create_engine
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
+from app.core.config import settings
+from app.core.db import recent_writes, track_queries
+from app.core.slow_queries import slow_query_log
+from app.crud.cache import model_caches
+from app.services.snapshot import project_list_snapshot
+
 try:
     from app.main import app  # noqa
 except (NameError, ImportError) as error:
@@ -16,10 +22,10 @@ except (NameError, ImportError) as error:
     )
 
 try:
-    from app.core.db import Base, get_async_session  # noqa
+    from app.core.db import Base, get_async_session, get_read_session  # noqa
 except (NameError, ImportError) as error:
     raise AssertionError(
-        'При импорте объектов `Base, get_async_session` '
+        'При импорте объектов `Base, get_async_session, get_read_session` '
         'из модуля `app.core.db` возникло исключение:\n'
         f'{type(error).__name__}: {error}.'
     )
@@ -48,6 +54,7 @@ BASE_DIR = Path(__file__).resolve(strict=True).parent.parent
 pytest_plugins = [
     'fixtures.user',
     'fixtures.data',
+    'fixtures.queries',
 ]
 
 TEST_DB = BASE_DIR / 'test.db'
@@ -56,6 +63,7 @@ engine = create_async_engine(
     SQLALCHEMY_DATABASE_URL,
     connect_args={'check_same_thread': False},
 )
+track_queries(engine)
 TestingSessionLocal = sessionmaker(
     class_=AsyncSession, autocommit=False, autoflush=False, bind=engine,
 )
@@ -66,8 +74,18 @@ async def override_db():
         yield session
 
 
+@pytest.fixture(scope='session', autouse=True)
+def log_dir(tmp_path_factory):
+    settings.log_dir = tmp_path_factory.mktemp('logs')
+
+
 @pytest_asyncio.fixture(autouse=True)
 async def init_db():
+    for cache in model_caches.values():
+        cache.clear()
+    project_list_snapshot.clear()
+    recent_writes.clear()
+    slow_query_log.clear()
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
     yield
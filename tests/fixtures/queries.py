@@ -0,0 +1,124 @@
+import re
+
+import pytest
+from conftest import engine
+from sqlalchemy import event
+
+from app.core.db import Base
+
+PLANNED_STATEMENTS = ('SELECT', 'UPDATE', 'DELETE', 'WITH')
+FULL_SCAN = re.compile(
+    r'^SCAN (?:TABLE )?(\w+)(?: AS \w+)?'
+    r'(?: USING (?:COVERING )?INDEX (\w+))?'
+)
+LIMIT = re.compile(r'\bLIMIT\b')
+SERVER_TIMING_DB = re.compile(r'db;dur=([\d.]+);desc="(\d+) queries"')
+
+
+class QueryLog:
+    """Журнал SQL-запросов и коммитов тестового движка."""
+
+    def __init__(self):
+        self.statements = []
+        self.commits = 0
+
+    def clear(self):
+        self.statements.clear()
+        self.commits = 0
+
+    def on_execute(self, conn, cursor, statement, *args):
+        self.statements.append(statement)
+
+    def on_commit(self, conn):
+        self.commits += 1
+
+
+class QueryPlans:
+    """Планы `EXPLAIN QUERY PLAN` всех запросов тестового движка.
+
+    План строится перед выполнением запроса на том же соединении
+    и с теми же параметрами.
+    """
+
+    def __init__(self):
+        self.plans = []
+
+    def clear(self):
+        self.plans.clear()
+
+    def on_execute(
+            self, conn, cursor, statement, parameters, context, executemany
+    ):
+        if executemany or not statement.lstrip().upper().startswith(
+            PLANNED_STATEMENTS
+        ):
+            return
+        plan_cursor = conn.connection.cursor()
+        try:
+            plan_cursor.execute('EXPLAIN QUERY PLAN ' + statement, parameters)
+            details = [row[-1] for row in plan_cursor.fetchall()]
+        finally:
+            plan_cursor.close()
+        self.plans.append((statement, details))
+
+    def full_scans(self):
+        """Запросы, читающие таблицу или индекс целиком.
+
+        `SCAN` по индексу в запросе с `LIMIT` — первая страница
+        или порция в порядке индекса, она читает только `LIMIT` строк
+        и сканированием не считается.
+        """
+        scans = []
+        for statement, details in self.plans:
+            for detail in details:
+                match = FULL_SCAN.match(detail)
+                if not match or match.group(1) not in Base.metadata.tables:
+                    continue
+                if match.group(2) and LIMIT.search(statement):
+                    continue
+                scans.append((statement, detail))
+        return scans
+
+
+@pytest.fixture
+def query_log():
+    log = QueryLog()
+    sync_engine = engine.sync_engine
+    event.listen(sync_engine, 'before_cursor_execute', log.on_execute)
+    event.listen(sync_engine, 'commit', log.on_commit)
+    yield log
+    event.remove(sync_engine, 'before_cursor_execute', log.on_execute)
+    event.remove(sync_engine, 'commit', log.on_commit)
+
+
+@pytest.fixture
+def query_plans():
+    plans = QueryPlans()
+    sync_engine = engine.sync_engine
+    event.listen(sync_engine, 'before_cursor_execute', plans.on_execute)
+    yield plans
+    event.remove(sync_engine, 'before_cursor_execute', plans.on_execute)
+
+
+def server_timing_queries(response):
+    """Число запросов к базе из заголовка `Server-Timing` ответа."""
+    header = response.headers.get('Server-Timing', '')
+    match = SERVER_TIMING_DB.search(header)
+    assert match, (
+        'Ответ должен содержать заголовок `Server-Timing` с числом '
+        f'запросов к базе, получено: `{header}`.'
+    )
+    return int(match.group(2))
+
+
+@pytest.fixture
+def max_queries():
+    """Проверка верхней границы числа запросов к базе для ответа API."""
+    def check(response, limit):
+        count = server_timing_queries(response)
+        assert count <= limit, (
+            f'Эндпоинт `{response.request.method} {response.request.url}` '
+            f'выполнил {count} запросов к базе, ожидалось не больше {limit}.'
+        )
+        return count
+    return check
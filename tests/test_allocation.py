@@ -0,0 +1,154 @@
+import asyncio
+import random
+from datetime import datetime, timedelta
+
+import pytest
+from conftest import TestingSessionLocal
+from sqlalchemy import delete, func, select
+
+from app.core.config import Constant, settings
+from app.models import CharityProject, Donation, Investment, User
+from app.schemas.donation import DonationCreate
+from app.services.utils import (
+    distribute_funds,
+    process_new_donation,
+    stream_distribute_funds,
+)
+
+
+def make_events(seed, count=60):
+    rnd = random.Random(seed)
+    start = datetime(2020, 1, 1)
+    return [
+        (
+            rnd.choice((CharityProject, Donation)),
+            rnd.choice((rnd.randint(1, 50), rnd.randint(100, 1000))),
+            start + timedelta(seconds=number // 3),
+        )
+        for number in range(count)
+    ]
+
+
+async def replay_events(events):
+    async with TestingSessionLocal() as session:
+        for model in (Investment, CharityProject, Donation):
+            await session.execute(delete(model))
+        await session.commit()
+        for number, (model, amount, create_date) in enumerate(events):
+            kwargs = dict(full_amount=amount, create_date=create_date)
+            if model is CharityProject:
+                kwargs.update(name=f'project {number}', description='-')
+            obj = model(**kwargs)
+            session.add(obj)
+            await session.commit()
+            await session.refresh(obj)
+            opened_model = (
+                Donation if model is CharityProject else CharityProject
+            )
+            await distribute_funds(opened_model, obj, session)
+        state = {}
+        for model in (CharityProject, Donation):
+            rows = await session.execute(select(
+                model.id,
+                model.invested_amount,
+                model.fully_invested,
+                model.close_date.is_not(None),
+            ).order_by(model.id))
+            state[model.__name__] = rows.all()
+        investments = await session.execute(select(
+            Investment.donation_id,
+            Investment.project_id,
+            Investment.amount,
+        ))
+        state[Investment.__name__] = sorted(investments.all())
+        return state
+
+
+@pytest.mark.parametrize('chunk_size', (1, 3, 100))
+@pytest.mark.parametrize('seed', range(5))
+async def test_sql_engine_matches_python_loop(monkeypatch, seed, chunk_size):
+    events = make_events(seed)
+    monkeypatch.setattr(settings, 'allocation_chunk_size', chunk_size)
+    monkeypatch.setattr(
+        settings, 'allocation_engine', Constant.ALLOCATION_ENGINE_PYTHON
+    )
+    expected = await replay_events(events)
+    monkeypatch.setattr(
+        settings, 'allocation_engine', Constant.ALLOCATION_ENGINE_SQL
+    )
+    assert await replay_events(events) == expected, (
+        'Распределение средств оконным SQL-запросом должно совпадать '
+        'с эталонным циклом `patch_distribute_funds`.'
+    )
+
+
+async def test_stream_distribute_funds_stops_early():
+    async with TestingSessionLocal() as session:
+        session.add_all([
+            CharityProject(
+                name=f'project {number}',
+                description='-',
+                full_amount=100,
+                create_date=datetime(2020, 1, 1) + timedelta(days=number),
+            )
+            for number in range(50)
+        ])
+        donation = Donation(full_amount=150)
+        session.add(donation)
+        await session.commit()
+        await session.refresh(donation)
+        scanned = await stream_distribute_funds(
+            CharityProject, donation, session, chunk_size=4
+        )
+    assert scanned == 4, (
+        'Потоковое распределение должно прекращать загрузку открытых '
+        'проектов, как только средства пожертвования израсходованы.'
+    )
+    assert donation.fully_invested
+
+
+@pytest.mark.parametrize(
+    'engine',
+    (Constant.ALLOCATION_ENGINE_SQL, Constant.ALLOCATION_ENGINE_PYTHON),
+)
+async def test_concurrent_donations(monkeypatch, engine):
+    monkeypatch.setattr(settings, 'allocation_engine', engine)
+    async with TestingSessionLocal() as session:
+        session.add_all([
+            CharityProject(
+                name=f'project {number}',
+                description='-',
+                full_amount=150,
+                create_date=datetime(2020, 1, 1) + timedelta(days=number),
+            )
+            for number in range(20)
+        ])
+        await session.commit()
+    user = User(id=2)
+
+    async def writer():
+        for _ in range(10):
+            async with TestingSessionLocal() as session:
+                await process_new_donation(
+                    DonationCreate(full_amount=65), session, user
+                )
+
+    results = await asyncio.gather(
+        *(writer() for _ in range(4)), return_exceptions=True
+    )
+    assert [
+        result for result in results if isinstance(result, Exception)
+    ] == [], 'Параллельные пожертвования не должны завершаться ошибкой.'
+    async with TestingSessionLocal() as session:
+        totals = [
+            await session.scalar(select(func.sum(column)))
+            for column in (
+                CharityProject.invested_amount,
+                Donation.invested_amount,
+                Investment.amount,
+            )
+        ]
+    assert totals == [2600, 2600, 2600], (
+        'Суммы распределения по проектам, пожертвованиям и журналу '
+        'должны совпадать при параллельной записи.'
+    )
@@ -0,0 +1,223 @@
+import pytest
+from conftest import TestingSessionLocal
+
+from app.crud.base import CRUDBase
+from app.crud.cache import (
+    LIST_KEY,
+    CacheBackend,
+    LRUCacheBackend,
+    mark_changed,
+)
+from app.core.config import Constant, settings
+from app.crud.charity_project import charity_project_crud
+from app.crud.donation import donation_crud, user_page_key
+from app.models import CharityProject
+
+PROJECTS_URL = '/charity_project/'
+DONATIONS_URL = '/donation/'
+MY_DONATIONS_URL = '/donation/my'
+CACHE_URL = '/cache/'
+ENGINES = (Constant.ALLOCATION_ENGINE_SQL, Constant.ALLOCATION_ENGINE_PYTHON)
+
+
+def test_lru_backend_evicts_oldest():
+    backend = LRUCacheBackend(max_size=2, ttl=60)
+    backend.set('a', 1)
+    backend.set('b', 2)
+    backend.get('a')
+    backend.set('c', 3)
+    assert backend.get('b') is None, (
+        'При переполнении должен вытесняться давно не использованный ключ.'
+    )
+    assert backend.get('a') == 1
+    assert backend.get('c') == 3
+
+
+def test_lru_backend_ttl(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr('app.crud.cache.time.monotonic', lambda: now[0])
+    backend = LRUCacheBackend(max_size=2, ttl=5)
+    backend.set('a', 1)
+    now[0] += 6
+    assert backend.get('a') is None, (
+        'Значение с истёкшим сроком жизни не должно возвращаться.'
+    )
+
+
+@pytest.mark.usefixtures('charity_project')
+def test_cache_backend_requires_all_methods():
+    class IncompleteBackend(CacheBackend):
+        def get(self, key):
+            return None
+
+    with pytest.raises(TypeError):
+        IncompleteBackend()
+
+
+async def test_project_list_cached(query_log):
+    async with TestingSessionLocal() as session:
+        first = await charity_project_crud.get_multi(session)
+        query_log.clear()
+        second = await charity_project_crud.get_multi(session)
+    assert [project.name for project in second] == [
+        project.name for project in first
+    ]
+    assert not query_log.statements, (
+        'Повторное чтение списка проектов должно обслуживаться из кэша '
+        'без SQL-запросов.'
+    )
+    assert charity_project_crud.cache.hits == 1
+
+
+@pytest.mark.usefixtures('charity_project')
+def test_project_list_invalidated_by_allocation(user_client):
+    user_client.get(PROJECTS_URL)
+    user_client.post('/donation/', json={'full_amount': 100})
+    projects = user_client.get(PROJECTS_URL).json()
+    assert projects[0]['invested_amount'] == 100, (
+        'Распределение пожертвования должно сбрасывать кэш проектов.'
+    )
+
+
+def test_project_cache_invalidated_by_update(superuser_client,
+                                             charity_project):
+    superuser_client.get(PROJECTS_URL)
+    superuser_client.patch(
+        f'{PROJECTS_URL}{charity_project.id}', json={'name': 'new name'}
+    )
+    projects = superuser_client.get(PROJECTS_URL).json()
+    assert projects[0]['name'] == 'new name', (
+        'Изменение проекта должно сбрасывать кэш проектов.'
+    )
+    superuser_client.delete(f'{PROJECTS_URL}{charity_project.id}')
+    assert superuser_client.get(PROJECTS_URL).json() == [], (
+        'Удаление проекта должно сбрасывать кэш проектов.'
+    )
+
+
+async def test_cached_get_and_rollback(charity_project):
+    cache = charity_project_crud.cache
+    async with TestingSessionLocal() as session:
+        await charity_project_crud.get(charity_project.id, session)
+    async with TestingSessionLocal() as session:
+        project = await charity_project_crud.get(charity_project.id, session)
+        assert cache.hits == 1
+        assert project in session, (
+            'Объект из кэша должен быть присоединён к сессии.'
+        )
+        assert isinstance(project, CharityProject)
+        assert project.name == charity_project.name
+        mark_changed(session, CharityProject, [charity_project.id])
+        await session.rollback()
+    assert cache.backend.get(charity_project.id) is not None, (
+        'Откат транзакции не должен сбрасывать кэш.'
+    )
+    async with TestingSessionLocal() as session:
+        mark_changed(session, CharityProject, [charity_project.id])
+        await session.commit()
+    assert cache.backend.get(charity_project.id) is None
+    assert cache.backend.get(LIST_KEY) is None
+
+
+async def test_cache_not_filled_after_concurrent_write(
+        charity_project, monkeypatch
+):
+    read_page = CRUDBase.get_page
+
+    async def read_then_rename(self, session, *args, **kwargs):
+        page = await read_page(self, session, *args, **kwargs)
+        async with TestingSessionLocal() as writer:
+            project = await writer.get(CharityProject, charity_project.id)
+            project.name = 'renamed'
+            mark_changed(writer, CharityProject, [project.id])
+            await writer.commit()
+        return page
+
+    monkeypatch.setattr(CRUDBase, 'get_page', read_then_rename)
+    async with TestingSessionLocal() as session:
+        await charity_project_crud.get_multi(session)
+    assert charity_project_crud.cache.backend.get(LIST_KEY) is None, (
+        'Данные, прочитанные до записи, зафиксированной во время чтения, '
+        'не должны сохраняться в кэш.'
+    )
+    monkeypatch.setattr(CRUDBase, 'get_page', read_page)
+    async with TestingSessionLocal() as session:
+        projects = await charity_project_crud.get_multi(session)
+    assert [project.name for project in projects] == ['renamed']
+
+
+def test_cache_stats(superuser_client, charity_project):
+    for _ in range(2):
+        superuser_client.get(f'{PROJECTS_URL}{charity_project.id}/investments')
+    response = superuser_client.get(CACHE_URL)
+    assert response.status_code == 200
+    assert response.json() == [
+        {'name': 'charityproject', 'hits': 1, 'misses': 1, 'size': 1},
+        {'name': 'donation', 'hits': 0, 'misses': 0, 'size': 0},
+    ], (
+        'Эндпоинт `/cache/` должен возвращать счётчики попаданий '
+        'и промахов кэша.'
+    )
+
+
+def test_cache_stats_forbidden_for_user(user_client):
+    assert user_client.get(CACHE_URL).status_code == 403
+
+
+@pytest.mark.usefixtures('donation')
+def test_my_first_page_cached(user_client, query_log):
+    first = user_client.get(MY_DONATIONS_URL)
+    query_log.clear()
+    second = user_client.get(MY_DONATIONS_URL)
+    assert second.json() == first.json()
+    assert not query_log.statements, (
+        'Повторный запрос первой страницы `/donation/my` должен '
+        'обслуживаться из кэша без запросов к базе:\n' +
+        '\n'.join(query_log.statements)
+    )
+    assert user_client.get(
+        MY_DONATIONS_URL, params={'limit': 1}
+    ).json() == first.json()
+    assert user_client.get(
+        MY_DONATIONS_URL, params={'fields': 'id'}
+    ).json() == [{'id': 1}], (
+        'Страницы с разными `limit` и `fields` должны кэшироваться '
+        'отдельно.'
+    )
+
+
+@pytest.mark.usefixtures('donation')
+def test_my_first_page_invalidated_on_create(user_client):
+    user_client.get(MY_DONATIONS_URL)
+    donation_crud.cache.set(user_page_key(1), {'other': 'page'})
+    user_client.post(DONATIONS_URL, json={'full_amount': 10})
+    assert len(user_client.get(MY_DONATIONS_URL).json()) == 2, (
+        'После создания пожертвования первая страница автора '
+        'должна быть перестроена.'
+    )
+    assert donation_crud.cache.backend.get(user_page_key(1)) is not None, (
+        'Создание пожертвования не должно сбрасывать страницы '
+        'других пользователей.'
+    )
+
+
+@pytest.mark.parametrize('engine', ENGINES)
+@pytest.mark.usefixtures('donation', 'another_donation')
+def test_my_first_page_invalidated_on_allocation(
+        superuser_client, monkeypatch, engine
+):
+    monkeypatch.setattr(settings, 'allocation_engine', engine)
+    for user_id in (1, 2):
+        donation_crud.cache.set(user_page_key(user_id), {'cached': 'page'})
+    response = superuser_client.post(PROJECTS_URL, json={
+        'name': 'Мёд', 'description': 'Для пчёл', 'full_amount': 50,
+    })
+    assert response.status_code == 200
+    assert donation_crud.cache.backend.get(user_page_key(2)) is None, (
+        'Распределение средств пожертвования должно сбрасывать '
+        'первую страницу его автора.'
+    )
+    assert donation_crud.cache.backend.get(user_page_key(1)) is not None, (
+        'Пожертвования, не затронутые распределением, не должны '
+        'сбрасывать кэш своих авторов.'
+    )
@@ -0,0 +1,132 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+import pytest_asyncio
+from conftest import TestingSessionLocal, engine
+from fastapi import HTTPException
+from sqlalchemy import event, select
+
+from app.models import CharityProject, Donation, User
+from app.schemas.charity_project import CharityProjectCreate
+from app.schemas.donation import DonationCreate
+from app.services.coordinator import AllocationCoordinator
+
+
+@pytest_asyncio.fixture
+async def coordinator():
+    coordinator = AllocationCoordinator(
+        TestingSessionLocal, batch_size=50, max_linger=0.05
+    )
+    await coordinator.start()
+    yield coordinator
+    await coordinator.stop()
+
+
+@pytest.fixture
+def commits():
+    counter = []
+
+    def on_commit(conn):
+        counter.append(conn)
+
+    event.listen(engine.sync_engine, 'commit', on_commit)
+    yield counter
+    event.remove(engine.sync_engine, 'commit', on_commit)
+
+
+async def test_coordinator_group_commit(coordinator, commits):
+    async with TestingSessionLocal() as session:
+        session.add_all([
+            CharityProject(
+                name=name,
+                description='-',
+                full_amount=250,
+                create_date=datetime(2020, 1, number + 1),
+            )
+            for number, name in enumerate(('first', 'second'))
+        ])
+        await session.commit()
+    commits.clear()
+    user = User(id=2)
+    donations = await asyncio.gather(*(
+        coordinator.submit(Donation, DonationCreate(full_amount=100), user)
+        for _ in range(4)
+    ))
+    assert len(commits) == 1, (
+        'Пакет пожертвований должен фиксироваться одной транзакцией.'
+    )
+    assert [donation.fully_invested for donation in donations] == [
+        True, True, True, True
+    ]
+    assert all(donation.user_id == 2 for donation in donations)
+    async with TestingSessionLocal() as session:
+        projects = (await session.execute(
+            select(CharityProject).order_by(CharityProject.id)
+        )).scalars().all()
+    assert [project.invested_amount for project in projects] == [250, 150]
+    assert [project.fully_invested for project in projects] == [True, False]
+
+
+async def test_coordinator_rejects_duplicate_project(coordinator):
+    project = CharityProjectCreate(
+        name='chimichangas4life', description='-', full_amount=100
+    )
+    results = await asyncio.gather(
+        coordinator.submit(CharityProject, project),
+        coordinator.submit(CharityProject, project),
+        coordinator.submit(Donation, DonationCreate(full_amount=60)),
+        return_exceptions=True,
+    )
+    assert results[0].name == 'chimichangas4life'
+    assert isinstance(results[1], HTTPException)
+    assert results[1].status_code == 400
+    assert results[2].fully_invested
+    assert results[0].invested_amount == 60
+
+
+async def test_coordinator_keeps_batch_items_open(coordinator):
+    async with TestingSessionLocal() as session:
+        session.add(Donation(
+            full_amount=100, user_id=2, create_date=datetime(2020, 1, 1)
+        ))
+        await session.commit()
+    user = User(id=2)
+    small, donation, large = await asyncio.gather(
+        coordinator.submit(CharityProject, CharityProjectCreate(
+            name='small', description='-', full_amount=50
+        )),
+        coordinator.submit(Donation, DonationCreate(full_amount=100), user),
+        coordinator.submit(CharityProject, CharityProjectCreate(
+            name='large', description='-', full_amount=200
+        )),
+    )
+    assert small.fully_invested
+    assert large.invested_amount == 150, (
+        'Пожертвование, созданное ранее в том же пакете, должно '
+        'распределяться на следующие проекты пакета.'
+    )
+    assert donation.fully_invested
+    async with TestingSessionLocal() as session:
+        donations = (await session.execute(
+            select(Donation).order_by(Donation.id)
+        )).scalars().all()
+    assert [item.invested_amount for item in donations] == [100, 100]
+
+
+async def test_coordinator_stop_cancels_batch_in_progress(
+        coordinator, monkeypatch):
+    started = asyncio.Event()
+
+    async def stuck(batch):
+        started.set()
+        await asyncio.Event().wait()
+
+    monkeypatch.setattr(coordinator, '_process', stuck)
+    submitted = asyncio.create_task(coordinator.submit(
+        Donation, DonationCreate(full_amount=100), User(id=2)
+    ))
+    await asyncio.wait_for(started.wait(), 1)
+    await coordinator.stop()
+    with pytest.raises(asyncio.CancelledError):
+        await asyncio.wait_for(submitted, 1)
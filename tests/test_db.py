@@ -38,3 +38,43 @@ def test_check_db_url():
                 'Укажите значение по умолчанию для подключения базы данных '
                 'sqlite '
             )
+
+
+def test_engine_options_pool_profile():
+    from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+    from app.core.db import engine_options
+
+    assert 'poolclass' not in engine_options(Settings()), (
+        'Без `pool_size` должен использоваться пул диалекта по умолчанию.'
+    )
+    options = engine_options(
+        Settings(pool_size=3, pool_max_overflow=2, pool_pre_ping=True)
+    )
+    assert options['poolclass'] is AsyncAdaptedQueuePool
+    assert options['pool_size'] == 3
+    assert options['max_overflow'] == 2
+    assert options['pool_pre_ping'] is True
+
+
+async def test_sqlite_pragmas_applied(tmp_path):
+    from sqlalchemy import text
+
+    from app.core.db import build_engine
+
+    engine = build_engine(Settings(
+        database_url=f'sqlite+aiosqlite:///{tmp_path / "pragmas.db"}',
+        sqlite_journal_mode='WAL',
+        sqlite_synchronous='NORMAL',
+        sqlite_busy_timeout=1234,
+        sqlite_mmap_size=None,
+    ))
+    async with engine.connect() as conn:
+        pragmas = {
+            name: (await conn.execute(text(f'PRAGMA {name}'))).scalar()
+            for name in ('journal_mode', 'synchronous', 'busy_timeout')
+        }
+    await engine.dispose()
+    assert pragmas == {
+        'journal_mode': 'wal', 'synchronous': 1, 'busy_timeout': 1234
+    }, 'Прагмы SQLite из настроек должны применяться к соединениям.'
@@ -0,0 +1,107 @@
+import pytest
+
+from app.api import etag as etag_module
+from app.core.config import settings
+
+PROJECTS_URL = '/charity_project/'
+MY_DONATIONS_URL = '/donation/my'
+
+
+@pytest.mark.usefixtures('charity_project')
+def test_projects_not_modified(user_client, query_log):
+    response = user_client.get(PROJECTS_URL)
+    etag = response.headers.get('etag')
+    assert etag, (
+        f'Ответ эндпоинта `{PROJECTS_URL}` должен содержать заголовок ETag.'
+    )
+    query_log.clear()
+    response = user_client.get(PROJECTS_URL, headers={'If-None-Match': etag})
+    assert response.status_code == 304, (
+        'Условный GET-запрос с актуальным ETag должен вернуть 304.'
+    )
+    assert response.content == b''
+    assert not query_log.statements, (
+        'Ответ 304 должен формироваться без SQL-запросов.'
+    )
+
+
+@pytest.mark.usefixtures('charity_project')
+def test_projects_etag_changes_after_write(user_client):
+    etag = user_client.get(PROJECTS_URL).headers['etag']
+    user_client.post('/donation/', json={'full_amount': 100})
+    response = user_client.get(PROJECTS_URL, headers={'If-None-Match': etag})
+    assert response.status_code == 200, (
+        'После распределения пожертвования ETag списка проектов '
+        'должен измениться.'
+    )
+    assert response.headers['etag'] != etag
+    assert response.json()[0]['invested_amount'] == 100
+
+
+@pytest.mark.usefixtures('charity_project')
+def test_projects_etag_depends_on_query(user_client):
+    etag = user_client.get(PROJECTS_URL).headers['etag']
+    response = user_client.get(
+        PROJECTS_URL, params={'limit': 1}, headers={'If-None-Match': etag}
+    )
+    assert response.status_code == 200, (
+        'ETag должен различать ответы с разными параметрами запроса.'
+    )
+
+
+def test_my_donations_not_modified(user_client):
+    user_client.post('/donation/', json={'full_amount': 10})
+    etag = user_client.get(MY_DONATIONS_URL).headers['etag']
+    response = user_client.get(
+        MY_DONATIONS_URL, headers={'If-None-Match': etag}
+    )
+    assert response.status_code == 304
+    user_client.post('/donation/', json={'full_amount': 20})
+    response = user_client.get(
+        MY_DONATIONS_URL, headers={'If-None-Match': etag}
+    )
+    assert response.status_code == 200, (
+        'Новое пожертвование должно менять ETag списка '
+        '`/donation/my`.'
+    )
+    assert len(response.json()) == 2
+
+
+def test_projects_etag_follows_snapshot_content(
+        user_client, charity_project, mixer, monkeypatch
+):
+    etag = user_client.get(PROJECTS_URL).headers['etag']
+    mixer.blend(
+        'app.models.charity_project.CharityProject',
+        name='written without invalidation',
+        description='-',
+        full_amount=10,
+    )
+    monkeypatch.setattr(settings, 'cache_ttl', 0)
+    response = user_client.get(PROJECTS_URL, headers={'If-None-Match': etag})
+    assert response.status_code == 200, (
+        'После пересборки снимка с другим содержимым ETag '
+        'должен измениться.'
+    )
+    assert len(response.json()) == 2
+    assert user_client.get(
+        PROJECTS_URL, headers={'If-None-Match': response.headers['etag']}
+    ).status_code == 304
+
+
+def test_etag_expires_with_cache_ttl(user_client, monkeypatch):
+    monkeypatch.setattr(etag_module, 'cache_epoch', lambda: 1)
+    user_client.post('/donation/', json={'full_amount': 10})
+    etag = user_client.get(MY_DONATIONS_URL).headers['etag']
+    response = user_client.get(
+        MY_DONATIONS_URL, headers={'If-None-Match': etag}
+    )
+    assert response.status_code == 304
+    monkeypatch.setattr(etag_module, 'cache_epoch', lambda: 2)
+    response = user_client.get(
+        MY_DONATIONS_URL, headers={'If-None-Match': etag}
+    )
+    assert response.status_code == 200, (
+        'ETag по версии данных процесса должен устаревать через '
+        '`cache_ttl`: записи других процессов эту версию не меняют.'
+    )
@@ -0,0 +1,60 @@
+import csv
+import io
+import json
+
+import pytest
+
+from app.core.config import settings
+
+PROJECTS_EXPORT_URL = '/charity_project/export'
+DONATIONS_EXPORT_URL = '/donation/export'
+
+
+@pytest.mark.usefixtures('donation', 'another_donation')
+def test_export_donations_ndjson(superuser_client, monkeypatch):
+    monkeypatch.setattr(settings, 'export_chunk_size', 1)
+    listing = superuser_client.get('/donation/').json()
+    response = superuser_client.get(DONATIONS_EXPORT_URL)
+    assert response.status_code == 200, (
+        f'GET-запрос суперпользователя к эндпоинту `{DONATIONS_EXPORT_URL}` '
+        'должен вернуть статус-код 200.'
+    )
+    assert response.headers['content-type'].startswith(
+        'application/x-ndjson'
+    )
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [
+        {key: value for key, value in row.items() if value is not None}
+        for row in rows
+    ] == listing, (
+        'Выгрузка NDJSON должна содержать те же пожертвования, '
+        'что и список `/donation/`.'
+    )
+
+
+@pytest.mark.usefixtures(
+    'charity_project', 'charity_project_nunchaku',
+    'small_fully_charity_project',
+)
+def test_export_projects_csv_with_filters(superuser_client):
+    response = superuser_client.get(
+        PROJECTS_EXPORT_URL,
+        params={'format': 'csv', 'fully_invested': False},
+    )
+    assert response.status_code == 200
+    assert response.headers['content-type'].startswith('text/csv')
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row['name'] for row in rows] == [
+        'chimichangas4life', 'nunchaku'
+    ], (
+        'Выгрузка CSV должна учитывать фильтры списка проектов.'
+    )
+    assert rows[0]['full_amount'] == '1000000'
+
+
+@pytest.mark.parametrize('url', [PROJECTS_EXPORT_URL, DONATIONS_EXPORT_URL])
+def test_export_forbidden_for_user(user_client, url):
+    response = user_client.get(url)
+    assert response.status_code == 403, (
+        f'Эндпоинт `{url}` должен быть доступен только суперпользователю.'
+    )
@@ -0,0 +1,50 @@
+import pytest
+
+PROJECTS_URL = '/charity_project/'
+DONATIONS_URL = '/donation/'
+MY_DONATIONS_URL = '/donation/my'
+
+
+@pytest.mark.usefixtures('charity_project', 'charity_project_nunchaku')
+def test_project_fields_projection(user_client, query_log):
+    response = user_client.get(
+        PROJECTS_URL,
+        params={'fields': 'invested_amount,id,name,full_amount'},
+    )
+    assert response.status_code == 200
+    assert response.json() == [
+        {'name': 'chimichangas4life', 'full_amount': 1000000, 'id': 1,
+         'invested_amount': 0},
+        {'name': 'nunchaku', 'full_amount': 5000000, 'id': 2,
+         'invested_amount': 0},
+    ], (
+        'Параметр `fields` должен ограничивать поля ответа, '
+        'порядок полей — как в схеме.'
+    )
+    assert not any(
+        'description' in statement for statement in query_log.statements
+    ), (
+        'Поля, не указанные в `fields`, не должны выбираться из базы:\n' +
+        '\n'.join(query_log.statements)
+    )
+
+
+@pytest.mark.usefixtures('donation')
+def test_donation_fields_projection(superuser_client):
+    response = superuser_client.get(
+        DONATIONS_URL, params={'fields': 'id,user_id'}
+    )
+    assert response.json() == [{'id': 1, 'user_id': 2}]
+
+
+@pytest.mark.parametrize('url, fields', [
+    (PROJECTS_URL, 'id,unknown'),
+    (PROJECTS_URL, ','),
+    (MY_DONATIONS_URL, 'id,user_id'),
+])
+def test_invalid_fields(user_client, url, fields):
+    response = user_client.get(url, params={'fields': fields})
+    assert response.status_code == 422, (
+        f'Поля `{fields}`, отсутствующие в схеме ответа эндпоинта '
+        f'`{url}`, должны приводить к статус-коду 422.'
+    )
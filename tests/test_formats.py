@@ -0,0 +1,108 @@
+import msgpack
+import pytest
+
+from app.api.responses import (
+    COLUMNAR_JSON_MEDIA_TYPE,
+    MSGPACK_MEDIA_TYPE,
+    parse_accept_header,
+)
+
+PROJECTS_URL = '/charity_project/'
+DONATIONS_URL = '/donation/'
+MY_DONATIONS_URL = '/donation/my'
+
+
+@pytest.mark.usefixtures('charity_project', 'charity_project_nunchaku')
+def test_project_list_columnar(user_client):
+    response = user_client.get(
+        PROJECTS_URL,
+        params={'fields': 'id,name,close_date'},
+        headers={'Accept': COLUMNAR_JSON_MEDIA_TYPE},
+    )
+    assert response.status_code == 200
+    assert response.headers['content-type'] == COLUMNAR_JSON_MEDIA_TYPE
+    assert response.headers['vary'] == 'Accept'
+    assert response.json() == {
+        'id': [1, 2],
+        'name': ['chimichangas4life', 'nunchaku'],
+        'close_date': [None, None],
+    }, (
+        'Столбцовый JSON должен содержать массивы значений по полям '
+        'в порядке схемы, `None` сохраняется как `null`.'
+    )
+
+
+def test_columnar_empty_list(user_client):
+    response = user_client.get(
+        PROJECTS_URL, headers={'Accept': COLUMNAR_JSON_MEDIA_TYPE}
+    )
+    assert response.status_code == 200
+    assert response.json()['id'] == [], (
+        'Пустой список в столбцовом JSON должен содержать пустые массивы.'
+    )
+
+
+@pytest.mark.usefixtures('charity_project')
+def test_default_json_unchanged(user_client):
+    default = user_client.get(PROJECTS_URL)
+    explicit = user_client.get(
+        PROJECTS_URL, headers={'Accept': 'text/html, application/json;q=0.9'}
+    )
+    assert explicit.status_code == 200
+    assert explicit.headers['content-type'] == 'application/json'
+    assert explicit.json() == default.json(), (
+        'Ответ для `Accept: application/json` должен совпадать '
+        'с ответом по умолчанию.'
+    )
+
+
+@pytest.mark.usefixtures('donation')
+def test_my_donations_columnar(user_client):
+    response = user_client.get(
+        MY_DONATIONS_URL,
+        params={'fields': 'id,full_amount'},
+        headers={'Accept': COLUMNAR_JSON_MEDIA_TYPE},
+    )
+    assert response.json() == {'id': [1], 'full_amount': [100]}
+
+
+@pytest.mark.usefixtures('donation')
+def test_donation_list_msgpack(superuser_client):
+    response = superuser_client.get(
+        DONATIONS_URL, headers={'Accept': MSGPACK_MEDIA_TYPE}
+    )
+    assert response.status_code == 200
+    assert response.headers['content-type'] == MSGPACK_MEDIA_TYPE
+    assert msgpack.unpackb(response.content) == superuser_client.get(
+        DONATIONS_URL
+    ).json(), (
+        'MessagePack должен содержать те же объекты, что и JSON-ответ.'
+    )
+
+
+def test_unsupported_media_type(user_client):
+    response = user_client.get(
+        PROJECTS_URL, headers={'Accept': 'application/xml'}
+    )
+    assert response.status_code == 406, (
+        'Запрос неподдерживаемого формата должен получать 406.'
+    )
+
+
+def test_etag_depends_on_accept(user_client):
+    default = user_client.get(PROJECTS_URL)
+    columnar = user_client.get(
+        PROJECTS_URL, headers={'Accept': COLUMNAR_JSON_MEDIA_TYPE}
+    )
+    assert default.headers['etag'] != columnar.headers['etag'], (
+        'ETag должен различаться для разных форматов ответа.'
+    )
+
+
+def test_parse_accept_header():
+    assert parse_accept_header(
+        'application/json;q=0.5, application/x-msgpack, */*;q=0'
+    ) == ['application/x-msgpack', 'application/json']
+    assert parse_accept_header('br;q=0, GZIP;q=0.5, identity') == [
+        'identity', 'gzip'
+    ]
@@ -0,0 +1,85 @@
+import logging
+
+import pytest
+
+from app.core.db import QueryStats
+
+DONATIONS_URL = '/donation/'
+MY_DONATIONS_URL = '/donation/my'
+PROJECTS_URL = '/charity_project/'
+
+
+def test_query_stats():
+    stats = QueryStats()
+    assert stats.server_timing() == 'db;dur=0.000;desc="0 queries"'
+    stats.add('SELECT 1', 0.002)
+    stats.add('SELECT 2', 0.005)
+    stats.add('SELECT 3', 0.001)
+    assert stats.count == 3
+    assert stats.slowest == 'SELECT 2', (
+        'Статистика должна хранить самый долгий запрос.'
+    )
+    assert stats.server_timing() == 'db;dur=8.000;desc="3 queries"'
+
+
+@pytest.mark.usefixtures('charity_project', 'charity_project_nunchaku')
+@pytest.mark.parametrize('url, limit', [
+    (PROJECTS_URL, 1),
+    (PROJECTS_URL + '?limit=1', 1),
+])
+def test_project_endpoints_query_budget(test_client, max_queries, url, limit):
+    response = test_client.get(url)
+    assert response.status_code == 200
+    assert max_queries(response, limit) > 0, (
+        'Заголовок `Server-Timing` должен учитывать запросы к базе.'
+    )
+
+
+@pytest.mark.usefixtures('charity_project', 'donation')
+@pytest.mark.parametrize('url, limit', [
+    (DONATIONS_URL, 1),
+    (PROJECTS_URL + '1/investments', 2),
+])
+def test_superuser_endpoints_query_budget(
+        superuser_client, max_queries, url, limit
+):
+    response = superuser_client.get(url)
+    assert response.status_code == 200
+    max_queries(response, limit)
+
+
+@pytest.mark.usefixtures('charity_project', 'donation')
+def test_my_donations_query_budget(user_client, max_queries):
+    response = user_client.get(MY_DONATIONS_URL)
+    assert response.status_code == 200
+    max_queries(response, 1)
+
+
+@pytest.mark.usefixtures('charity_project', 'charity_project_nunchaku')
+def test_create_donation_query_budget(user_client, max_queries):
+    response = user_client.post(DONATIONS_URL, json={'full_amount': 1000500})
+    assert response.status_code == 200
+    max_queries(response, 7)
+
+
+def test_cached_response_without_queries(test_client, max_queries):
+    test_client.get(PROJECTS_URL)
+    response = test_client.get(PROJECTS_URL)
+    assert max_queries(response, 0) == 0, (
+        'Повторный запрос списка проектов должен обслуживаться из кэша.'
+    )
+
+
+@pytest.mark.usefixtures('charity_project')
+def test_query_stats_logged(test_client, caplog):
+    with caplog.at_level(logging.INFO):
+        test_client.get(PROJECTS_URL + '?limit=1')
+    records = [
+        record.getMessage() for record in caplog.records
+        if 'запросов к базе' in record.getMessage()
+    ]
+    assert records, 'Итоги запросов к базе должны записываться в лог.'
+    assert records[-1].startswith('GET /charity_project/: запросов к базе 1')
+    assert 'SELECT' in records[-1], (
+        'В лог должен записываться самый долгий запрос.'
+    )
@@ -0,0 +1,88 @@
+import pytest
+
+PROJECTS_URL = '/charity_project/'
+PROJECT_INVESTMENTS_URL = PROJECTS_URL + '{project_id}/investments'
+DONATION_INVESTMENTS_URL = '/donation/{donation_id}/investments'
+
+
+@pytest.mark.usefixtures('donation', 'another_donation')
+def test_project_investments(superuser_client):
+    response = superuser_client.post(
+        PROJECTS_URL,
+        json={
+            'name': 'Мертвый Бассейн',
+            'description': 'Deadpool inside',
+            'full_amount': 1000,
+        },
+    )
+    project_id = response.json()['id']
+    response = superuser_client.get(
+        PROJECT_INVESTMENTS_URL.format(project_id=project_id)
+    )
+    assert response.status_code == 200, (
+        'GET-запрос суперпользователя к эндпоинту '
+        f'`{PROJECT_INVESTMENTS_URL}` должен вернуть статус-код 200.'
+    )
+    data = [
+        {key: investment[key] for key in ('donation_id', 'amount')}
+        for investment in response.json()
+    ]
+    assert data == [
+        {'donation_id': 1, 'amount': 100},
+        {'donation_id': 2, 'amount': 900},
+    ], (
+        'Журнал вложений проекта должен содержать все переводы средств '
+        'из пожертвований в порядке их распределения.'
+    )
+
+
+def test_project_investments_not_found(superuser_client):
+    response = superuser_client.get(
+        PROJECT_INVESTMENTS_URL.format(project_id=100)
+    )
+    assert response.status_code == 404
+
+
+@pytest.mark.usefixtures('charity_project', 'charity_project_nunchaku')
+def test_donation_investments(user_client):
+    response = user_client.post('/donation/', json={'full_amount': 1000500})
+    donation_id = response.json()['id']
+    response = user_client.get(
+        DONATION_INVESTMENTS_URL.format(donation_id=donation_id)
+    )
+    assert response.status_code == 200
+    data = [
+        {key: investment[key] for key in ('project_id', 'amount')}
+        for investment in response.json()
+    ]
+    assert data == [
+        {'project_id': 1, 'amount': 1000000},
+        {'project_id': 2, 'amount': 500},
+    ], (
+        'Журнал вложений пожертвования должен показывать, '
+        'в какие проекты и в каком объёме направлены средства.'
+    )
+
+
+@pytest.mark.usefixtures('charity_project', 'another_donation')
+def test_donation_investments_of_another_user(user_client, mixer):
+    mixer.blend(
+        'app.models.investment.Investment',
+        donation_id=1,
+        project_id=1,
+        amount=100,
+    )
+    response = user_client.get(DONATION_INVESTMENTS_URL.format(donation_id=1))
+    assert response.status_code == 404, (
+        'Пользователь не должен видеть вложения чужих пожертвований.'
+    )
+
+
+def test_donation_investments_not_found(user_client):
+    response = user_client.get(
+        DONATION_INVESTMENTS_URL.format(donation_id=100)
+    )
+    assert response.status_code == 404, (
+        'Для несуществующего пожертвования должен возвращаться 404, '
+        'а не пустой список вложений.'
+    )
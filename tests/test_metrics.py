@@ -0,0 +1,185 @@
+import pytest
+from conftest import TestingSessionLocal
+from sqlalchemy import text
+
+from app.core.config import Constant, settings
+from app.core.db import (
+    DB_POOL_CHECKED_OUT,
+    DB_POOL_OVERFLOW,
+    build_engine,
+    pool_engines,
+    track_pool,
+)
+from app.core.metrics import (
+    ALLOCATION_DONATIONS,
+    ALLOCATION_ITEMS_SCANNED,
+    ALLOCATION_PROJECTS_CLOSED,
+    HTTP_REQUEST_DURATION,
+    HTTP_REQUESTS,
+    HTTP_REQUESTS_IN_PROGRESS,
+    PROMETHEUS_MEDIA_TYPE,
+    Counter,
+    Gauge,
+    Histogram,
+    MetricsRegistry,
+)
+from app.services.replay import AllocationReplay
+
+DONATIONS_URL = '/donation/'
+METRICS_URL = '/metrics'
+PROJECTS_URL = '/charity_project/'
+ENGINES = (Constant.ALLOCATION_ENGINE_SQL, Constant.ALLOCATION_ENGINE_PYTHON)
+
+
+def test_registry_render():
+    registry = MetricsRegistry()
+    counter = Counter('jobs_total', 'Jobs.', ('kind',), registry=registry)
+    gauge = Gauge('queue_size', 'Queue.', registry=registry)
+    histogram = Histogram(
+        'job_seconds', 'Job time.', registry=registry, buckets=(1, 5)
+    )
+    counter.inc(kind='a"b')
+    counter.inc(2, kind='a"b')
+    gauge.set(3)
+    gauge.dec()
+    for value in (0.5, 1, 3, 7):
+        histogram.observe(value)
+    assert registry.render() == (
+        '# HELP jobs_total Jobs.\n'
+        '# TYPE jobs_total counter\n'
+        'jobs_total{kind="a\\"b"} 3.0\n'
+        '# HELP queue_size Queue.\n'
+        '# TYPE queue_size gauge\n'
+        'queue_size 2.0\n'
+        '# HELP job_seconds Job time.\n'
+        '# TYPE job_seconds histogram\n'
+        'job_seconds_bucket{le="1.0"} 2.0\n'
+        'job_seconds_bucket{le="5.0"} 3.0\n'
+        'job_seconds_bucket{le="+Inf"} 4.0\n'
+        'job_seconds_sum 11.5\n'
+        'job_seconds_count 4.0\n'
+    ), 'Метрики должны выводиться в текстовом формате Prometheus.'
+
+
+def test_registry_rejects_invalid_metrics():
+    registry = MetricsRegistry()
+    counter = Counter('jobs_total', 'Jobs.', ('kind',), registry=registry)
+    with pytest.raises(ValueError):
+        Counter('jobs_total', 'Jobs.', registry=registry)
+    with pytest.raises(ValueError):
+        counter.inc()
+    with pytest.raises(ValueError):
+        counter.inc(-1, kind='a')
+
+
+@pytest.mark.usefixtures('charity_project')
+def test_http_metrics_by_route(test_client):
+    labels = dict(
+        method='GET', route='/charity_project/{project_id}/investments'
+    )
+    requests_before = HTTP_REQUESTS.value(status='401', **labels)
+    observations_before = HTTP_REQUEST_DURATION.value(**labels)
+    response = test_client.get(PROJECTS_URL + '1/investments')
+    assert response.status_code == 401
+    assert HTTP_REQUESTS.value(status='401', **labels) == (
+        requests_before + 1
+    ), 'Запросы должны учитываться по шаблону маршрута и коду ответа.'
+    assert HTTP_REQUEST_DURATION.value(**labels) == observations_before + 1
+    assert HTTP_REQUESTS_IN_PROGRESS.value(**labels) == 0, (
+        'После ответа запрос не должен учитываться как выполняющийся.'
+    )
+
+
+def test_unmatched_route(test_client):
+    labels = dict(method='GET', route='unmatched', status='404')
+    before = HTTP_REQUESTS.value(**labels)
+    assert test_client.get('/no/such/path').status_code == 404
+    assert HTTP_REQUESTS.value(**labels) == before + 1, (
+        'Запросы к неизвестным адресам должны учитываться одним рядом.'
+    )
+
+
+def test_metrics_endpoint(test_client):
+    test_client.get(PROJECTS_URL)
+    response = test_client.get(METRICS_URL)
+    assert response.status_code == 200
+    assert response.headers['Content-Type'] == (
+        PROMETHEUS_MEDIA_TYPE + '; charset=utf-8'
+    )
+    for line in (
+        '# TYPE http_requests_total counter',
+        'http_requests_total{method="GET",route="/charity_project/",'
+        'status="200"}',
+        '# TYPE http_request_duration_seconds histogram',
+        '# TYPE http_requests_in_progress gauge',
+        '# TYPE db_pool_checked_out gauge',
+        '# TYPE db_pool_overflow gauge',
+        '# TYPE allocation_donations_allocated_total counter',
+        '# TYPE allocation_projects_closed_total counter',
+        '# TYPE allocation_items_scanned histogram',
+    ):
+        assert line in response.text, (
+            f'Ответ `{METRICS_URL}` должен содержать `{line}`.'
+        )
+
+
+@pytest.mark.parametrize('engine', ENGINES)
+@pytest.mark.usefixtures('charity_project', 'charity_project_nunchaku')
+def test_allocation_metrics(user_client, monkeypatch, engine):
+    monkeypatch.setattr(settings, 'allocation_engine', engine)
+    donations = ALLOCATION_DONATIONS.value()
+    closed = ALLOCATION_PROJECTS_CLOSED.value()
+    allocations = ALLOCATION_ITEMS_SCANNED.value(engine=engine)
+    response = user_client.post(DONATIONS_URL, json={'full_amount': 1000500})
+    assert response.status_code == 200
+    assert ALLOCATION_DONATIONS.value() == donations + 1
+    assert ALLOCATION_PROJECTS_CLOSED.value() == closed + 1, (
+        'Закрытые распределением проекты должны учитываться в метриках.'
+    )
+    assert ALLOCATION_ITEMS_SCANNED.value(engine=engine) == allocations + 1
+
+
+@pytest.mark.parametrize('engine', ENGINES)
+@pytest.mark.usefixtures('charity_project', 'charity_project_nunchaku')
+def test_allocation_recorded_once_per_allocation(
+        user_client, monkeypatch, engine,
+):
+    monkeypatch.setattr(settings, 'allocation_engine', engine)
+    monkeypatch.setattr(settings, 'allocation_chunk_size', 1)
+    donations = ALLOCATION_DONATIONS.value()
+    allocations = ALLOCATION_ITEMS_SCANNED.value(engine=engine)
+    response = user_client.post(DONATIONS_URL, json={'full_amount': 1000500})
+    assert response.status_code == 200
+    assert ALLOCATION_ITEMS_SCANNED.value(engine=engine) == allocations + 1, (
+        'Распределение по нескольким порциям должно учитываться '
+        'в метриках один раз.'
+    )
+    assert ALLOCATION_DONATIONS.value() == donations + 1
+
+
+@pytest.mark.usefixtures('charity_project', 'charity_project_nunchaku')
+async def test_replay_not_recorded():
+    allocations = [
+        ALLOCATION_ITEMS_SCANNED.value(engine=engine) for engine in ENGINES
+    ]
+    async with TestingSessionLocal() as session:
+        await AllocationReplay(session, dry_run=True).run()
+    assert [
+        ALLOCATION_ITEMS_SCANNED.value(engine=engine) for engine in ENGINES
+    ] == allocations, 'Пересчёт распределения не должен учитываться в метриках.'
+
+
+async def test_pool_metrics(tmp_path):
+    pool_engine = build_engine(url=f'sqlite+aiosqlite:///{tmp_path}/pool.db')
+    track_pool(pool_engine, 'test')
+    try:
+        async with pool_engine.connect() as conn:
+            await conn.execute(text('SELECT 1'))
+            assert DB_POOL_CHECKED_OUT.value(engine='test') == 1, (
+                'Выданное пулом соединение должно учитываться в метриках.'
+            )
+        assert DB_POOL_CHECKED_OUT.value(engine='test') == 0
+        assert DB_POOL_OVERFLOW.value(engine='write') == 0
+    finally:
+        pool_engines.pop('test')
+        await pool_engine.dispose()
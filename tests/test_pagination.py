@@ -0,0 +1,130 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.config import Constant
+
+PROJECTS_URL = '/charity_project/'
+DONATIONS_URL = '/donation/'
+MY_DONATIONS_URL = '/donation/my'
+
+
+@pytest.fixture
+def many_projects(mixer):
+    start = datetime(2020, 1, 1)
+    return [
+        mixer.blend(
+            'app.models.charity_project.CharityProject',
+            name=f'project {number}',
+            description='-',
+            full_amount=100,
+            invested_amount=100 if number % 2 else 0,
+            fully_invested=bool(number % 2),
+            create_date=start + timedelta(days=number // 2),
+            close_date=(
+                start + timedelta(days=10 + number) if number % 2 else None
+            ),
+        )
+        for number in range(7)
+    ]
+
+
+def fetch_all_pages(client, url, **params):
+    pages = []
+    cursor = None
+    while True:
+        if cursor is not None:
+            params['cursor'] = cursor
+        response = client.get(url, params=params)
+        assert response.status_code == 200, (
+            f'GET-запрос к эндпоинту `{url}` с параметрами пагинации '
+            'должен вернуть статус-код 200.'
+        )
+        pages.append([item['id'] for item in response.json()])
+        cursor = response.headers.get(Constant.NEXT_CURSOR_HEADER)
+        if cursor is None:
+            return pages
+
+
+@pytest.mark.usefixtures('many_projects')
+def test_projects_keyset_pages(user_client):
+    pages = fetch_all_pages(user_client, PROJECTS_URL, limit=3)
+    assert pages == [[1, 2, 3], [4, 5, 6], [7]], (
+        'Страницы списка проектов должны идти в порядке '
+        '(`create_date`, `id`) без пропусков и повторов.'
+    )
+
+
+@pytest.mark.usefixtures('many_projects')
+def test_projects_without_limit_returns_full_list(user_client):
+    response = user_client.get(PROJECTS_URL)
+    assert len(response.json()) == 7, (
+        'Без параметра `limit` эндпоинт должен возвращать весь список.'
+    )
+    assert Constant.NEXT_CURSOR_HEADER not in response.headers
+
+
+@pytest.mark.usefixtures('many_projects')
+@pytest.mark.parametrize('params, expected_ids', [
+    ({'fully_invested': True}, [2, 4, 6]),
+    ({'fully_invested': False, 'limit': 2}, [1, 3, 5, 7]),
+    ({'create_date_from': '2020-01-02T00:00:00'}, [3, 4, 5, 6, 7]),
+    ({'create_date_to': '2020-01-02T00:00:00'}, [1, 2, 3, 4]),
+    (
+        {
+            'close_date_from': '2020-01-13T00:00:00',
+            'close_date_to': '2020-01-16T00:00:00',
+        },
+        [4, 6],
+    ),
+])
+def test_projects_filters(user_client, params, expected_ids):
+    pages = fetch_all_pages(user_client, PROJECTS_URL, **params)
+    ids = [obj_id for page in pages for obj_id in page]
+    assert ids == expected_ids, (
+        f'Фильтры {params} списка проектов работают некорректно.'
+    )
+
+
+@pytest.mark.usefixtures('donation', 'another_donation')
+def test_donations_keyset_pages(superuser_client):
+    pages = fetch_all_pages(superuser_client, DONATIONS_URL, limit=1)
+    assert pages == [[1], [2]], (
+        'Список пожертвований суперпользователя должен поддерживать '
+        'постраничный вывод.'
+    )
+
+
+@pytest.mark.parametrize('params', [
+    {'cursor': 'not-a-cursor'},
+    {'limit': 0},
+])
+def test_invalid_page_params(user_client, params):
+    response = user_client.get(PROJECTS_URL, params=params)
+    assert response.status_code == 422, (
+        'Некорректные параметры пагинации должны приводить '
+        'к статус-коду 422.'
+    )
+
+
+@pytest.fixture
+def many_user_donations(mixer):
+    start = datetime(2020, 1, 1)
+    return [
+        mixer.blend(
+            'app.models.donation.Donation',
+            user_id=2 if number % 3 else 1,
+            full_amount=100,
+            create_date=start + timedelta(days=number),
+        )
+        for number in range(8)
+    ]
+
+
+@pytest.mark.usefixtures('many_user_donations')
+def test_my_donations_keyset_pages(user_client):
+    pages = fetch_all_pages(user_client, MY_DONATIONS_URL, limit=2)
+    assert pages == [[2, 3], [5, 6], [8]], (
+        'Страницы пожертвований пользователя должны содержать только '
+        'его пожертвования в порядке (`create_date`, `id`).'
+    )
@@ -0,0 +1,194 @@
+import pytest
+import pytest_asyncio
+from conftest import engine
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+
+from app.core.config import settings
+from app.services import utils
+
+DONATIONS_URL = '/donation/'
+PROJECTS_URL = '/charity_project/'
+
+
+@pytest.mark.usefixtures('charity_project', 'charity_project_nunchaku')
+def test_create_donation_single_transaction(user_client, query_log):
+    response = user_client.post(DONATIONS_URL, json={'full_amount': 1000500})
+    assert response.status_code == 200
+    assert query_log.commits == 1, (
+        'Создание пожертвования и распределение средств должны '
+        'фиксироваться одной транзакцией.'
+    )
+    assert len(query_log.statements) <= 7, (
+        'POST-запрос к эндпоинту `/donation/` выполняет слишком много '
+        'SQL-запросов:\n' + '\n'.join(query_log.statements)
+    )
+
+
+@pytest.mark.usefixtures('donation')
+def test_create_project_single_transaction(superuser_client, query_log):
+    response = superuser_client.post(
+        PROJECTS_URL,
+        json={
+            'name': 'Мертвый Бассейн',
+            'description': 'Deadpool inside',
+            'full_amount': 100,
+        },
+    )
+    assert response.status_code == 200
+    assert query_log.commits == 1, (
+        'Создание проекта и распределение средств должны '
+        'фиксироваться одной транзакцией.'
+    )
+    assert len(query_log.statements) <= 6, (
+        'POST-запрос к эндпоинту `/charity_project/` выполняет слишком '
+        'много SQL-запросов:\n' + '\n'.join(query_log.statements)
+    )
+
+
+@pytest.mark.usefixtures('charity_project_nunchaku')
+def test_update_project_query_count(superuser_client, charity_project,
+                                    query_log):
+    response = superuser_client.patch(
+        f'{PROJECTS_URL}{charity_project.id}',
+        json={'name': 'Мертвый Бассейн', 'full_amount': 2000000},
+    )
+    assert response.status_code == 200
+    selects = [
+        statement for statement in query_log.statements
+        if statement.lstrip().upper().startswith('SELECT')
+    ]
+    assert len(selects) <= 2, (
+        'PATCH-запрос к эндпоинту `/charity_project/{project_id}` должен '
+        'загружать проект и проверять имя одним запросом:\n' +
+        '\n'.join(query_log.statements)
+    )
+    assert len(query_log.statements) <= 3
+
+
+@pytest.mark.usefixtures('charity_project')
+def test_create_project_no_name_prequery(superuser_client, query_log):
+    response = superuser_client.post(
+        PROJECTS_URL,
+        json={
+            'name': 'Мертвый Бассейн',
+            'description': 'Deadpool inside',
+            'full_amount': 100,
+        },
+    )
+    assert response.status_code == 200
+    name_lookups = [
+        statement for statement in query_log.statements
+        if statement.lstrip().upper().startswith('SELECT') and
+        'charityproject.name =' in statement
+    ]
+    assert not name_lookups, (
+        'Уникальность имени при создании проекта должна обеспечиваться '
+        'ограничением в базе, а не предварительным запросом:\n' +
+        '\n'.join(name_lookups)
+    )
+
+
+def test_update_project_same_own_name(superuser_client, charity_project):
+    response = superuser_client.patch(
+        f'{PROJECTS_URL}{charity_project.id}',
+        json={'name': charity_project.name},
+    )
+    assert response.status_code == 200, (
+        'PATCH-запрос, сохраняющий текущее имя проекта, не нарушает '
+        'уникальность имени.'
+    )
+
+
+def test_remove_project_query_count(superuser_client, charity_project,
+                                    query_log):
+    response = superuser_client.delete(
+        f'{PROJECTS_URL}{charity_project.id}'
+    )
+    assert response.status_code == 200
+    assert len(query_log.statements) <= 2, (
+        'DELETE-запрос к эндпоинту `/charity_project/{project_id}` '
+        'выполняет слишком много SQL-запросов:\n' +
+        '\n'.join(query_log.statements)
+    )
+
+
+@pytest_asyncio.fixture
+async def case_insensitive_names(monkeypatch):
+    monkeypatch.setattr(settings, 'project_name_case_insensitive', True)
+    async with engine.begin() as conn:
+        await conn.execute(text(
+            'CREATE UNIQUE INDEX uq_charityproject_name_lower '
+            'ON charityproject (lower(name))'
+        ))
+
+
+@pytest.mark.usefixtures('case_insensitive_names')
+def test_create_project_case_insensitive_name(
+        superuser_client, charity_project):
+    response = superuser_client.post(
+        PROJECTS_URL,
+        json={
+            'name': charity_project.name.upper(),
+            'description': 'Huge fan of chimichangas. Wanna buy a lot',
+            'full_amount': 100,
+        },
+    )
+    assert response.status_code == 400, (
+        'С уникальным индексом по `lower(name)` имя проекта, отличающееся '
+        'только регистром, должно приводить к статус-коду 400.'
+    )
+    assert response.json() == {'detail': 'Проект уже существует'}
+
+
+@pytest.mark.usefixtures('case_insensitive_names')
+def test_update_project_case_insensitive_name(
+        superuser_client, charity_project, charity_project_nunchaku):
+    response = superuser_client.patch(
+        f'{PROJECTS_URL}{charity_project_nunchaku.id}',
+        json={'name': charity_project.name.upper()},
+    )
+    assert response.status_code == 400, (
+        'Переименование проекта в имя, отличающееся от существующего '
+        'только регистром, должно приводить к статус-коду 400.'
+    )
+    assert response.json() == {'detail': 'Проект уже существует'}
+
+
+def test_project_names_case_sensitive_by_default(
+        superuser_client, charity_project):
+    response = superuser_client.post(
+        PROJECTS_URL,
+        json={
+            'name': charity_project.name.upper(),
+            'description': 'Huge fan of chimichangas. Wanna buy a lot',
+            'full_amount': 100,
+        },
+    )
+    assert response.status_code == 200, (
+        'Без `PROJECT_NAME_CASE_INSENSITIVE` названия, различающиеся '
+        'регистром, допустимы.'
+    )
+
+
+@pytest.mark.parametrize('method, url, json', [
+    ('post', PROJECTS_URL, {
+        'name': 'Новый проект',
+        'description': 'Описание',
+        'full_amount': 100,
+    }),
+    ('patch', '{url}{id}', {'description': 'Новое описание'}),
+])
+def test_project_integrity_error(
+        superuser_client, charity_project, monkeypatch, method, url, json):
+    async def commit_changes(db_obj, session):
+        raise IntegrityError('INSERT', {}, Exception('CHECK'))
+
+    monkeypatch.setattr(utils, 'commit_changes', commit_changes)
+    response = getattr(superuser_client, method)(
+        url.format(url=PROJECTS_URL, id=charity_project.id), json=json
+    )
+    assert response.status_code == 400, (
+        'Нарушение ограничений базы при записи проекта должно приводить '
+        'к статус-коду 400, а не 500.'
+    )
@@ -0,0 +1,137 @@
+import pytest
+from conftest import engine
+from sqlalchemy import text
+
+from app.core.config import Constant, settings
+
+ENGINES = (Constant.ALLOCATION_ENGINE_SQL, Constant.ALLOCATION_ENGINE_PYTHON)
+
+
+def assert_no_full_scans(query_plans):
+    assert query_plans.plans, 'Запросы к базе не были выполнены.'
+    scans = query_plans.full_scans()
+    assert not scans, (
+        'На горячем пути не должно быть полного сканирования таблиц:\n' +
+        '\n'.join(f'{detail}: {statement}' for statement, detail in scans)
+    )
+
+
+@pytest.mark.parametrize('engine', ENGINES)
+@pytest.mark.usefixtures('charity_project', 'charity_project_nunchaku')
+def test_create_donation_plans(user_client, query_plans, monkeypatch, engine):
+    monkeypatch.setattr(settings, 'allocation_engine', engine)
+    response = user_client.post('/donation/', json={'full_amount': 10})
+    assert response.status_code == 200
+    assert_no_full_scans(query_plans)
+
+
+@pytest.mark.parametrize('engine', ENGINES)
+@pytest.mark.usefixtures('donation', 'another_donation')
+def test_create_project_plans(
+        superuser_client, query_plans, monkeypatch, engine
+):
+    monkeypatch.setattr(settings, 'allocation_engine', engine)
+    response = superuser_client.post('/charity_project/', json={
+        'name': 'Мёд', 'description': 'Для пчёл', 'full_amount': 10,
+    })
+    assert response.status_code == 200
+    assert_no_full_scans(query_plans)
+
+
+@pytest.mark.usefixtures('donation')
+def test_user_read_plans(user_client, query_plans):
+    for url, params in (
+        ('/donation/my', {}),
+        ('/donation/1/investments', {}),
+        ('/charity_project/', {'limit': 1}),
+        ('/charity_project/', {'limit': 1, 'fully_invested': False}),
+    ):
+        response = user_client.get(url, params=params)
+        assert response.status_code == 200, url
+    assert_no_full_scans(query_plans)
+    assert any(
+        'ix_donation_user_id_create_date_id' in detail
+        for _, details in query_plans.plans for detail in details
+    ), 'Пожертвования пользователя должны выбираться по индексу `user_id`.'
+
+
+@pytest.mark.usefixtures('charity_project', 'donation')
+def test_superuser_plans(superuser_client, query_plans):
+    for method, url, params in (
+        (
+            'get', '/donation/',
+            {'params': {'limit': 1, 'fully_invested': False}},
+        ),
+        ('get', '/charity_project/1/investments', {}),
+        ('patch', '/charity_project/1', {'json': {'name': 'Новое имя'}}),
+        ('delete', '/charity_project/1', {}),
+    ):
+        response = getattr(superuser_client, method)(url, **params)
+        assert response.status_code == 200, url
+    assert_no_full_scans(query_plans)
+
+
+def assert_table_searched(query_plans, table):
+    details = [
+        detail for _, details in query_plans.plans for detail in details
+        if detail.split(' ')[1:2] == [table]
+    ]
+    assert details, f'Таблица `{table}` не читалась.'
+    assert all(detail.startswith('SEARCH') for detail in details), (
+        f'Таблица `{table}` должна читаться поиском по индексу:\n' +
+        '\n'.join(details)
+    )
+
+
+@pytest.mark.parametrize('url, table', [
+    ('/donation/', 'donation'),
+    ('/charity_project/', 'charityproject'),
+])
+@pytest.mark.usefixtures(
+    'charity_project', 'charity_project_nunchaku',
+    'donation', 'another_donation',
+)
+def test_keyset_page_plans(superuser_client, query_plans, url, table):
+    response = superuser_client.get(url, params={'limit': 1})
+    cursor = response.headers[Constant.NEXT_CURSOR_HEADER]
+    query_plans.clear()
+    response = superuser_client.get(
+        url, params={'limit': 1, 'cursor': cursor}
+    )
+    assert response.status_code == 200
+    assert_table_searched(query_plans, table)
+
+
+@pytest.mark.usefixtures('charity_project', 'charity_project_nunchaku')
+def test_uninvested_chunk_plans(user_client, query_plans, monkeypatch):
+    monkeypatch.setattr(
+        settings, 'allocation_engine', Constant.ALLOCATION_ENGINE_PYTHON
+    )
+    monkeypatch.setattr(settings, 'allocation_chunk_size', 1)
+    response = user_client.post('/donation/', json={'full_amount': 1000500})
+    assert response.status_code == 200
+    continuations = [
+        (statement, details) for statement, details in query_plans.plans
+        if '(charityproject.create_date, charityproject.id) >' in statement
+    ]
+    assert continuations, 'Открытые проекты должны читаться порциями.'
+    for statement, details in continuations:
+        assert any(
+            detail.startswith('SEARCH charityproject USING INDEX '
+                              'ix_charityproject_open_create_date_id')
+            for detail in details
+        ), (
+            'Следующая порция открытых проектов должна искаться '
+            f'по частичному индексу: {details}\n{statement}'
+        )
+
+
+async def test_full_scan_detected(query_plans):
+    async with engine.connect() as conn:
+        await conn.execute(
+            text('SELECT id FROM charityproject WHERE description = :value'),
+            {'value': 'x'},
+        )
+    assert query_plans.full_scans(), (
+        'Фикстура `query_plans` должна находить полное сканирование.'
+    )
@@ -0,0 +1,177 @@
+import pytest
+from conftest import TestingSessionLocal, app
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import Settings
+from app.core.db import (
+    REPLICA_SESSION_KEY,
+    RecentWrites,
+    get_async_session,
+    get_read_session,
+    read_database_url,
+    recent_writes,
+)
+from app.crud.charity_project import charity_project_crud
+from app.crud.donation import donation_crud
+from app.services.snapshot import project_list_snapshot
+
+PROJECTS_URL = '/charity_project/'
+DONATIONS_URL = '/donation/'
+MY_DONATIONS_URL = '/donation/my'
+
+
+@pytest.fixture
+def session_roles():
+    roles = []
+
+    def tracking(role):
+        async def override():
+            async with TestingSessionLocal() as session:
+                event.listen(
+                    session.sync_session,
+                    'after_begin',
+                    lambda *args: roles.append(role),
+                )
+                yield session
+        return override
+
+    app.dependency_overrides[get_read_session] = tracking('read')
+    app.dependency_overrides[get_async_session] = tracking('write')
+    return roles
+
+
+@pytest.fixture
+def replica_reads():
+    def override_with(session_factory):
+        async def override():
+            async with session_factory(
+                info={REPLICA_SESSION_KEY: True}
+            ) as session:
+                yield session
+        app.dependency_overrides[get_read_session] = override
+    return override_with
+
+
+@pytest.mark.parametrize('url, expected', [
+    (
+        'sqlite+aiosqlite:///./qrkot.db',
+        'sqlite+aiosqlite:///file:./qrkot.db?mode=ro&uri=true',
+    ),
+    ('sqlite+aiosqlite://', None),
+    ('postgresql+asyncpg://user@host/qrkot', None),
+])
+def test_read_database_url(url, expected):
+    assert read_database_url(Settings(database_url=url)) == expected
+
+
+def test_read_database_url_replica():
+    config = Settings(
+        database_url='sqlite+aiosqlite:///./qrkot.db',
+        read_replica_url='postgresql+asyncpg://replica/qrkot',
+    )
+    assert read_database_url(config) == 'postgresql+asyncpg://replica/qrkot'
+
+
+def test_recent_writes_window(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr('app.core.db.time.monotonic', lambda: now[0])
+    writes = RecentWrites(window=5)
+    writes.mark(1)
+    now[0] += 3
+    writes.mark(2)
+    assert writes.is_recent(1) and writes.is_recent(2)
+    now[0] += 3
+    assert not writes.is_recent(1), (
+        'Отметка записи должна истекать через `window` секунд.'
+    )
+    writes.mark(3)
+    assert writes.is_recent(2) and len(writes._deadlines) == 2, (
+        'Истёкшие отметки должны удаляться при новой записи.'
+    )
+
+
+@pytest.mark.usefixtures('charity_project', 'donation')
+def test_get_endpoints_use_read_session(superuser_client, session_roles):
+    for url in (
+        PROJECTS_URL,
+        DONATIONS_URL,
+        f'{PROJECTS_URL}1/investments',
+    ):
+        assert superuser_client.get(url).status_code == 200, url
+    assert set(session_roles) == {'read'}, (
+        'GET-запросы должны выполняться через сессию чтения.'
+    )
+    superuser_client.patch(f'{PROJECTS_URL}1', json={'name': 'Новое имя'})
+    assert session_roles[-1] == 'write', (
+        'Изменения должны выполняться через сессию записи.'
+    )
+
+
+@pytest.mark.usefixtures('charity_project')
+def test_read_your_writes(user_client, session_roles):
+    user_client.get(MY_DONATIONS_URL)
+    assert session_roles == ['read']
+    session_roles.clear()
+    response = user_client.post(DONATIONS_URL, json={'full_amount': 10})
+    assert response.status_code == 200
+    assert set(session_roles) == {'write'}
+    session_roles.clear()
+    assert user_client.get(MY_DONATIONS_URL, params={'limit': 5}).json()
+    assert session_roles == ['write'], (
+        'Сразу после пожертвования его автор должен читать '
+        'через сессию записи.'
+    )
+    recent_writes.clear()
+    session_roles.clear()
+    user_client.get(MY_DONATIONS_URL, params={'limit': 6})
+    assert session_roles == ['read']
+
+
+@pytest.mark.usefixtures('charity_project', 'donation')
+def test_replica_reads_not_cached(superuser_client, replica_reads):
+    replica_reads(TestingSessionLocal)
+    for url in (
+        PROJECTS_URL + '?limit=10',
+        DONATIONS_URL,
+        f'{PROJECTS_URL}1/investments',
+    ):
+        response = superuser_client.get(url)
+        assert response.status_code == 200, url
+        assert 'etag' not in response.headers, (
+            'Ответ, прочитанный с реплики, не должен получать ETag '
+            f'по версии основной базы: {url}'
+        )
+    assert len(charity_project_crud.cache.backend) == 0, (
+        'Прочитанное с реплики не должно сохраняться в кэш модели.'
+    )
+
+
+@pytest.mark.usefixtures('charity_project')
+def test_replica_user_page_not_cached(user_client, replica_reads):
+    replica_reads(TestingSessionLocal)
+    response = user_client.get(MY_DONATIONS_URL)
+    assert response.status_code == 200
+    assert 'etag' not in response.headers
+    assert len(donation_crud.cache.backend) == 0, (
+        'Прочитанное с реплики не должно сохраняться в кэш '
+        'страниц пользователя.'
+    )
+
+
+@pytest.mark.usefixtures('charity_project')
+def test_snapshot_not_built_from_replica(
+        superuser_client, replica_reads, monkeypatch):
+    replica_engine = create_async_engine('sqlite+aiosqlite://')
+    replica_reads(sessionmaker(replica_engine, class_=AsyncSession))
+    monkeypatch.setattr(
+        project_list_snapshot, '_session_factory', TestingSessionLocal
+    )
+    response = superuser_client.get(PROJECTS_URL)
+    assert response.status_code == 200
+    assert len(response.json()) == 1, (
+        'Снимок списка проектов должен строиться по основной базе, '
+        'а не по реплике.'
+    )
+    assert 'etag' in response.headers
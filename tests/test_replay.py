@@ -0,0 +1,77 @@
+import random
+from datetime import datetime, timedelta
+
+from conftest import TestingSessionLocal
+from sqlalchemy import select, update
+
+from app.models import CharityProject, Donation, Investment
+from app.services.replay import AllocationReplay
+from app.services.utils import distribute_funds
+
+
+async def create_history(session, seed=0, count=40):
+    rnd = random.Random(seed)
+    for number in range(count):
+        model = rnd.choice((CharityProject, Donation))
+        kwargs = dict(
+            full_amount=rnd.randint(1, 300),
+            create_date=datetime(2020, 1, 1) + timedelta(minutes=number),
+        )
+        if model is CharityProject:
+            kwargs.update(name=f'project {number}', description='-')
+        obj = model(**kwargs)
+        session.add(obj)
+        await session.commit()
+        await session.refresh(obj)
+        opened_model = Donation if model is CharityProject else CharityProject
+        await distribute_funds(opened_model, obj, session)
+
+
+async def read_state(session):
+    state = []
+    for model in (CharityProject, Donation):
+        rows = await session.execute(select(
+            model.id,
+            model.invested_amount,
+            model.fully_invested,
+            model.close_date.is_not(None),
+        ).order_by(model.id))
+        state.append(rows.all())
+    investments = await session.execute(select(
+        Investment.donation_id, Investment.project_id, Investment.amount
+    ))
+    state.append(sorted(investments.all()))
+    return state
+
+
+async def test_replay_repairs_allocation_state():
+    async with TestingSessionLocal() as session:
+        await create_history(session)
+        expected = await read_state(session)
+        for model in (CharityProject, Donation):
+            await session.execute(update(model).values(
+                invested_amount=0, fully_invested=False, close_date=None
+            ))
+        await session.execute(Investment.__table__.delete())
+        await session.commit()
+    diffs = []
+    async with TestingSessionLocal() as session:
+        report = await AllocationReplay(
+            session, dry_run=True, on_diff=diffs.append
+        ).run()
+        assert report.corrections == len(diffs) > 0, (
+            'В режиме `--dry-run` пересчёт должен выводить расхождения.'
+        )
+        assert (await read_state(session))[-1] == [], (
+            'В режиме `--dry-run` пересчёт не должен ничего записывать.'
+        )
+    async with TestingSessionLocal() as session:
+        await AllocationReplay(session, batch_size=7).run()
+    async with TestingSessionLocal() as session:
+        assert await read_state(session) == expected, (
+            'Пересчёт должен восстанавливать то же распределение средств, '
+            'что и последовательная обработка запросов API.'
+        )
+    async with TestingSessionLocal() as session:
+        report = await AllocationReplay(session, dry_run=True).run()
+    assert report.corrections == 0
@@ -0,0 +1,72 @@
+from datetime import datetime
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.api.responses import encode_json_rows, schema_fields
+from app.schemas.charity_project import CharityProjectDB
+from app.schemas.donation import DonationDB, DonationDBSuper
+
+ROWS = {
+    CharityProjectDB: [
+        dict(
+            id=1, name='Кошки', description='Корм "и" \\ миски\n\t\x01',
+            full_amount=1000, invested_amount=1000, fully_invested=True,
+            create_date=datetime(2020, 1, 1, 12, 30, 15, 123456),
+            close_date=datetime(2020, 2, 1),
+        ),
+        dict(
+            id=2, name='🐈 emoji', description='  line',
+            full_amount=5, invested_amount=0, fully_invested=False,
+            create_date=datetime(2020, 1, 2), close_date=None,
+        ),
+    ],
+    DonationDBSuper: [
+        dict(
+            id=1, comment=None, full_amount=10, user_id=None,
+            invested_amount=0, fully_invested=False,
+            create_date=datetime(2020, 1, 1), close_date=None,
+        ),
+        dict(
+            id=2, comment='Спасибо', full_amount=7, user_id=3,
+            invested_amount=7, fully_invested=True,
+            create_date=datetime(2020, 1, 1, 0, 0, 0, 1),
+            close_date=datetime(2020, 1, 1, 0, 0, 1),
+        ),
+    ],
+    DonationDB: [
+        dict(
+            id=1, comment=None, full_amount=10,
+            create_date=datetime(2020, 1, 1),
+        ),
+    ],
+}
+
+
+@pytest.mark.parametrize('schema', list(ROWS))
+def test_encode_json_rows_matches_pydantic(schema):
+    rows = ROWS[schema]
+    expected = JSONResponse(jsonable_encoder(
+        [schema(**row) for row in rows], exclude_none=True
+    )).body
+    fields = schema_fields(schema)
+    encoded = encode_json_rows(
+        fields, [[row[field] for field in fields] for row in rows]
+    )
+    assert encoded == expected, (
+        'Быстрая сериализация должна совпадать побайтно с ответом '
+        'FastAPI по схеме с `response_model_exclude_none`.'
+    )
+
+
+@pytest.mark.usefixtures('donation', 'another_donation')
+def test_donation_list_shape(superuser_client):
+    data = superuser_client.get('/donation/').json()
+    assert list(data[0]) == [
+        'full_amount', 'comment', 'id', 'create_date', 'user_id',
+        'invested_amount', 'fully_invested',
+    ], (
+        'Порядок и состав полей списка пожертвований должен '
+        'соответствовать схеме `DonationDBSuper`.'
+    )
@@ -0,0 +1,129 @@
+import logging
+from datetime import datetime
+
+import pytest
+
+from app.core.config import Constant, settings
+from app.core.slow_queries import parameter_shapes
+from app.models import CharityProject
+from app.services.utils import get_uninvested_objects
+from conftest import TestingSessionLocal
+
+PROJECTS_URL = '/charity_project/'
+
+
+class RecordList(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+@pytest.fixture
+def slow_queries(monkeypatch):
+    monkeypatch.setattr(settings, 'slow_query_threshold', 0)
+    handler = RecordList()
+    logger = logging.getLogger(Constant.SLOW_QUERY_LOGGER)
+    logger.addHandler(handler)
+    yield handler.messages
+    logger.removeHandler(handler)
+
+
+def test_parameter_shapes():
+    assert parameter_shapes((1, 2, 3, 'a', None)) == (
+        '(int x 3, str, NoneType)'
+    )
+    assert parameter_shapes({'id': 1, 'name': 'a'}) == (
+        '{id: int, name: str}'
+    )
+    assert parameter_shapes([(1, 'a'), (2, 'b')], executemany=True) == (
+        '2 x (int, str)'
+    )
+
+
+@pytest.mark.usefixtures('charity_project')
+def test_slow_crud_query_logged(test_client, slow_queries):
+    response = test_client.get(PROJECTS_URL + '?limit=1')
+    assert response.status_code == 200
+    assert len(slow_queries) == 1, (
+        'Медленный запрос `CRUDBase` должен записываться в журнал.'
+    )
+    message = slow_queries[0]
+    for part in (
+        'CRUDBase.get_page',
+        'SELECT',
+        'Параметры: (int x 2)',
+        'USING INDEX',
+        'пропущено повторов 0',
+    ):
+        assert part in message, (
+            f'Запись о медленном запросе должна содержать `{part}`.'
+        )
+
+
+@pytest.mark.usefixtures('charity_project')
+def test_slow_query_log_rate_limited(test_client, slow_queries, monkeypatch):
+    for _ in range(3):
+        test_client.get(PROJECTS_URL + '?limit=1')
+    assert len(slow_queries) == 1, (
+        'Повторы одного запроса не должны записываться чаще '
+        '`slow_query_log_interval`.'
+    )
+    monkeypatch.setattr(settings, 'slow_query_log_interval', 0)
+    test_client.get(PROJECTS_URL + '?limit=1')
+    assert len(slow_queries) == 2
+    assert 'пропущено повторов 2' in slow_queries[-1]
+
+
+@pytest.mark.usefixtures('charity_project')
+def test_fast_queries_not_logged(test_client, slow_queries, monkeypatch):
+    monkeypatch.setattr(settings, 'slow_query_threshold', None)
+    test_client.get(PROJECTS_URL + '?limit=1')
+    assert not slow_queries
+
+
+async def test_uninvested_objects_logged(slow_queries):
+    async with TestingSessionLocal() as session:
+        session.add(CharityProject(
+            name='Мёд', description='Для пчёл', full_amount=10,
+            create_date=datetime.now(),
+        ))
+        await session.commit()
+        assert len(await get_uninvested_objects(CharityProject, session)) == 1
+    assert [
+        message for message in slow_queries
+        if 'get_uninvested_objects' in message
+    ], 'Медленный запрос `get_uninvested_objects` должен записываться.'
+    assert not [
+        message for message in slow_queries if 'INSERT' in message
+    ], 'Запросы вне `CRUDBase` не должны записываться в журнал.'
+
+
+@pytest.mark.parametrize('engine, expected', [
+    (Constant.ALLOCATION_ENGINE_SQL, (
+        ('allocate_funds', 'allocation_window'),
+        ('allocate_funds', 'INSERT INTO investment'),
+        ('allocate_funds', 'UPDATE charityproject'),
+    )),
+    (Constant.ALLOCATION_ENGINE_PYTHON, (
+        ('iter_uninvested_chunks', 'FROM charityproject'),
+        ('stream_distribute_funds', 'INSERT INTO investment'),
+    )),
+])
+@pytest.mark.usefixtures('charity_project')
+def test_allocation_queries_logged(
+        user_client, slow_queries, monkeypatch, engine, expected,
+):
+    monkeypatch.setattr(settings, 'allocation_engine', engine)
+    response = user_client.post('/donation/', json={'full_amount': 100})
+    assert response.status_code == 200
+    for source, part in expected:
+        assert [
+            message for message in slow_queries
+            if f'запрос {source}:' in message and part in message
+        ], (
+            f'Запрос распределения `{part}` должен записываться '
+            f'в журнал с источником `{source}`.'
+        )
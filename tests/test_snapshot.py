@@ -0,0 +1,93 @@
+import gzip
+
+import brotli
+import pytest
+from conftest import TestingSessionLocal
+
+from app.crud.cache import LIST_KEY
+from app.crud.charity_project import charity_project_crud
+from app.services import snapshot
+from app.services.snapshot import project_list_snapshot
+
+PROJECTS_URL = '/charity_project/'
+
+
+@pytest.mark.usefixtures(
+    'charity_project', 'charity_project_nunchaku',
+    'small_fully_charity_project',
+)
+def test_snapshot_matches_regular_response(user_client):
+    regular = user_client.get(PROJECTS_URL, params={'limit': 100})
+    response = user_client.get(
+        PROJECTS_URL, headers={'Accept-Encoding': 'identity'}
+    )
+    assert response.status_code == 200
+    assert response.headers['content-type'] == 'application/json'
+    assert response.content == regular.content, (
+        'Тело ответа из снимка должно совпадать с обычным ответом '
+        'эндпоинта побайтно.'
+    )
+
+
+@pytest.mark.usefixtures('charity_project')
+def test_snapshot_gzip(user_client):
+    response = user_client.get(
+        PROJECTS_URL, headers={'Accept-Encoding': 'gzip'}
+    )
+    assert response.headers['content-encoding'] == 'gzip'
+    assert response.headers['vary'] == 'Accept, Accept-Encoding'
+    body = gzip.decompress(project_list_snapshot._bodies['gzip'])
+    assert body == response.content == user_client.get(
+        PROJECTS_URL, headers={'Accept-Encoding': 'identity'}
+    ).content, (
+        'Сжатое тело снимка должно совпадать с несжатым.'
+    )
+
+
+@pytest.mark.usefixtures('charity_project')
+def test_snapshot_brotli(user_client):
+    response = user_client.get(
+        PROJECTS_URL, headers={'Accept-Encoding': 'br, gzip'}
+    )
+    assert response.headers['content-encoding'] == 'br'
+    body = brotli.decompress(project_list_snapshot._bodies['br'])
+    assert body == user_client.get(
+        PROJECTS_URL, headers={'Accept-Encoding': 'identity'}
+    ).content
+
+
+@pytest.mark.usefixtures('charity_project')
+def test_snapshot_rebuilt_only_after_change(user_client, query_log):
+    user_client.get(PROJECTS_URL)
+    query_log.clear()
+    user_client.get(PROJECTS_URL)
+    assert project_list_snapshot.builds == 1
+    assert not query_log.statements, (
+        'Повторный запрос должен обслуживаться из снимка без SQL-запросов.'
+    )
+    user_client.post('/donation/', json={'full_amount': 100})
+    projects = user_client.get(PROJECTS_URL).json()
+    assert project_list_snapshot.builds == 2, (
+        'Распределение средств должно приводить к пересборке снимка.'
+    )
+    assert projects[0]['invested_amount'] == 100
+
+
+@pytest.mark.usefixtures('charity_project')
+def test_snapshot_without_brotli(user_client, monkeypatch):
+    monkeypatch.setattr(snapshot, 'brotli', None)
+    response = user_client.get(
+        PROJECTS_URL, headers={'Accept-Encoding': 'br, gzip'}
+    )
+    assert response.headers['content-encoding'] == 'gzip', (
+        'Без пакета `brotli` снимок должен отдаваться в gzip.'
+    )
+
+
+async def test_snapshot_built_from_database(charity_project):
+    charity_project_crud.cache.set(LIST_KEY, [])
+    async with TestingSessionLocal() as session:
+        await project_list_snapshot.build(session)
+    assert project_list_snapshot._bodies['identity'] != b'[]', (
+        'Снимок должен строиться по данным базы, а не по кэшу модели.'
+    )
@@ -0,0 +1,103 @@
+from collections import deque
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.services.utils import patch_distribute_funds
+from app.services.vectorized import (
+    allocate_arrays,
+    patch_distribute_funds_vectorized,
+)
+
+
+def make_items(amounts, invested=None):
+    invested = invested if invested is not None else [0] * len(amounts)
+    return [
+        SimpleNamespace(
+            id=number,
+            full_amount=int(amount),
+            invested_amount=int(done),
+            fully_invested=False,
+            close_date=None,
+        )
+        for number, (amount, done) in enumerate(zip(amounts, invested))
+    ]
+
+
+def scalar_allocation(project_needs, donation_amounts):
+    projects = make_items(project_needs)
+    donations = make_items(donation_amounts)
+    opened = deque(projects)
+    transfers = []
+    for donation in donations:
+        patch_distribute_funds(opened, donation, transfers)
+        while opened and opened[0].fully_invested:
+            opened.popleft()
+    closed_projects = [item.id for item in projects if item.fully_invested]
+    closed_donations = [item.id for item in donations if item.fully_invested]
+    return transfers, closed_projects, closed_donations
+
+
+@pytest.mark.parametrize('seed, size', [
+    (0, 10),
+    (1, 1000),
+    (2, 1000000),
+])
+def test_allocate_arrays_matches_scalar_loop(seed, size):
+    rnd = np.random.default_rng(seed)
+    project_needs = rnd.integers(1, 5000, size=size)
+    donation_amounts = np.where(
+        rnd.random(size) < 0.9,
+        rnd.integers(1, 500, size=size),
+        rnd.integers(1, 50000, size=size),
+    )
+    transfers, closed_projects, closed_donations = scalar_allocation(
+        project_needs, donation_amounts
+    )
+    result = allocate_arrays(project_needs, donation_amounts)
+    assert result.project_index.tolist() == [
+        transfer.item.id for transfer in transfers
+    ]
+    assert result.donation_index.tolist() == [
+        transfer.funds.id for transfer in transfers
+    ]
+    assert result.amount.tolist() == [
+        transfer.amount for transfer in transfers
+    ], (
+        'Векторное распределение должно совпадать с последовательным '
+        'применением `patch_distribute_funds`.'
+    )
+    assert result.closed_projects.tolist() == closed_projects
+    assert result.closed_donations.tolist() == closed_donations
+
+
+def test_allocate_arrays_empty():
+    result = allocate_arrays([], [100])
+    assert result.amount.size == 0
+    assert result.closed_donations.size == 0
+
+
+@pytest.mark.parametrize('amount', [1, 150, 300, 301, 10000])
+@pytest.mark.parametrize('invested', [
+    [50, 0, 0],
+    [100, 0, 100],
+    [0, 100, 0, 100],
+])
+def test_patch_distribute_funds_vectorized(amount, invested):
+    def run(distribute):
+        items = make_items([100] * len(invested), invested=invested)
+        funds = make_items([amount])[0]
+        transfers = []
+        distribute(items, funds, transfers)
+        return (
+            [(item.invested_amount, item.fully_invested) for item in items],
+            (funds.invested_amount, funds.fully_invested),
+            [(transfer.item.id, transfer.amount) for transfer in transfers],
+        )
+
+    result = run(patch_distribute_funds_vectorized)
+    assert result == run(patch_distribute_funds)
+    assert all(amount > 0 for _, amount in result[2]), (
+        'Переводы с нулевой суммой создаваться не должны.'
+    )